@@ -17,7 +17,8 @@ from app.schemas.admin import (
     SimulationListResponse,
     SimulationListItem
 )
-from app.core.dependencies import get_current_admin_user
+from app.core.dependencies import get_current_admin_user, get_prediction_service
+from app.services.prediction_service import PredictionService
 
 router = APIRouter()
 
@@ -356,3 +357,82 @@ async def delete_user_history(
     await crud.delete_user_simulation_history(db, user_id)
     
     return None
+
+# ============================================
+# Prediction Cache Endpoints
+# ============================================
+
+@router.delete("/cache/predictions")
+async def invalidate_prediction_cache(
+    prediction_service: PredictionService = Depends(get_prediction_service),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Invalidate cache hasil prediksi (mis. setelah model diganti).
+    
+    **Admin only** - Requires admin role.
+    
+    Returns statistik cache sebelum di-invalidate.
+    """
+    if prediction_service.cache is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Prediction cache is disabled (CACHE_ENABLED=False)"
+        )
+    
+    stats = prediction_service.cache.stats()
+    prediction_service.cache.invalidate()
+    
+    return {
+        "message": "Prediction cache invalidated",
+        "stats": stats
+    }
+
+# ============================================
+# Model Hot Reload Endpoints
+# ============================================
+
+@router.get("/model")
+async def get_model_info(
+    prediction_service: PredictionService = Depends(get_prediction_service),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Informasi model ONNX yang sedang aktif.
+    
+    **Admin only** - Requires admin role.
+    """
+    engine = prediction_service.engine
+    return {
+        "model_loaded": engine.model_loaded,
+        "model_version": engine.model_version,
+        "model_path": str(engine.model_path) if engine.model_path else None,
+        "model_sha256": engine.model_sha256,
+        "variant": engine.variant,
+        "scenario_atlas": prediction_service.atlas is not None
+    }
+
+@router.post("/model/reload")
+async def reload_model(
+    prediction_service: PredictionService = Depends(get_prediction_service),
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """
+    Hot reload model dari MODEL_PATH / MODEL_CONFIG_PATH tanpa restart server.
+    
+    **Admin only** - Requires admin role.
+    
+    Session baru di-load dan di-warm-up di background lalu di-swap atomik;
+    request yang sedang berjalan selesai di model lama.
+    """
+    result = await prediction_service.reload_model()
+    if not result["reloaded"]:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Gagal me-load model baru, model lama tetap dipakai"
+        )
+    
+    return {
+        "message": "Model reloaded",
+        **result
+    }
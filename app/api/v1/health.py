@@ -5,11 +5,16 @@ import psutil
 
 from app.database.connection import get_db
 from app.config import settings
+from app.core.dependencies import get_prediction_service
+from app.services.prediction_service import PredictionService
 
 router = APIRouter()
 
 @router.get("/health")
-async def health_check(db: AsyncSession = Depends(get_db)):
+async def health_check(
+    db: AsyncSession = Depends(get_db),
+    prediction_service: PredictionService = Depends(get_prediction_service)
+):
     """Health check endpoint untuk monitoring"""
     try:
         # Check database connection
@@ -31,7 +36,8 @@ async def health_check(db: AsyncSession = Depends(get_db)):
             "cpu_percent": cpu_percent,
             "memory_percent": memory.percent,
             "memory_available_mb": memory.available / (1024 * 1024)
-        }
+        },
+        "prediction_cache": prediction_service.cache.stats() if prediction_service.cache else None
     }
 
 @router.get("/ping")
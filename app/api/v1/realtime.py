@@ -4,7 +4,7 @@ from typing import Optional
 from datetime import datetime, timedelta
 import logging
 
-from app.services.earthquake_service import EarthquakeService
+from app.services.earthquake_service import EarthquakeService, heuristic_risk
 from app.database.connection import get_db
 from app.database import crud
 
@@ -21,6 +21,9 @@ async def get_realtime_earthquakes(
     """
     Mendapatkan data gempa real-time dari BMKG/USGS.
     
+    Risiko tsunami (riskLevel, maxWaveHeight) sudah dianalisis oleh scheduler saat
+    gempa disimpan, jadi endpoint ini hanya membaca database tanpa inference.
+    
     Parameters:
     - limit: Jumlah maksimum data gempa (default: 10)
     - min_magnitude: Magnitudo minimum (default: 5.0)
@@ -29,76 +32,19 @@ async def get_realtime_earthquakes(
     logger.info(f"Serving realtime earthquakes from DB: limit={limit}")
     
     try:
-        # Get from database (populated by scheduler)
+        # Get from database (populated and assessed by scheduler)
         earthquakes = await crud.get_earthquake_history(db, limit=limit)
         
-        # Initialize Prediction Service (AI Model)
-        from app.services.prediction_service import PredictionService
-        try:
-            prediction_service = PredictionService()
-            model_active = True
-        except Exception as e:
-            logger.error(f"Failed to load PredictionService for realtime: {e}")
-            model_active = False
-
-        # Analyze tsunami risk for each earthquake
-        analyzed_earthquakes = []
         for eq in earthquakes:
-            risk_level = "Rendah"
-            max_wave_height = 0.0
-            
-            if model_active:
-                try:
-                    # Run AI Prediction
-                    # Ensure parameters are floats
-                    pred_result = await prediction_service.predict(
-                        magnitude=float(eq['magnitude']),
-                        depth=float(eq['depth']),
-                        latitude=float(eq['latitude']),
-                        longitude=float(eq['longitude'])
-                    )
-                    
-                    # Extract result
-                    prediction = pred_result.get('prediction', {})
-                    model_category = prediction.get('tsunamiCategory', 'Low')
-                    max_wave_height = prediction.get('maxWaveHeight', 0.0)
-                    
-                    # Map Category to Indonesian (Bahaya/Sedang/Rendah)
-                    if model_category in ['Extreme', 'High']:
-                        risk_level = "Bahaya"
-                    elif model_category == 'Medium':
-                        risk_level = "Sedang"
-                    else:
-                        risk_level = "Rendah"
-                        
-                except Exception as pred_error:
-                    logger.warning(f"AI Prediction failed for EQ {eq.get('id')}: {pred_error}")
-                    # Fallback to heuristic if AI fails
-                    if eq['magnitude'] >= 7.5 and eq['depth'] < 50:
-                        risk_level = "Bahaya"
-                        max_wave_height = (float(eq['magnitude']) - 6.5) * 2
-                    elif eq['magnitude'] >= 7.0 and eq['depth'] < 70:
-                        risk_level = "Sedang"
-                        max_wave_height = (float(eq['magnitude']) - 6.0) * 1.5
-            
-            else:
-                 # Fallback (Original Heuristic)
-                if eq['magnitude'] >= 7.5 and eq['depth'] < 50:
-                    risk_level = "Bahaya"
-                    max_wave_height = (float(eq['magnitude']) - 6.5) * 2
-                elif eq['magnitude'] >= 7.0 and eq['depth'] < 70:
-                    risk_level = "Sedang"
-                    max_wave_height = (float(eq['magnitude']) - 6.0) * 1.5
-            
-            # Add risk info
-            eq["riskLevel"] = risk_level
-            eq["maxWaveHeight"] = round(max_wave_height, 2)
-            analyzed_earthquakes.append(eq)
+            # Data lama yang disimpan sebelum assessment saat ingest: estimasi heuristik
+            if eq["riskLevel"] is None or eq["maxWaveHeight"] is None:
+                eq["riskLevel"], max_wave_height = heuristic_risk(float(eq['magnitude']), float(eq['depth']))
+                eq["maxWaveHeight"] = round(max_wave_height, 2)
         
         return {
             "status": "success",
-            "earthquakes": analyzed_earthquakes,
-            "count": len(analyzed_earthquakes),
+            "earthquakes": earthquakes,
+            "count": len(earthquakes),
             "timestamp": datetime.utcnow().isoformat()
         }
         
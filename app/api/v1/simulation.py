@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from starlette.background import BackgroundTask
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
 import logging
+import numpy as np
 
-from app.schemas.simulation import SimulationRequest, SimulationResponse
+from app.schemas.simulation import (
+    BatchSimulationRequest, EnsembleRequest, EnsembleResponse, SimulationRequest, SimulationResponse, SweepRequest
+)
 from app.services.prediction_service import PredictionService
-from app.database.connection import get_db
+from app.services.simulation_jobs import JobQueueFull, SimulationJobQueue
+from app.config import settings
+from app.utils.grid_encoding import encode_float16, encode_png16
+from app.database.connection import AsyncSessionLocal, get_db
 from app.database import crud
 from app.utils.validators import validate_earthquake_params
-from app.core.dependencies import get_current_user_optional
+from app.core.dependencies import get_current_user_optional, get_job_queue, get_prediction_service
 from app.database.models import User
 
 router = APIRouter()
@@ -21,7 +31,9 @@ async def run_simulation(
     req: Request,
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional),
-    x_session_id: Optional[str] = Header(None)
+    prediction_service: PredictionService = Depends(get_prediction_service),
+    x_session_id: Optional[str] = Header(None),
+    contours: bool = Query(default=True, description="false: izinkan jawaban scenario atlas tanpa inference")
 ):
     """
     Endpoint untuk menjalankan simulasi tsunami manual.
@@ -31,6 +43,7 @@ async def run_simulation(
     - depth: Kedalaman gempa dalam km (1 - 700)
     - latitude: Koordinat lintang (-90 to 90)
     - longitude: Koordinat bujur (-180 to 180)
+    - contours (query): false untuk query "what-if" cepat dari scenario atlas (tanpa kontur model)
     
     Returns:
     - Hasil prediksi tsunami termasuk ETA, tinggi gelombang, zona genangan
@@ -58,16 +71,14 @@ async def run_simulation(
         )
 
     try:
-        # Initialize prediction service
-        prediction_service = PredictionService()
-        
         # Run prediction
         result = await prediction_service.predict(
             magnitude=request_data.magnitude,
             depth=request_data.depth,
             latitude=request_data.latitude,
             longitude=request_data.longitude,
-            mode=request_data.mode
+            mode=request_data.mode,
+            contours=contours
         )
         
         # Get client IP address
@@ -86,7 +97,9 @@ async def run_simulation(
             user_session_id=x_session_id,
             user_id=current_user.id if current_user else None,
             ip_address=client_ip,
-            mode=request_data.mode
+            mode=request_data.mode,
+            # Versi snapshot model yang benar-benar menjalankan inference (aman saat hot reload)
+            model_version=result["prediction"].get("modelVersion")
         )
         
         logger.info(f"Simulation completed: ETA={result['prediction']['eta']}min")
@@ -104,6 +117,444 @@ async def run_simulation(
             detail=f"Gagal menjalankan simulasi: {str(e)}"
         )
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format satu event Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+async def _save_streamed_simulation(holder: Dict[str, Any], **kwargs):
+    """Simpan hasil stream setelah response selesai (session sendiri, bukan dependency request)"""
+    if "result" not in holder:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await crud.save_simulation_result(
+                db=db,
+                result=holder["result"],
+                processing_time_ms=holder["result"]["prediction"].get("processingTimeMs"),
+                model_version=holder["result"]["prediction"].get("modelVersion"),
+                **kwargs
+            )
+    except Exception as e:
+        logger.error(f"Failed to save streamed simulation: {e}")
+
+@router.post("/simulation/stream")
+async def stream_simulation(
+    request_data: SimulationRequest,
+    req: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    prediction_service: PredictionService = Depends(get_prediction_service),
+    x_session_id: Optional[str] = Header(None),
+    contours: bool = Query(default=True, description="false: izinkan jawaban scenario atlas tanpa inference")
+):
+    """
+    Simulasi tsunami bertahap via Server-Sent Events (text/event-stream).
+    
+    Urutan event: estimate (heuristik, langsung) -> prediction (max wave AI) ->
+    inundation -> impact (impact zones + wave series) -> done. Jika gagal di tengah
+    jalan dikirim event error. Gabungan data semua event sama dengan /simulation/run
+    (termasuk query contours).
+    """
+    try:
+        validate_earthquake_params(
+            request_data.magnitude,
+            request_data.depth,
+            request_data.latitude,
+            request_data.longitude
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if request_data.mode == "AI" and current_user is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Mode AI memerlukan autentikasi. Silakan login terlebih dahulu untuk menggunakan simulasi AI yang presisi."
+        )
+    
+    holder: Dict[str, Any] = {}
+    
+    async def events():
+        result: Dict[str, Any] = {}
+        try:
+            async for event, data in prediction_service.predict_stream(
+                magnitude=request_data.magnitude,
+                depth=request_data.depth,
+                latitude=request_data.latitude,
+                longitude=request_data.longitude,
+                mode=request_data.mode,
+                contours=contours
+            ):
+                if event in ("prediction", "inundation", "impact"):
+                    result.update(data)
+                elif event == "done":
+                    result["prediction"] = {**result["prediction"], "processingTimeMs": data["processingTimeMs"]}
+                    holder["result"] = result
+                yield _sse(event, data)
+        except Exception as e:
+            logger.error(f"Streaming simulation error: {e}", exc_info=True)
+            yield _sse("error", {"detail": f"Gagal menjalankan simulasi: {str(e)}"})
+    
+    background = BackgroundTask(
+        _save_streamed_simulation,
+        holder,
+        params=request_data.dict(),
+        user_session_id=x_session_id,
+        user_id=current_user.id if current_user else None,
+        ip_address=req.client.host if req.client else None,
+        mode=request_data.mode
+    )
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Nonaktifkan buffering proxy (nginx) agar event pertama langsung terkirim
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background
+    )
+
+@router.post("/simulation/wave-grid")
+async def get_wave_grid(
+    request_data: SimulationRequest,
+    format: str = Query(default="f16", regex="^(f16|png)$"),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    prediction_service: PredictionService = Depends(get_prediction_service)
+):
+    """
+    Wave grid mentah 128x128 dari model AI sebagai payload biner untuk heatmap di frontend.
+    
+    Query:
+    - format=f16: header 32 byte + float16 little-endian (lihat app/utils/grid_encoding.py)
+    - format=png: PNG grayscale 16-bit north-up, nilai meter = piksel * X-Grid-Scale
+    
+    Header response: X-Grid-Shape, X-Grid-Bounds (min_lon,min_lat,max_lon,max_lat)
+    """
+    try:
+        validate_earthquake_params(
+            request_data.magnitude,
+            request_data.depth,
+            request_data.latitude,
+            request_data.longitude
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Wave grid hanya ada di mode AI, yang memerlukan login
+    if current_user is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Mode AI memerlukan autentikasi. Silakan login terlebih dahulu untuk menggunakan simulasi AI yang presisi."
+        )
+    
+    try:
+        grid = await prediction_service.predict_wave_grid(
+            magnitude=request_data.magnitude,
+            latitude=request_data.latitude,
+            longitude=request_data.longitude
+        )
+    except Exception as e:
+        logger.error(f"Wave grid error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Gagal menjalankan model: {str(e)}")
+    
+    if grid is None:
+        raise HTTPException(status_code=503, detail="Model AI tidak tersedia")
+    
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    headers = {
+        "X-Grid-Shape": f"{grid.shape[0]},{grid.shape[1]}",
+        "X-Grid-Bounds": ",".join(
+            str(bounds[k]) for k in ("min_lon", "min_lat", "max_lon", "max_lat")
+        ),
+    }
+    
+    if format == "png":
+        content, scale = encode_png16(grid, bounds)
+        headers["X-Grid-Scale"] = repr(scale)
+        return Response(content=content, media_type="image/png", headers=headers)
+    
+    return Response(content=encode_float16(grid, bounds), media_type="application/octet-stream", headers=headers)
+
+async def _save_batch_chunk(rows: List[Dict[str, Any]], **kwargs) -> int:
+    """Bulk insert satu chunk hasil /simulation/batch dengan session sendiri"""
+    try:
+        async with AsyncSessionLocal() as db:
+            return await crud.save_simulation_results_bulk(db, rows, **kwargs)
+    except Exception as e:
+        logger.error(f"Failed to save simulation batch chunk: {e}")
+        return 0
+
+@router.post("/simulation/batch")
+async def run_simulation_batch(
+    request_data: BatchSimulationRequest,
+    req: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    prediction_service: PredictionService = Depends(get_prediction_service),
+    x_session_id: Optional[str] = Header(None)
+):
+    """
+    Simulasi massal untuk skrip riset: daftar skenario (format SimulationRequest)
+    dijalankan per chunk lewat predict_batch (inference batched) dan hasilnya
+    di-stream sebagai NDJSON begitu chunk selesai.
+    
+    Satu baris per skenario: {"index", "status": "success", "data"} atau
+    {"index", "status": "error", "detail"}; baris terakhir {"status": "done", ...}.
+    Jika persist=true, setiap chunk disimpan dengan satu bulk insert.
+    """
+    scenarios = request_data.scenarios
+    if len(scenarios) > settings.SIMULATION_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Maksimum {settings.SIMULATION_BATCH_MAX} skenario per request")
+    
+    if current_user is None and any(sc.mode == "AI" for sc in scenarios):
+        raise HTTPException(
+            status_code=403,
+            detail="Mode AI memerlukan autentikasi. Silakan login terlebih dahulu untuk menggunakan simulasi AI yang presisi."
+        )
+    
+    save_kwargs = {
+        "user_session_id": x_session_id,
+        "user_id": current_user.id if current_user else None,
+        "ip_address": req.client.host if req.client else None
+    }
+    chunk_size = max(1, settings.SIMULATION_BATCH_CHUNK)
+    
+    async def lines():
+        failed = saved = 0
+        pending_save = None
+        for offset in range(0, len(scenarios), chunk_size):
+            # Skenario dikelompokkan per mode; yang tidak valid langsung dilaporkan
+            by_mode: Dict[str, List] = {}
+            for index, sc in enumerate(scenarios[offset:offset + chunk_size], start=offset):
+                try:
+                    validate_earthquake_params(sc.magnitude, sc.depth, sc.latitude, sc.longitude)
+                except ValueError as e:
+                    failed += 1
+                    yield json.dumps({"index": index, "status": "error", "detail": str(e)}) + "\n"
+                    continue
+                by_mode.setdefault(sc.mode, []).append((index, sc))
+            
+            rows = []
+            for mode, items in by_mode.items():
+                params = [
+                    {"magnitude": sc.magnitude, "depth": sc.depth, "latitude": sc.latitude, "longitude": sc.longitude}
+                    for _, sc in items
+                ]
+                try:
+                    results = await prediction_service.predict_batch(params, mode=mode)
+                except Exception as e:
+                    logger.error(f"Batch simulation chunk failed: {e}", exc_info=True)
+                    failed += len(items)
+                    for index, _ in items:
+                        yield json.dumps({"index": index, "status": "error", "detail": f"Gagal menjalankan simulasi: {str(e)}"}) + "\n"
+                    continue
+                
+                for (index, sc), result in zip(items, results):
+                    yield json.dumps({"index": index, "status": "success", "data": result}, separators=(",", ":")) + "\n"
+                    rows.append({
+                        "params": sc.dict(),
+                        "result": result,
+                        "mode": mode,
+                        "processing_time_ms": result["prediction"].get("processingTimeMs"),
+                        "model_version": result["prediction"].get("modelVersion")
+                    })
+            
+            if request_data.persist and rows:
+                # Insert chunk ini berjalan bersamaan dengan inference chunk berikutnya
+                if pending_save is not None:
+                    saved += await pending_save
+                pending_save = asyncio.create_task(_save_batch_chunk(rows, **save_kwargs))
+        
+        if pending_save is not None:
+            saved += await pending_save
+        yield json.dumps({"status": "done", "total": len(scenarios), "failed": failed, "saved": saved}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.post("/simulation/ensemble", response_model=EnsembleResponse)
+async def run_ensemble(
+    request_data: EnsembleRequest,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    prediction_service: PredictionService = Depends(get_prediction_service)
+):
+    """
+    Simulasi ensemble (Monte Carlo) untuk ketidakpastian parameter gempa.
+    
+    K anggota (default settings.ENSEMBLE_MEMBERS) dengan magnitudo, kedalaman dan epicenter
+    yang diperturbasi dijalankan dalam batch inference (400 jika members > ENSEMBLE_MAX_MEMBERS).
+    
+    Returns:
+    - prediction: hasil lengkap untuk parameter nominal
+    - maxWaveDistribution: statistik, persentil dan histogram max wave
+    - percentileGrids: wave grid persentil (base64 format f16, hanya mode AI)
+    - exceedanceContours: kontur P(wave > threshold)
+    """
+    try:
+        validate_earthquake_params(
+            request_data.magnitude,
+            request_data.depth,
+            request_data.latitude,
+            request_data.longitude
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if request_data.mode == "AI" and current_user is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Mode AI memerlukan autentikasi. Silakan login terlebih dahulu untuk menggunakan simulasi AI yang presisi."
+        )
+    
+    try:
+        result = await prediction_service.predict_ensemble(
+            magnitude=request_data.magnitude,
+            depth=request_data.depth,
+            latitude=request_data.latitude,
+            longitude=request_data.longitude,
+            mode=request_data.mode,
+            members=request_data.members,
+            magnitude_std=request_data.magnitude_std,
+            depth_std=request_data.depth_std,
+            location_std_km=request_data.location_std_km,
+            seed=request_data.seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Ensemble simulation error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Gagal menjalankan simulasi ensemble: {str(e)}")
+    
+    return EnsembleResponse(
+        status="success",
+        data=result,
+        message=f"Simulasi ensemble {result['members']} anggota berhasil dijalankan"
+    )
+
+@router.post("/simulation/sweep")
+async def run_parameter_sweep(
+    request_data: SweepRequest,
+    format: str = Query(default="npz", regex="^(npz|parquet)$"),
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    prediction_service: PredictionService = Depends(get_prediction_service)
+):
+    """
+    Parameter sweep / analisis sensitivitas: grid Cartesian magnitude x depth x latitude x
+    longitude (masing-masing min, max, steps) dievaluasi dengan inference batched.
+    
+    Query:
+    - format=npz: np.savez_compressed (lihat app/utils/sweep_encoding.py)
+    - format=parquet: satu baris per titik, memerlukan pyarrow di server
+    
+    Kolom: max_wave_height dan category per titik, city_wave_height per titik pesisir.
+    413 jika titik > SWEEP_MAX_POINTS atau titik x kota pesisir > SWEEP_MAX_CITY_CELLS.
+    Header response: X-Sweep-Points, X-Processing-Time-Ms
+    """
+    ranges = [request_data.magnitude, request_data.depth, request_data.latitude, request_data.longitude]
+    points = int(np.prod([r.steps for r in ranges]))
+    if points > settings.SWEEP_MAX_POINTS:
+        raise HTTPException(status_code=413, detail=f"Maksimum {settings.SWEEP_MAX_POINTS} titik per sweep ({points} diminta)")
+    
+    try:
+        for bound in ("min", "max"):
+            validate_earthquake_params(*(getattr(r, bound) for r in ranges))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if request_data.mode == "AI" and current_user is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Mode AI memerlukan autentikasi. Silakan login terlebih dahulu untuk menggunakan simulasi AI yang presisi."
+        )
+    
+    try:
+        columns, meta = await prediction_service.predict_sweep(
+            *(np.linspace(r.min, r.max, r.steps) for r in ranges),
+            mode=request_data.mode
+        )
+    except ValueError as e:
+        # Titik x kota pesisir melebihi SWEEP_MAX_CITY_CELLS
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        logger.error(f"Parameter sweep error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Gagal menjalankan parameter sweep: {str(e)}")
+    
+    try:
+        content = await prediction_service.encode_sweep(columns, meta, format)
+    except RuntimeError as e:
+        # pyarrow tidak terpasang
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    return Response(
+        content=content,
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f'attachment; filename="sweep.{format}"',
+            "X-Sweep-Points": str(meta["points"]),
+            "X-Processing-Time-Ms": str(meta["processingTimeMs"]),
+        }
+    )
+
+@router.post("/simulation/jobs", status_code=202)
+async def submit_simulation_job(
+    request_data: SimulationRequest,
+    req: Request,
+    current_user: Optional[User] = Depends(get_current_user_optional),
+    job_queue: SimulationJobQueue = Depends(get_job_queue),
+    x_session_id: Optional[str] = Header(None)
+):
+    """
+    Masukkan simulasi ke antrian dan langsung return job id (202 Accepted).
+    
+    Hasil diambil dengan GET /simulation/jobs/{job_id}. Jika antrian penuh
+    request ditolak dengan 429 + Retry-After.
+    """
+    try:
+        validate_earthquake_params(
+            request_data.magnitude,
+            request_data.depth,
+            request_data.latitude,
+            request_data.longitude
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if request_data.mode == "AI" and current_user is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Mode AI memerlukan autentikasi. Silakan login terlebih dahulu untuk menggunakan simulasi AI yang presisi."
+        )
+    
+    try:
+        job = job_queue.submit(
+            request_data.dict(),
+            save_kwargs={
+                "user_session_id": x_session_id,
+                "user_id": current_user.id if current_user else None,
+                "ip_address": req.client.host if req.client else None,
+                "mode": request_data.mode
+            }
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    
+    return {
+        "status": "accepted",
+        "data": job,
+        "message": "Simulasi masuk antrian"
+    }
+
+@router.get("/simulation/jobs/{job_id}")
+async def get_simulation_job(
+    job_id: str,
+    job_queue: SimulationJobQueue = Depends(get_job_queue)
+):
+    """
+    Status job simulasi (queued, running, completed, failed) dan hasilnya jika sudah selesai
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job simulasi tidak ditemukan atau sudah kedaluwarsa")
+    
+    return {
+        "status": "success",
+        "data": job
+    }
+
 @router.get("/simulation/{simulation_id}")
 async def get_simulation(
     simulation_id: str,
@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+import uuid
+
+from app.config import settings
+from app.database.connection import get_db
+from app.database import crud
+from app.services.tile_service import TileService
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+tile_service = TileService()
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+def _validate_tile(z: int, x: int, y: int):
+    if not (0 <= z <= settings.TILE_MAX_ZOOM):
+        raise HTTPException(status_code=400, detail=f"Zoom harus antara 0 dan {settings.TILE_MAX_ZOOM}")
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile di luar jangkauan")
+
+
+def _tile_response(tile: bytes, cache_control: str) -> Response:
+    # Tile kosong -> 204, client peta tidak perlu decode apa pun
+    if not tile:
+        return Response(status_code=204, headers={"Cache-Control": cache_control})
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE, headers={"Cache-Control": cache_control})
+
+
+@router.get("/simulations/{simulation_id}/{z}/{x}/{y}.mvt")
+async def get_simulation_tile(
+    simulation_id: str,
+    z: int,
+    x: int,
+    y: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Vector tile zona inundasi (layer "inundation") dan epicenter (layer "epicenter")
+    dari satu simulasi tersimpan.
+    """
+    _validate_tile(z, x, y)
+    try:
+        key = str(uuid.UUID(simulation_id))
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Simulasi tidak ditemukan")
+
+    # Hasil simulasi tidak berubah, tile boleh di-cache lama oleh browser
+    cache_control = "public, max-age=86400, immutable"
+    tile = tile_service.get_cached("simulations", key, z, x, y)
+    if tile is not None:
+        return _tile_response(tile, cache_control)
+
+    simulation = await crud.get_simulation_by_id(db, key)
+    if not simulation:
+        raise HTTPException(status_code=404, detail="Simulasi tidak ditemukan")
+
+    tile = await run_in_threadpool(tile_service.simulation_tile, simulation, z, x, y)
+    tile_service.store("simulations", key, z, x, y, tile)
+    return _tile_response(tile, cache_control)
+
+
+@router.get("/earthquakes/{z}/{x}/{y}.mvt")
+async def get_earthquake_tile(
+    z: int,
+    x: int,
+    y: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Vector tile titik gempa (layer "earthquakes") dari tabel earthquakes.
+    Cache di-key dengan versi data sehingga gempa baru otomatis terlihat.
+    """
+    _validate_tile(z, x, y)
+    cache_control = f"public, max-age={settings.POLL_INTERVAL}"
+
+    version = await crud.get_earthquake_data_version(db)
+    tile_service.use_earthquake_version(version)
+    tile = tile_service.get_cached("earthquakes", version, z, x, y)
+    if tile is not None:
+        return _tile_response(tile, cache_control)
+
+    earthquakes = await crud.get_earthquakes_in_bounds(db, *tile_service.query_bounds(z, x, y))
+    tile = await run_in_threadpool(tile_service.earthquake_tile, earthquakes, z, x, y)
+    tile_service.store("earthquakes", version, z, x, y, tile)
+    return _tile_response(tile, cache_control)
@@ -43,7 +43,27 @@ class Settings(BaseSettings):
     MODEL_PATH: str = "trained_models/model_tsunami_trial.onnx"
     MODEL_CONFIG_PATH: str = "trained_models/model_config.json"
     USE_GPU: bool = False
-    BATCH_SIZE: int = 1
+    MODEL_WATCH_ENABLED: bool = True  # Hot reload saat file model/config berubah
+    MODEL_WATCH_INTERVAL: float = 10.0  # seconds
+    MODEL_VARIANT: str = "fp32"  # "fp32", "int8_dynamic", "int8_static", "fp16" (scripts/quantize_model.py)
+    # ONNX Runtime SessionOptions
+    ORT_GRAPH_OPTIMIZATION_LEVEL: str = "all"  # "disable", "basic", "extended", "all"
+    ORT_INTRA_OP_THREADS: int = 0  # 0 = default ONNX Runtime (semua core); set sesuai kuota CPU container
+    ORT_INTER_OP_THREADS: int = 0
+    ORT_EXECUTION_MODE: str = "sequential"  # "sequential" atau "parallel"
+    ORT_ENABLE_CPU_MEM_ARENA: bool = True
+    ORT_ENABLE_MEM_PATTERN: bool = True
+    ORT_OPTIMIZED_MODEL_CACHE: bool = True  # Simpan graph teroptimasi, dipakai ulang saat startup
+    ORT_OPTIMIZED_MODEL_DIR: str = "trained_models/optimized"
+    BATCH_SIZE: int = 8  # Maks request per micro-batch (lihat MicroBatcher)
+    MICRO_BATCH_WINDOW_MS: float = 5.0  # Waktu tunggu maks untuk mengumpulkan micro-batch
+    INFERENCE_MAX_BATCH: int = 32  # Maks event per session.run pada predict_batch
+    INFERENCE_THREADS: int = 4  # Ukuran thread pool untuk ONNX/NumPy/kontur (di luar event loop)
+    INFERENCE_BACKEND: str = "thread"  # "thread" atau "process" (pipeline predict di worker process)
+    INFERENCE_PROCESSES: int = 0  # Jumlah worker untuk backend process, 0 = os.cpu_count()
+    SCENARIO_ATLAS_ENABLED: bool = True  # Fast path tanpa inference untuk request contours=False
+    SCENARIO_ATLAS_DIR: str = "trained_models/scenario_atlas"
+    CONTOUR_SIMPLIFY_TOLERANCE: float = 0.005  # derajat (~550 m), 0 = tanpa simplifikasi
     
     # ============================================
     # Data Paths
@@ -53,6 +73,10 @@ class Settings(BaseSettings):
     BATHYMETRY_DIR: Path = DATA_DIR / "bathymetry"
     TOPOGRAPHY_DIR: Path = DATA_DIR / "topography"
     COASTLINES_DIR: Path = DATA_DIR / "coastlines"
+    COASTAL_POINTS_FILE: Path = COASTLINES_DIR / "coastal_points.csv"  # Gazetteer impact zones
+    BATHYMETRY_FILE: Path = BATHYMETRY_DIR / "sunda_strait_bathymetry.tif"  # GeoTIFF EPSG:4326 (mis. GEBCO/BATNAS)
+    BATHYMETRY_POSITIVE_DEPTH: bool = False  # True jika raster berisi kedalaman positif, bukan elevasi
+    BATHYMETRY_CHANNEL_FILE: Path = BATHYMETRY_DIR / "depth_channel_128.npy"  # scripts/prepare_bathymetry_channel.py
     
     # ============================================
     # External API
@@ -75,6 +99,58 @@ class Settings(BaseSettings):
     MIN_DEPTH: float = 1.0
     MAX_DEPTH: float = 700.0
     
+    # ============================================
+    # Impact Zones
+    # ============================================
+    IMPACT_RADIUS_KM: float = 100.0  # Radius maksimum titik pesisir dari epicenter
+    IMPACT_MIN_WAVE_HEIGHT: float = 0.3  # meter, titik dengan gelombang lebih kecil diabaikan
+    IMPACT_ZONES_MAX: int = 50  # Maks impact zone di response (urut ETA)
+    IMPACT_KDTREE_MIN_POINTS: int = 256  # Pakai cKDTree prefilter mulai jumlah titik ini
+    
+    # ============================================
+    # Travel Time (ETA dari bathymetry)
+    # ============================================
+    TRAVEL_TIME_ENABLED: bool = True  # Fallback ke ETA heuristik jika BATHYMETRY_FILE tidak ada
+    TRAVEL_TIME_GRID_SIZE: int = 256  # Resolusi grid solver (sel per sisi)
+    TRAVEL_TIME_MIN_DEPTH: float = 5.0  # meter, kedalaman minimum sel laut (perairan dangkal)
+    TRAVEL_TIME_CACHE_SIZE: int = 64  # Field waktu tiba yang di-cache (LRU per sel epicenter)
+    ISOCHRONE_MINUTES: List[int] = [5, 10, 15, 20, 30, 45, 60]
+    
+    # ============================================
+    # Wave Time Series
+    # ============================================
+    WAVE_DATA_STEP_MINUTES: int = 5  # Resolusi temporal waveData / time series per impact zone
+    WAVE_DATA_MAX_MINUTES: int = 120  # Horizon time series
+    
+    # ============================================
+    # Ensemble (Monte Carlo ketidakpastian parameter gempa)
+    # ============================================
+    ENSEMBLE_MEMBERS: int = 64  # Default K, dijalankan per chunk INFERENCE_MAX_BATCH
+    ENSEMBLE_MAX_MEMBERS: int = 256
+    ENSEMBLE_MAGNITUDE_STD: float = 0.2  # Normal, satuan magnitudo
+    ENSEMBLE_DEPTH_STD_KM: float = 10.0  # Normal, km
+    ENSEMBLE_LOCATION_STD_KM: float = 15.0  # Normal isotropik, km
+    ENSEMBLE_PERCENTILES: List[int] = [5, 50, 95]
+    ENSEMBLE_EXCEEDANCE_THRESHOLDS: List[float] = [0.5, 1.0, 3.0]  # meter
+    ENSEMBLE_PROBABILITY_LEVELS: List[float] = [0.1, 0.5, 0.9]  # Level kontur probabilitas
+    ENSEMBLE_HISTOGRAM_BINS: int = 20
+    
+    # ============================================
+    # Simulation Jobs (POST /simulation/jobs)
+    # ============================================
+    JOB_WORKERS: int = 4  # Job yang dijalankan bersamaan
+    JOB_QUEUE_MAX: int = 100  # Job menunggu maksimum; penuh = 429
+    JOB_RESULT_TTL: int = 600  # seconds, hasil job selesai disimpan di memori
+    JOB_MAX_STORED: int = 5000  # Batas job (antri + selesai) di memori
+    
+    # ============================================
+    # Batch Simulation (POST /simulation/batch, /simulation/sweep)
+    # ============================================
+    SIMULATION_BATCH_MAX: int = 10000  # Skenario maksimum per request
+    SIMULATION_BATCH_CHUNK: int = 256  # Skenario per predict_batch dan per bulk insert
+    SWEEP_MAX_POINTS: int = 100000  # Titik grid maksimum per parameter sweep
+    SWEEP_MAX_CITY_CELLS: int = 20000000  # Titik x kota pesisir maksimum (city_wave_height float32, ~80 MB)
+    
     # ============================================
     # Selat Sunda Boundaries
     # ============================================
@@ -90,6 +166,20 @@ class Settings(BaseSettings):
     # ============================================
     CACHE_ENABLED: bool = True
     CACHE_TTL: int = 300  # seconds
+    CACHE_MAX_ENTRIES: int = 2048  # Entry LRU cache hasil prediksi
+    CACHE_MAGNITUDE_STEP: float = 0.05  # Kuantisasi key cache
+    CACHE_DEPTH_STEP: float = 1.0  # km
+    CACHE_COORD_STEP: float = 0.01  # derajat
+    
+    # ============================================
+    # Vector Tiles (MVT)
+    # ============================================
+    TILE_CACHE_ENABLED: bool = True
+    TILE_CACHE_DIR: Path = BASE_DIR / "cache" / "tiles"
+    TILE_EXTENT: int = 4096
+    TILE_BUFFER: int = 64  # unit tile, untuk clipping tanpa artefak di tepi
+    TILE_SIMPLIFY_PX: float = 1.0  # toleransi simplifikasi dalam unit tile
+    TILE_MAX_ZOOM: int = 18
     
     # ============================================
     # Rate Limiting
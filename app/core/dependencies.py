@@ -1,10 +1,12 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.connection import get_db
 from app.core.security import decode_access_token
 from app.database.models import User, UserRole
+from app.services.prediction_service import PredictionService
+from app.services.simulation_jobs import SimulationJobQueue
 from typing import Optional
 
 security = HTTPBearer()
@@ -118,3 +120,30 @@ async def get_current_user_optional(
         
     except Exception:
         return None
+
+def get_prediction_service(request: Request) -> PredictionService:
+    """
+    Dependency untuk PredictionService bersama (satu ONNX session per proses).
+    Instance dibuat di lifespan app/main.py; dibuat lazy di sini jika lifespan
+    tidak berjalan (mis. test client tanpa lifespan).
+    
+    Usage:
+        @router.post("/run")
+        async def run(prediction_service: PredictionService = Depends(get_prediction_service)):
+            ...
+    """
+    service = getattr(request.app.state, "prediction_service", None)
+    if service is None:
+        service = PredictionService()
+        request.app.state.prediction_service = service
+    return service
+
+def get_job_queue(request: Request) -> SimulationJobQueue:
+    """
+    Dependency untuk antrian job simulasi bersama (dibuat di lifespan, lazy jika tidak ada).
+    """
+    queue = getattr(request.app.state, "job_queue", None)
+    if queue is None:
+        queue = SimulationJobQueue(get_prediction_service(request))
+        request.app.state.job_queue = queue
+    return queue
@@ -1,8 +1,8 @@
 import asyncio
 import logging
-from typing import List
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.earthquake_service import EarthquakeService
+from app.services.earthquake_service import EarthquakeService, heuristic_risk, risk_level_from_category
 from app.database import crud
 from app.database.connection import AsyncSessionLocal
 
@@ -13,6 +13,10 @@ class EarthquakeScheduler:
     Background scheduler to fetch earthquake data periodically.
     Uses asyncio.create_task instead of external libraries like APScheduler
     to keep dependencies minimal.
+    
+    Gempa baru dianalisis sekali saat ingest (satu predict_batch per batch) dan
+    hasilnya disimpan di kolom tsunami_* tabel earthquakes, sehingga GET /realtime
+    cukup membaca database.
     """
     
     def __init__(self, interval_seconds: int = 300): # Default 5 minutes
@@ -20,12 +24,15 @@ class EarthquakeScheduler:
         self.is_running = False
         self._task = None
         self.earthquake_service = EarthquakeService()
+        self.prediction_service = None
         
-    async def start(self):
+    async def start(self, prediction_service=None):
         """Start the background scheduler"""
         if self.is_running:
             return
             
+        if prediction_service is not None:
+            self.prediction_service = prediction_service
         self.is_running = True
         self._task = asyncio.create_task(self._run_loop())
         logger.info("Earthquake scheduler started.")
@@ -82,6 +89,38 @@ class EarthquakeScheduler:
         except Exception as e:
             logger.error(f"Scheduler failed to fetch from USGS: {e}")
             
+    async def _assess_batch(self, earthquakes: List[dict]):
+        """
+        Analisis potensi tsunami untuk gempa baru dalam satu batched inference,
+        hasil ditulis ke tsunami_potential, tsunami_risk_level dan max_wave_height
+        """
+        predictions: List[Optional[dict]] = [None] * len(earthquakes)
+        if self.prediction_service is not None:
+            try:
+                predictions = await self.prediction_service.predict_batch([
+                    {
+                        "magnitude": float(eq['magnitude']),
+                        "depth": float(eq['depth']),
+                        "latitude": float(eq['latitude']),
+                        "longitude": float(eq['longitude'])
+                    }
+                    for eq in earthquakes
+                ])
+            except Exception as e:
+                logger.warning(f"Scheduler: AI batch assessment failed, using heuristic: {e}")
+        
+        for eq_data, pred_result in zip(earthquakes, predictions):
+            if pred_result is not None:
+                prediction = pred_result.get('prediction', {})
+                risk_level = risk_level_from_category(prediction.get('tsunamiCategory', 'Low'))
+                max_wave_height = prediction.get('maxWaveHeight', 0.0)
+            else:
+                risk_level, max_wave_height = heuristic_risk(float(eq_data['magnitude']), float(eq_data['depth']))
+            
+            eq_data['tsunami_risk_level'] = risk_level
+            eq_data['max_wave_height'] = round(max_wave_height, 2)
+            eq_data['tsunami_potential'] = risk_level != "Rendah"
+            
     async def _save_batch(self, earthquakes: List[dict]):
         """Save a batch of earthquakes to database"""
         if not earthquakes:
@@ -89,14 +128,19 @@ class EarthquakeScheduler:
             
         # Use a new session for this batch
         async with AsyncSessionLocal() as db:
+            # Hanya gempa yang belum ada yang dianalisis dan disimpan
+            existing = await crud.get_existing_earthquake_ids(db, [eq['id'] for eq in earthquakes])
+            new_earthquakes = [eq for eq in earthquakes if eq['id'] not in existing]
+            if not new_earthquakes:
+                return
+            
+            await self._assess_batch(new_earthquakes)
+            
             count = 0
-            for eq_data in earthquakes:
+            for eq_data in new_earthquakes:
                 try:
-                    # Check if exists
-                    existing = await crud.get_earthquake_by_id(db, eq_data['id'])
-                    if not existing:
-                        await crud.save_earthquake_data(db, eq_data)
-                        count += 1
+                    await crud.save_earthquake_data(db, eq_data)
+                    count += 1
                 except Exception as e:
                     logger.error(f"Failed to save earthquake {eq_data.get('id')}: {e}")
                     continue
@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, asc, delete
-from typing import List, Dict, Any, Optional
+from sqlalchemy import select, func, desc, asc, delete, insert
+from typing import List, Dict, Any, Optional, Set
 from datetime import datetime
 import uuid
 import logging
@@ -13,6 +13,32 @@ logger = logging.getLogger(__name__)
 
 # ========== SIMULATION CRUD ==========
 
+async def _get_or_create_guest_user_id(db: AsyncSession, user_session_id: str) -> uuid.UUID:
+    """
+    ID user Guest untuk session id (dibuat jika belum ada)
+    """
+    # Look for existing guest by username matching session id
+    user_query = await db.execute(select(User).where(User.username == user_session_id))
+    guest_user = user_query.scalar_one_or_none()
+    
+    if not guest_user:
+        # Create a new guest user
+        guest_user = User(
+            email=f"{user_session_id}@guest.local",
+            username=user_session_id,
+            password_hash="guest_no_login_allowed_hash_dummy",
+            full_name=f"Guest User",
+            role=UserRole.GUEST,
+            is_active=True,
+            is_verified=True
+        )
+        db.add(guest_user)
+        await db.commit()
+        await db.refresh(guest_user)
+    
+    # Map the simulation to this guest user
+    return guest_user.id
+
 async def save_simulation_result(
     db: AsyncSession,
     params: Dict[str, Any],
@@ -21,7 +47,8 @@ async def save_simulation_result(
     user_session_id: Optional[str] = None,
     user_id: Optional[uuid.UUID] = None,
     ip_address: Optional[str] = None,
-    mode: str = "AI"
+    mode: str = "AI",
+    model_version: Optional[str] = None
 ) -> Simulation:
     """
     Menyimpan hasil simulasi ke database
@@ -33,27 +60,7 @@ async def save_simulation_result(
         
         # Check if we need to auto-create or assign a Guest user
         if not user_id and user_session_id:
-            # Look for existing guest by username matching session id
-            user_query = await db.execute(select(User).where(User.username == user_session_id))
-            guest_user = user_query.scalar_one_or_none()
-            
-            if not guest_user:
-                # Create a new guest user
-                guest_user = User(
-                    email=f"{user_session_id}@guest.local",
-                    username=user_session_id,
-                    password_hash="guest_no_login_allowed_hash_dummy",
-                    full_name=f"Guest User",
-                    role=UserRole.GUEST,
-                    is_active=True,
-                    is_verified=True
-                )
-                db.add(guest_user)
-                await db.commit()
-                await db.refresh(guest_user)
-            
-            # Map the simulation to this guest user
-            user_id = guest_user.id
+            user_id = await _get_or_create_guest_user_id(db, user_session_id)
 
         simulation = Simulation(
             magnitude=params['magnitude'],
@@ -68,7 +75,7 @@ async def save_simulation_result(
             user_session_id=user_session_id,
             user_id=user_id,
             ip_address=ip_address,
-            model_version="1.0.0"
+            model_version=model_version
         )
         
         db.add(simulation)
@@ -83,6 +90,57 @@ async def save_simulation_result(
         await db.rollback()
         raise
 
+async def save_simulation_results_bulk(
+    db: AsyncSession,
+    rows: List[Dict[str, Any]],
+    user_session_id: Optional[str] = None,
+    user_id: Optional[uuid.UUID] = None,
+    ip_address: Optional[str] = None
+) -> int:
+    """
+    Menyimpan banyak hasil simulasi dengan satu INSERT (executemany) dan satu commit.
+    
+    Args:
+        rows: dict dengan key params, result, mode, processing_time_ms, model_version
+    
+    Returns:
+        Jumlah baris yang disimpan
+    """
+    if not rows:
+        return 0
+    try:
+        if not user_id and user_session_id:
+            user_id = await _get_or_create_guest_user_id(db, user_session_id)
+        
+        now = datetime.utcnow()
+        await db.execute(insert(Simulation), [
+            {
+                "id": uuid.uuid4(),
+                "magnitude": row["params"]["magnitude"],
+                "depth": row["params"]["depth"],
+                "latitude": row["params"]["latitude"],
+                "longitude": row["params"]["longitude"],
+                "mode": row.get("mode", "AI"),
+                "prediction_data": row["result"],
+                "processing_time_ms": row.get("processing_time_ms"),
+                "model_version": row.get("model_version"),
+                "created_at": now,
+                "user_session_id": user_session_id,
+                "user_id": user_id,
+                "ip_address": ip_address
+            }
+            for row in rows
+        ])
+        await db.commit()
+        
+        logger.info(f"Saved {len(rows)} simulations (bulk)")
+        return len(rows)
+        
+    except Exception as e:
+        logger.error(f"Error saving simulations (bulk): {e}", exc_info=True)
+        await db.rollback()
+        raise
+
 async def get_simulation_by_id(db: AsyncSession, simulation_id: str) -> Optional[Dict]:
     """
     Mendapatkan simulasi berdasarkan ID
@@ -213,7 +271,11 @@ async def save_earthquake_data(db: AsyncSession, earthquake: Dict[str, Any]) ->
             # location=from_shape(point, srid=4326),
             location_name=earthquake.get('location', ''),
             timestamp=earthquake['timestamp'],
-            source=earthquake.get('source', 'BMKG')
+            source=earthquake.get('source', 'BMKG'),
+            # Hasil assessment saat ingest (EarthquakeScheduler), None jika belum dianalisis
+            tsunami_potential=earthquake.get('tsunami_potential', False),
+            tsunami_risk_level=earthquake.get('tsunami_risk_level'),
+            max_wave_height=earthquake.get('max_wave_height')
         )
         
         db.add(eq)
@@ -227,6 +289,17 @@ async def save_earthquake_data(db: AsyncSession, earthquake: Dict[str, Any]) ->
         await db.rollback()
         raise
 
+async def get_existing_earthquake_ids(db: AsyncSession, earthquake_ids: List[str]) -> Set[str]:
+    """
+    ID gempa yang sudah ada di database (satu query untuk satu batch scheduler)
+    """
+    if not earthquake_ids:
+        return set()
+    result = await db.execute(
+        select(Earthquake.id).where(Earthquake.id.in_(earthquake_ids))
+    )
+    return set(result.scalars().all())
+
 async def get_earthquake_by_id(db: AsyncSession, earthquake_id: str) -> Optional[Dict]:
     """
     Mendapatkan data gempa berdasarkan ID
@@ -246,7 +319,10 @@ async def get_earthquake_by_id(db: AsyncSession, earthquake_id: str) -> Optional
                 "longitude": eq.longitude,
                 "location": eq.location_name,
                 "timestamp": eq.timestamp.isoformat(),
-                "source": eq.source
+                "source": eq.source,
+                "tsunamiPotential": eq.tsunami_potential,
+                "riskLevel": eq.tsunami_risk_level,
+                "maxWaveHeight": eq.max_wave_height
             }
         return None
         
@@ -280,7 +356,10 @@ async def get_earthquake_history(
                 "longitude": eq.longitude,
                 "location": eq.location_name,
                 "timestamp": eq.timestamp.isoformat(),
-                "source": eq.source
+                "source": eq.source,
+                "tsunamiPotential": eq.tsunami_potential,
+                "riskLevel": eq.tsunami_risk_level,
+                "maxWaveHeight": eq.max_wave_height
             }
             for eq in earthquakes
         ]
@@ -289,6 +368,57 @@ async def get_earthquake_history(
         logger.error(f"Error fetching earthquake history: {e}", exc_info=True)
         return []
 
+async def get_earthquakes_in_bounds(
+    db: AsyncSession,
+    min_lon: float,
+    min_lat: float,
+    max_lon: float,
+    max_lat: float,
+    limit: int = 5000
+) -> List[Dict]:
+    """
+    Mendapatkan gempa di dalam bounding box (dipakai vector tile)
+    """
+    try:
+        result = await db.execute(
+            select(Earthquake)
+            .where(
+                Earthquake.longitude.between(min_lon, max_lon),
+                Earthquake.latitude.between(min_lat, max_lat)
+            )
+            .order_by(desc(Earthquake.magnitude))
+            .limit(limit)
+        )
+        return [
+            {
+                "id": eq.id,
+                "magnitude": eq.magnitude,
+                "depth": eq.depth,
+                "latitude": eq.latitude,
+                "longitude": eq.longitude,
+                "location": eq.location_name,
+                "timestamp": eq.timestamp.isoformat(),
+                "source": eq.source,
+                "tsunami_risk_level": eq.tsunami_risk_level
+            }
+            for eq in result.scalars().all()
+        ]
+        
+    except Exception as e:
+        logger.error(f"Error fetching earthquakes in bounds: {e}", exc_info=True)
+        return []
+
+async def get_earthquake_data_version(db: AsyncSession) -> str:
+    """
+    Versi data tabel earthquakes (jumlah baris + update terakhir), untuk key cache tile
+    """
+    result = await db.execute(
+        select(func.count(Earthquake.id), func.max(Earthquake.updated_at))
+    )
+    count, last_update = result.one()
+    stamp = int(last_update.timestamp()) if last_update else 0
+    return f"{count}-{stamp}"
+
 async def count_earthquakes(db: AsyncSession) -> int:
     """
     Menghitung total data gempa
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, DateTime, JSON, Text, Boolean, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, String, Float, Integer, DateTime, JSON, Text, Boolean, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 # from geoalchemy2 import Geometry  # TEMP: Commented out - requires GDAL/PROJ libraries
@@ -124,6 +124,11 @@ class Earthquake(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Sama dengan database_setup.sql; GET /realtime membaca urut timestamp terbaru
+    __table_args__ = (
+        Index("idx_earthquakes_timestamp", timestamp.desc()),
+    )
+    
     def __repr__(self):
         return f"<Earthquake {self.id}: M{self.magnitude} at {self.timestamp}>"
 
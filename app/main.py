@@ -3,16 +3,31 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.api.v1 import health, simulation, realtime, history, auth, admin, contacts
+from app.api.v1 import health, simulation, realtime, history, auth, admin, contacts, tiles
 from app.core.scheduler import scheduler
+from app.models.model_loader import create_inference_engine
+from app.models.model_watcher import ModelWatcher
+from app.services.prediction_service import PredictionService
+from app.services.simulation_jobs import SimulationJobQueue
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Start scheduler
-    await scheduler.start()
+    # Startup: Load ONNX model sekali, dibagikan ke semua route
+    app.state.prediction_service = PredictionService(engine=create_inference_engine())
+    # Startup: Antrian job simulasi (worker dimulai saat job pertama masuk)
+    app.state.job_queue = SimulationJobQueue(app.state.prediction_service)
+    # Startup: Hot reload model saat file MODEL_PATH / MODEL_CONFIG_PATH berubah
+    app.state.model_watcher = ModelWatcher(app.state.prediction_service)
+    if settings.MODEL_WATCH_ENABLED:
+        await app.state.model_watcher.start()
+    # Startup: Start scheduler (gempa baru dianalisis saat ingest)
+    await scheduler.start(prediction_service=app.state.prediction_service)
     yield
     # Shutdown: Stop scheduler
     await scheduler.stop()
+    await app.state.model_watcher.stop()
+    await app.state.job_queue.stop()
+    app.state.prediction_service.close()
 
 # ============================================
 # FastAPI App Instance
@@ -57,3 +72,4 @@ app.include_router(realtime.router, prefix="/api/v1/earthquakes", tags=["Real-Ti
 app.include_router(history.router, prefix="/api/v1/history", tags=["History"])
 app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
 app.include_router(contacts.router, prefix="/api/v1/contacts", tags=["Contacts"])
+app.include_router(tiles.router, prefix="/api/v1/tiles", tags=["Tiles"])
@@ -0,0 +1,82 @@
+"""
+Dynamic micro-batching untuk inference ONNX.
+Mengumpulkan input dari request yang datang bersamaan lalu menjalankannya
+sebagai satu tensor batch.
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Antrian async di depan ONNX session.
+
+    Input yang di-submit dikumpulkan selama `window_ms` atau sampai
+    `max_batch_size` tercapai, lalu `run_batch` dipanggil sekali dengan list
+    semua input (dan menyusunnya menjadi satu tensor batch).
+    Setiap pemanggil menerima baris hasilnya sendiri lewat future.
+    Batch dijalankan di `executor` agar event loop tidak ter-block.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int,
+        window_ms: float,
+        executor: Optional[Executor] = None
+    ):
+        self.run_batch = run_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()  # Simpan referensi agar task tidak di-GC
+
+    async def submit(self, sample: Any) -> Any:
+        """
+        Submit satu input dan tunggu hasilnya (baris output untuk input ini).
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((sample, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        samples = [sample for sample, _ in batch]
+        try:
+            outputs = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.run_batch, samples
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"Micro-batch executed: size={len(batch)}")
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
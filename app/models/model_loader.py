@@ -4,8 +4,9 @@ Handles loading ONNX models and performing inference
 """
 import os
 import json
+import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 
 try:
@@ -14,112 +15,279 @@ except ImportError:
     ort = None
 
 from app.config import settings
+from app.utils.hashing import file_sha256
 
+logger = logging.getLogger(__name__)
 
-class ModelLoader:
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": "ORT_DISABLE_ALL",
+    "basic": "ORT_ENABLE_BASIC",
+    "extended": "ORT_ENABLE_EXTENDED",
+    "all": "ORT_ENABLE_ALL",
+}
+EXECUTION_MODES = {
+    "sequential": "ORT_SEQUENTIAL",
+    "parallel": "ORT_PARALLEL",
+}
+
+
+MODEL_VARIANTS = ("fp32", "int8_dynamic", "int8_static", "fp16")
+
+
+def resolve_model_path(model_path: Optional[str] = None) -> Path:
+    """
+    Resolve path model relatif terhadap cwd, lalu terhadap root project.
+    """
+    model_path = model_path or settings.MODEL_PATH
+    if not os.path.exists(model_path):
+        # Try relative to project root
+        return Path(settings.BASE_DIR) / model_path
+    return Path(model_path)
+
+
+def model_variant_path(model_file: Path, variant: str) -> Path:
     """
-    Handles loading and inference of ONNX models
+    Path varian model hasil scripts/quantize_model.py, mis. model.int8_dynamic.onnx
     """
-    
+    # Idempotent: path yang sudah varian (mis. diteruskan ke worker process) tidak diubah
+    if variant == "fp32" or model_file.stem.endswith(f".{variant}"):
+        return model_file
+    return model_file.with_name(f"{model_file.stem}.{variant}{model_file.suffix}")
+
+
+class LoadedModel:
+    """
+    Snapshot model yang sudah ter-load dan di-warm-up. Tidak pernah diubah;
+    reload membuat snapshot baru lalu menggantinya dalam satu assignment.
+    """
+
+    __slots__ = ("session", "input_name", "path", "sha256", "variant", "config")
+
+    def __init__(self, session: Any, path: Path, sha256: str, variant: str, config: Optional[Dict]):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+        self.path = path
+        self.sha256 = sha256
+        self.variant = variant
+        self.config = config
+
+    @property
+    def version(self) -> str:
+        version = self.config.get("model_version", "unknown") if self.config else "unknown"
+        # Varian ikut di versi agar cache hasil prediksi tidak tercampur antar varian
+        return version if self.variant == "fp32" else f"{version}+{self.variant}"
+
+
+class InferenceEngine:
+    """
+    Satu-satunya pemegang ONNX InferenceSession di proses ini.
+
+    Dibuat sekali di lifespan FastAPI (lihat app/main.py) lalu dibagikan
+    ke semua route lewat dependency `get_prediction_service`.
+
+    Hot reload: `load_model` dapat dipanggil lagi saat server berjalan. Session baru
+    dibuat dan di-warm-up di thread pemanggil, lalu di-swap secara atomik; request yang
+    sedang berjalan selesai di session lama (masih dipegang lewat snapshot-nya).
+    """
+
     def __init__(self):
-        self.session: Optional[Any] = None
-        self.config: Optional[Dict] = None
-        self.model_loaded = False
-        
+        self._model: Optional[LoadedModel] = None
+
+    @property
+    def model_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def session(self) -> Optional[Any]:
+        return self._model.session if self._model else None
+
+    @property
+    def input_name(self) -> Optional[str]:
+        return self._model.input_name if self._model else None
+
+    @property
+    def model_path(self) -> Optional[Path]:
+        return self._model.path if self._model else None
+
+    @property
+    def model_sha256(self) -> Optional[str]:
+        return self._model.sha256 if self._model else None
+
+    @property
+    def variant(self) -> str:
+        return self._model.variant if self._model else "fp32"
+
+    @property
+    def config(self) -> Optional[Dict]:
+        return self._model.config if self._model else None
+
     def load_model(self, model_path: Optional[str] = None) -> bool:
         """
-        Load ONNX model from path
-        
+        Load (atau reload) ONNX model from path
+
         Args:
             model_path: Path to .onnx file, uses settings.MODEL_PATH if None
-            
+
         Returns:
-            bool: True if model loaded successfully
+            bool: True if model loaded successfully. Jika gagal, model lama tetap dipakai.
         """
         if ort is None:
-            print("⚠️ ONNX Runtime not installed. Run: pip install onnxruntime")
+            logger.error("❌ ONNX Runtime not installed. Run: pip install onnxruntime")
             return False
-            
-        model_path = model_path or settings.MODEL_PATH
-        model_file = Path(model_path)
-        
+
+        model_file = resolve_model_path(model_path)
+
+        # MODEL_VARIANT: pakai varian terkuantisasi jika sudah dibuat, selain itu FP32
+        variant = settings.MODEL_VARIANT.lower()
+        if variant != "fp32":
+            variant_file = model_variant_path(model_file, variant)
+            if variant_file.exists():
+                model_file = variant_file
+            else:
+                logger.warning(f"⚠️ Model variant '{variant}' not found at {variant_file}, using FP32")
+                variant = "fp32"
+
         if not model_file.exists():
-            print(f"⚠️ Model file not found: {model_path}")
-            print("Place your trained model (.onnx) in the trained_models/ directory")
+            logger.error(f"❌ Model file not found at {model_file}")
             return False
-            
+
         try:
             # Load ONNX model
             providers = ['CPUExecutionProvider']
             if settings.USE_GPU:
                 providers.insert(0, 'CUDAExecutionProvider')
-                
-            self.session = ort.InferenceSession(
-                str(model_file),
-                providers=providers
-            )
-            
+
+            # Fingerprint model, dipakai untuk validasi artefak turunan (scenario atlas, graph teroptimasi)
+            model_sha256 = file_sha256(model_file)
+            session = self._create_session(model_file, model_sha256, providers)
+
             # Load config if exists
-            config_path = Path(settings.MODEL_CONFIG_PATH)
+            config = None
+            config_path = resolve_model_path(settings.MODEL_CONFIG_PATH)
             if config_path.exists():
                 with open(config_path, 'r') as f:
-                    self.config = json.load(f)
-            
-            self.model_loaded = True
-            print(f"✅ Model loaded successfully: {model_path}")
+                    config = json.load(f)
+
+            model = LoadedModel(session, model_file, model_sha256, variant, config)
+            # Warm-up sebelum swap agar request pertama tidak menanggung inisialisasi session
+            self._warm_up(model)
+
+            reloaded = self._model is not None
+            self._model = model
+            logger.info(f"✅ Model {'reloaded' if reloaded else 'loaded'} successfully from {model_file} "
+                        f"(version {self.model_version})")
             return True
-            
+
         except Exception as e:
-            print(f"❌ Error loading model: {e}")
+            logger.error(f"❌ Failed to load model: {e}")
             return False
-    
-    def predict(self, input_data: np.ndarray) -> Dict[str, Any]:
+
+    @staticmethod
+    def _warm_up(model: LoadedModel):
+        """Satu inference dummy (dimensi dinamis = 1)"""
+        model_input = model.session.get_inputs()[0]
+        shape = [d if isinstance(d, int) and d > 0 else 1 for d in model_input.shape]
+        dtype = np.float16 if model_input.type == "tensor(float16)" else np.float32
+        model.session.run(None, {model.input_name: np.zeros(shape, dtype=dtype)})
+
+    @staticmethod
+    def _session_options(optimization_level: Optional[str] = None) -> "ort.SessionOptions":
+        """SessionOptions dari settings (ORT_*)"""
+        options = ort.SessionOptions()
+        level = optimization_level or settings.ORT_GRAPH_OPTIMIZATION_LEVEL
+        options.graph_optimization_level = getattr(
+            ort.GraphOptimizationLevel, GRAPH_OPTIMIZATION_LEVELS[level.lower()]
+        )
+        options.execution_mode = getattr(
+            ort.ExecutionMode, EXECUTION_MODES[settings.ORT_EXECUTION_MODE.lower()]
+        )
+        options.intra_op_num_threads = settings.ORT_INTRA_OP_THREADS
+        options.inter_op_num_threads = settings.ORT_INTER_OP_THREADS
+        options.enable_cpu_mem_arena = settings.ORT_ENABLE_CPU_MEM_ARENA
+        options.enable_mem_pattern = settings.ORT_ENABLE_MEM_PATTERN
+        return options
+
+    @staticmethod
+    def _optimized_model_path(model_file: Path, model_sha256: str, providers: List[str]) -> Path:
         """
-        Run inference on input data
-        
-        Args:
-            input_data: Numpy array with shape matching model input
-            
-        Returns:
-            Dict containing prediction results
+        Path graph teroptimasi. Graph level "all" bergantung pada hardware/provider,
+        jadi nama file memuat hash model, level, provider dan versi ONNX Runtime.
         """
-        if not self.model_loaded:
-            raise RuntimeError("Model not loaded. Call load_model() first.")
-            
+        provider = providers[0].replace("ExecutionProvider", "").lower()
+        name = (
+            f"{model_file.stem}.{model_sha256[:16]}.{settings.ORT_GRAPH_OPTIMIZATION_LEVEL.lower()}"
+            f".{provider}.ort{ort.__version__}.onnx"
+        )
+        return resolve_model_path(settings.ORT_OPTIMIZED_MODEL_DIR) / name
+
+    def _create_session(self, model_file: Path, model_sha256: str, providers: List[str]):
+        """
+        Buat InferenceSession. Dengan ORT_OPTIMIZED_MODEL_CACHE, graph teroptimasi disimpan
+        sekali lalu di-load pada startup berikutnya tanpa optimasi ulang.
+        """
+        if not settings.ORT_OPTIMIZED_MODEL_CACHE or settings.ORT_GRAPH_OPTIMIZATION_LEVEL.lower() == "disable":
+            return ort.InferenceSession(str(model_file), sess_options=self._session_options(), providers=providers)
+
+        optimized_file = self._optimized_model_path(model_file, model_sha256, providers)
+        if optimized_file.exists():
+            try:
+                session = ort.InferenceSession(
+                    str(optimized_file),
+                    sess_options=self._session_options(optimization_level="disable"),
+                    providers=providers
+                )
+                logger.info(f"✅ Loaded optimized graph from {optimized_file}")
+                return session
+            except Exception as e:
+                logger.warning(f"⚠️ Optimized graph tidak valid, dibuat ulang: {e}")
+                optimized_file.unlink(missing_ok=True)
+
+        # Tulis ke file sementara per proses lalu rename atomik (aman untuk banyak worker)
+        optimized_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = optimized_file.with_name(f"{optimized_file.name}.{os.getpid()}.tmp")
+        options = self._session_options()
+        options.optimized_model_filepath = str(tmp_file)
+        session = ort.InferenceSession(str(model_file), sess_options=options, providers=providers)
         try:
-            # Get input name
-            input_name = self.session.get_inputs()[0].name
-            
-            # Run inference
-            outputs = self.session.run(None, {input_name: input_data})
-            
-            # Process outputs
-            prediction = outputs[0]
-            
-            return {
-                "success": True,
-                "prediction": prediction.tolist(),
-                "model_version": self.config.get("model_version") if self.config else "unknown"
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            os.replace(tmp_file, optimized_file)
+            logger.info(f"✅ Optimized graph saved to {optimized_file}")
+        except OSError as e:
+            logger.warning(f"⚠️ Gagal menyimpan optimized graph: {e}")
+        return session
 
+    @property
+    def model_version(self) -> str:
+        model = self._model
+        return model.version if model is not None else "unknown"
+
+    def run(self, input_tensor: np.ndarray) -> np.ndarray:
+        """
+        Run inference on input tensor (N, 128, 128, 2).
+
+        Returns:
+            np.ndarray: Output pertama dari model (N, 128, 128, 1)
+        """
+        return self.run_versioned(input_tensor)[0]
+
+    def run_versioned(self, input_tensor: np.ndarray) -> Tuple[np.ndarray, str]:
+        """
+        Seperti run(), plus versi model yang benar-benar menjalankan call ini
+        (bisa berbeda dari model_version saat ini jika hot reload terjadi di tengah jalan).
+        """
+        # Snapshot diambil sekali: reload di tengah jalan tidak mempengaruhi call ini
+        model = self._model
+        if model is None:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
 
-# Global model instance
-_model_instance = None
+        outputs = model.session.run(None, {model.input_name: input_tensor})
+        return outputs[0], model.version
 
 
-def get_model() -> ModelLoader:
+def create_inference_engine() -> InferenceEngine:
     """
-    Get or create global model instance (singleton pattern)
+    Buat dan load engine. Gagal load model bukan error fatal:
+    PredictionService akan fallback ke heuristik.
     """
-    global _model_instance
-    if _model_instance is None:
-        _model_instance = ModelLoader()
-        # Try to load model on first access
-        _model_instance.load_model()
-    return _model_instance
+    engine = InferenceEngine()
+    engine.load_model()
+    return engine
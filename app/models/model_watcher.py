@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.config import settings
+from app.models.model_loader import model_variant_path, resolve_model_path
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """
+    Polling mtime/size MODEL_PATH (termasuk varian aktif) dan MODEL_CONFIG_PATH,
+    lalu memanggil PredictionService.reload_model saat berubah.
+
+    File yang masih disalin belum stabil, jadi reload baru dipicu jika perubahan
+    terlihat sama pada dua poll berturut-turut. Sama seperti EarthquakeScheduler,
+    cukup asyncio task tanpa library tambahan.
+    """
+
+    def __init__(self, prediction_service, interval_seconds: Optional[float] = None):
+        self.prediction_service = prediction_service
+        self.interval = interval_seconds or settings.MODEL_WATCH_INTERVAL
+        self.is_running = False
+        self._task = None
+
+    async def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._run_loop())
+        logger.info(f"Model watcher started (interval {self.interval}s).")
+
+    async def stop(self):
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        logger.info("Model watcher stopped.")
+
+    @staticmethod
+    def _watched_paths() -> List[Path]:
+        model_file = resolve_model_path(settings.MODEL_PATH)
+        paths = [model_file, resolve_model_path(settings.MODEL_CONFIG_PATH)]
+        variant_file = model_variant_path(model_file, settings.MODEL_VARIANT.lower())
+        if variant_file != model_file:
+            paths.append(variant_file)
+        return paths
+
+    def snapshot(self) -> Tuple:
+        """(mtime_ns, size) per file yang diawasi, None jika file tidak ada"""
+        state = []
+        for path in self._watched_paths():
+            try:
+                stat = path.stat()
+                state.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                state.append(None)
+        return tuple(state)
+
+    async def _run_loop(self):
+        last = self.snapshot()
+        pending = None
+        while self.is_running:
+            await asyncio.sleep(self.interval)
+            try:
+                current = self.snapshot()
+                if current == last:
+                    pending = None
+                    continue
+                if current != pending:
+                    # Tunggu satu interval lagi sampai file selesai ditulis
+                    pending = current
+                    continue
+
+                logger.info("Model file changed, reloading...")
+                result = await self.prediction_service.reload_model()
+                if result["reloaded"]:
+                    logger.info(f"✅ Model hot-reloaded: {result['previous_version']} -> {result['model_version']}")
+                else:
+                    logger.error("❌ Model reload failed, keeping previous model")
+                # Jangan retry file yang sama terus-menerus; tunggu perubahan berikutnya
+                last, pending = current, None
+            except Exception as e:
+                logger.error(f"Error in model watcher loop: {e}", exc_info=True)
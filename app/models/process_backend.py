@@ -0,0 +1,217 @@
+"""
+Process-pool inference backend (INFERENCE_BACKEND=process).
+
+Seluruh pipeline predict (input, ONNX, kontur, impact zones) dijalankan di
+worker process sehingga pre/post-processing Python tidak dibatasi GIL.
+Setiap worker me-load model ONNX sekali saat start; wave grid 128x128
+dikembalikan lewat shared memory, bukan di-pickle.
+"""
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+GRID_SHAPE = (128, 128)
+GRID_DTYPE = np.float32
+
+# State per worker process (diisi oleh _init_worker)
+_worker_service = None
+_worker_segments: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _init_worker(model_path: Optional[str]):
+    """Initializer worker: load model ONNX sekali per process"""
+    global _worker_service
+    from app.models.model_loader import InferenceEngine
+    from app.services.prediction_service import PredictionService
+
+    engine = InferenceEngine()
+    engine.load_model(model_path)
+    _worker_service = PredictionService(engine=engine, backend="thread")
+    logger.info(f"Inference worker {os.getpid()} ready (model_loaded={engine.model_loaded})")
+
+
+def _ping() -> int:
+    """No-op untuk memastikan worker sudah start dan model sudah ter-load"""
+    return os.getpid()
+
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    segment = _worker_segments.get(name)
+    if segment is None:
+        segment = shared_memory.SharedMemory(name=name)
+        _worker_segments[name] = segment
+    return segment
+
+
+def _run_in_worker(
+    scenarios: List[Dict[str, float]],
+    mode: str,
+    segment_name: Optional[str]
+) -> Tuple[List[Dict], List[bool]]:
+    """
+    Jalankan pipeline lengkap di worker. Wave grid ditulis ke segment shared memory
+    (dilewati jika segment_name None); return hasil JSON + flag baris grid mana yang valid.
+    """
+    results, grids = _worker_service._predict_batch_sync(scenarios, mode, return_grids=True)
+    if segment_name is None:
+        return results, [False] * len(scenarios)
+
+    segment = _attach_segment(segment_name)
+    out = np.ndarray((len(scenarios),) + GRID_SHAPE, dtype=GRID_DTYPE, buffer=segment.buf)
+    has_grid = []
+    for i, grid in enumerate(grids):
+        ok = grid is not None
+        if ok:
+            out[i] = grid
+        has_grid.append(ok)
+    return results, has_grid
+
+
+def _run_grids_in_worker(scenarios: List[Tuple[float, float, float]], segment_name: str) -> int:
+    """
+    Run model saja (tanpa post-processing) dan tulis wave grid ke segment shared memory.
+    """
+    grids = _worker_service._run_scenarios(scenarios)
+    segment = _attach_segment(segment_name)
+    out = np.ndarray((len(scenarios),) + GRID_SHAPE, dtype=GRID_DTYPE, buffer=segment.buf)
+    out[:] = grids
+    return len(scenarios)
+
+
+class ProcessInferenceBackend:
+    """
+    Pool worker process + pool segment shared memory untuk wave grid.
+    """
+
+    def __init__(self, processes: int, model_path: Optional[str] = None, model_version: Optional[str] = None):
+        self.processes = processes or os.cpu_count() or 1
+        # Versi model yang di-load worker (untuk grid mentah dari predict_wave_grids)
+        self.model_version = model_version
+        self.chunk_size = max(1, settings.INFERENCE_MAX_BATCH)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path,)
+        )
+
+        # Satu segment per chunk yang sedang diproses; 2x jumlah worker agar pool tetap penuh
+        segment_size = self.chunk_size * int(np.prod(GRID_SHAPE)) * np.dtype(GRID_DTYPE).itemsize
+        self._segments = [
+            shared_memory.SharedMemory(create=True, size=segment_size)
+            for _ in range(self.processes * 2)
+        ]
+        self._free: Optional[asyncio.Queue] = None
+        self._inflight = 0
+        logger.info(f"✅ Process inference backend started: {self.processes} workers")
+
+    def _free_segments(self) -> asyncio.Queue:
+        # Queue dibuat lazy agar terikat ke event loop yang sedang berjalan
+        if self._free is None:
+            self._free = asyncio.Queue()
+            for segment in self._segments:
+                self._free.put_nowait(segment)
+        return self._free
+
+    async def predict_batch(
+        self,
+        scenarios: List[Dict[str, float]],
+        mode: str = "AI",
+        return_grids: bool = False
+    ) -> Tuple[List[Dict[str, Any]], List[Optional[np.ndarray]]]:
+        """
+        Bagi skenario menjadi chunk, jalankan paralel di worker.
+
+        Args:
+            return_grids: salin wave grid dari shared memory; jika False grid tidak ditulis
+                          worker dan seluruh elemen list grid bernilai None
+
+        Returns:
+            (hasil predict per skenario, wave grid per skenario atau None)
+        """
+        chunks = [
+            scenarios[offset:offset + self.chunk_size]
+            for offset in range(0, len(scenarios), self.chunk_size)
+        ]
+        self._inflight += 1
+        try:
+            outputs = await asyncio.gather(*[self._run_chunk(chunk, mode, return_grids) for chunk in chunks])
+        finally:
+            self._inflight -= 1
+
+        results: List[Dict[str, Any]] = []
+        grids: List[Optional[np.ndarray]] = []
+        for chunk_results, chunk_grids in outputs:
+            results.extend(chunk_results)
+            grids.extend(chunk_grids)
+        return results, grids
+
+    async def predict_wave_grids(self, scenarios: List[Tuple[float, float, float]]) -> List[np.ndarray]:
+        """
+        Wave grid mentah per (magnitude, latitude, longitude), tanpa post-processing.
+        """
+        free = self._free_segments()
+        grids: List[np.ndarray] = []
+        self._inflight += 1
+        try:
+            for offset in range(0, len(scenarios), self.chunk_size):
+                chunk = scenarios[offset:offset + self.chunk_size]
+                segment = await free.get()
+                try:
+                    await asyncio.get_running_loop().run_in_executor(
+                        self.pool, _run_grids_in_worker, chunk, segment.name
+                    )
+                    view = np.ndarray((len(chunk),) + GRID_SHAPE, dtype=GRID_DTYPE, buffer=segment.buf)
+                    grids.extend(view[i].copy() for i in range(len(chunk)))
+                finally:
+                    free.put_nowait(segment)
+        finally:
+            self._inflight -= 1
+        return grids
+
+    async def _run_chunk(self, chunk: List[Dict[str, float]], mode: str, return_grids: bool):
+        loop = asyncio.get_running_loop()
+        if not return_grids:
+            # Hanya hasil JSON yang dipakai: tanpa segment shared memory dan tanpa salinan grid
+            results, _ = await loop.run_in_executor(self.pool, _run_in_worker, chunk, mode, None)
+            return results, [None] * len(chunk)
+
+        free = self._free_segments()
+        segment = await free.get()
+        try:
+            results, has_grid = await loop.run_in_executor(
+                self.pool, _run_in_worker, chunk, mode, segment.name
+            )
+            view = np.ndarray((len(chunk),) + GRID_SHAPE, dtype=GRID_DTYPE, buffer=segment.buf)
+            grids = [view[i].copy() if ok else None for i, ok in enumerate(has_grid)]
+            return results, grids
+        finally:
+            free.put_nowait(segment)
+
+    async def warm_up(self):
+        """Start semua worker (spawn + load model) sebelum backend menerima request"""
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*[loop.run_in_executor(self.pool, _ping) for _ in range(self.processes)])
+        logger.info(f"Process backend warmed up: {len(set(pids))} workers")
+
+    async def aclose(self):
+        """Tunggu request yang sedang berjalan selesai, lalu shutdown (dipakai saat hot reload)"""
+        while self._inflight:
+            await asyncio.sleep(0.05)
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
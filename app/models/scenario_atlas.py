@@ -0,0 +1,173 @@
+"""
+Offline scenario atlas: tinggi gelombang maksimum output model ONNX yang
+di-precompute untuk grid (magnitudo x sel epicenter) di domain Selat Sunda,
+disimpan sebagai .npy yang di-memory-map dan dijawab dengan interpolasi multilinear.
+
+Atlas hanya menyimpan skalar max wave. Wave grid tidak di-interpolasi antar
+epicenter: campuran dua gelombang yang bergeser bukan gelombang di posisi
+tengahnya. Karena itu atlas hanya dipakai untuk request tanpa kontur model
+(PredictionService.predict(contours=False)): max wave / kategori tanpa inference,
+zona genangan dari elips fallback. Request dengan kontur selalu menjalankan model.
+
+Catatan: input model hanya bergantung pada magnitudo dan sel epicenter
+(kedalaman tidak masuk ke tensor input), sehingga atlas tidak punya sumbu depth.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.input_builder import InputBuilder
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "meta.json"
+MAX_WAVE_FILE = "max_wave.npy"
+
+
+class ScenarioAtlas:
+    """
+    Lookup atlas yang di-memory-map.
+
+    - max_wave.npy: (M, Y, X) float32, tinggi gelombang maksimum full-resolution
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        with open(self.directory / META_FILE) as f:
+            self.meta: Dict[str, Any] = json.load(f)
+
+        self.magnitudes = np.asarray(self.meta["magnitudes"], dtype=np.float64)
+        self.cell_ys = np.asarray(self.meta["cell_ys"], dtype=np.float64)
+        self.cell_xs = np.asarray(self.meta["cell_xs"], dtype=np.float64)
+
+        self.max_wave = np.load(self.directory / MAX_WAVE_FILE, mmap_mode="r")
+        self.input_builder = InputBuilder()
+
+    @classmethod
+    def load(cls, directory: Path, model_sha256: Optional[str] = None) -> Optional["ScenarioAtlas"]:
+        """
+        Load atlas jika ada dan dibuat dari model yang sama; selain itu return None.
+        """
+        directory = Path(directory)
+        if not (directory / META_FILE).exists():
+            return None
+        try:
+            atlas = cls(directory)
+        except Exception as e:
+            logger.error(f"❌ Failed to load scenario atlas: {e}")
+            return None
+
+        if model_sha256 is not None and atlas.meta.get("model_sha256") != model_sha256:
+            logger.warning("⚠️ Scenario atlas dibuat dari model lain, atlas tidak dipakai")
+            return None
+        # Output atlas hanya valid untuk depth channel yang sama dengan input saat ini
+        if atlas.meta.get("depth_channel_sha256") != atlas.input_builder.depth_channel_sha256:
+            logger.warning("⚠️ Scenario atlas dibuat dengan depth channel lain, atlas tidak dipakai")
+            return None
+
+        logger.info(
+            f"✅ Scenario atlas loaded: {len(atlas.magnitudes)} magnitudes x "
+            f"{len(atlas.cell_ys)}x{len(atlas.cell_xs)} epicenter cells"
+        )
+        return atlas
+
+    def covers(self, magnitude: float, latitude: float, longitude: float) -> bool:
+        grid_x, grid_y = self.input_builder.grid_cell(latitude, longitude)
+        return (
+            self.magnitudes[0] <= magnitude <= self.magnitudes[-1]
+            and self.cell_ys[0] <= grid_y <= self.cell_ys[-1]
+            and self.cell_xs[0] <= grid_x <= self.cell_xs[-1]
+        )
+
+    @staticmethod
+    def _bracket(axis: np.ndarray, value: float) -> Tuple[int, float]:
+        """Index bawah dan bobot interpolasi pada sumbu terurut"""
+        if len(axis) == 1:
+            return 0, 0.0
+        i = int(np.clip(np.searchsorted(axis, value, side="right") - 1, 0, len(axis) - 2))
+        t = (value - axis[i]) / (axis[i + 1] - axis[i])
+        return i, float(min(max(t, 0.0), 1.0))
+
+    def lookup(self, magnitude: float, latitude: float, longitude: float) -> float:
+        """
+        Interpolasi multilinear (magnitudo, sel y, sel x) tinggi gelombang maksimum.
+        """
+        grid_x, grid_y = self.input_builder.grid_cell(latitude, longitude)
+        im, tm = self._bracket(self.magnitudes, magnitude)
+        iy, ty = self._bracket(self.cell_ys, grid_y)
+        ix, tx = self._bracket(self.cell_xs, grid_x)
+
+        # Index 2 sudut per sumbu (sama jika sumbu hanya punya satu titik)
+        ms = [im, min(im + 1, len(self.magnitudes) - 1)]
+        ys = [iy, min(iy + 1, len(self.cell_ys) - 1)]
+        xs = [ix, min(ix + 1, len(self.cell_xs) - 1)]
+        weights = np.einsum("i,j,k->ijk", [1.0 - tm, tm], [1.0 - ty, ty], [1.0 - tx, tx])
+
+        return float(np.sum(weights * self.max_wave[np.ix_(ms, ys, xs)]))
+
+
+def build_atlas(
+    run_scenarios,
+    directory: Path,
+    magnitudes: Sequence[float],
+    cell_stride: int,
+    model_sha256: str,
+    model_version: str,
+    batch_size: int = 32,
+    grid_size: int = 128
+) -> Dict[str, Any]:
+    """
+    Precompute atlas dengan `run_scenarios` (list (magnitude, lat, lon) -> wave grid (N, H, W)),
+    memakai konstruksi input yang sama dengan PredictionService. Array ditulis streaming
+    lewat open_memmap sehingga atlas besar tidak perlu muat di RAM.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    builder = InputBuilder()
+    cells = list(range(0, grid_size, cell_stride))
+    if cells[-1] != grid_size - 1:
+        cells.append(grid_size - 1)
+
+    max_wave = np.lib.format.open_memmap(
+        directory / MAX_WAVE_FILE, mode="w+", dtype=np.float32,
+        shape=(len(magnitudes), len(cells), len(cells))
+    )
+
+    # Koordinat pusat sel -> lat/lon, sehingga InputBuilder.grid_cell memetakan kembali ke sel yang sama
+    def cell_center(cell: int, minimum: float, span: float) -> float:
+        return minimum + (cell + 0.5) / grid_size * span
+
+    index = [(m, y, x) for m in range(len(magnitudes)) for y in range(len(cells)) for x in range(len(cells))]
+    for offset in range(0, len(index), batch_size):
+        chunk = index[offset:offset + batch_size]
+        scenarios = [
+            (
+                float(magnitudes[m]),
+                cell_center(cells[y], builder.min_lat, builder.lat_range),
+                cell_center(cells[x], builder.min_lon, builder.lon_range),
+            )
+            for m, y, x in chunk
+        ]
+        grids = np.asarray(run_scenarios(scenarios), dtype=np.float32)
+        peaks = grids.max(axis=(1, 2))
+        for k, (m, y, x) in enumerate(chunk):
+            max_wave[m, y, x] = peaks[k]
+
+    max_wave.flush()
+
+    meta = {
+        "model_sha256": model_sha256,
+        "model_version": model_version,
+        "magnitudes": [float(m) for m in magnitudes],
+        "cell_ys": cells,
+        "cell_xs": cells,
+        "grid_size": grid_size,
+        "depth_channel_sha256": builder.depth_channel_sha256,
+    }
+    with open(directory / META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
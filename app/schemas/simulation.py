@@ -44,6 +44,11 @@ class InundationZone(BaseModel):
     coordinates: List[List[List[float]]]  # GeoJSON polygon
     height: float  # meter
 
+class Isochrone(BaseModel):
+    """Schema untuk kontur waktu tiba gelombang"""
+    minutes: int  # menit sejak gempa
+    coordinates: List[List[List[float]]]  # GeoJSON polygon
+
 class Epicenter(BaseModel):
     """Schema untuk epicenter"""
     latitude: float
@@ -56,12 +61,18 @@ class PredictionData(BaseModel):
     affectedArea: float  # km²
     tsunamiCategory: str  # Low, Medium, High, Extreme
     estimatedCasualties: Optional[int] = 0
+    modelVersion: Optional[str] = None  # Versi model yang menghasilkan output, None untuk heuristik
 
 class WaveData(BaseModel):
     """Schema untuk data gelombang temporal"""
     time: int  # menit
     waveHeight: float  # meter
 
+class ZoneWaveData(BaseModel):
+    """Schema time series gelombang per impact zone (kolumnar)"""
+    time: List[int]  # menit, sumbu waktu bersama
+    waveHeight: List[List[float]]  # [zona][waktu] meter, urutan sama dengan impactZones
+
 class SimulationResult(BaseModel):
     """Schema untuk hasil simulasi lengkap"""
     prediction: PredictionData
@@ -69,6 +80,8 @@ class SimulationResult(BaseModel):
     inundationZones: List[InundationZone]
     impactZones: List[ImpactZone]
     waveData: List[WaveData]
+    impactZoneWaveData: Optional[ZoneWaveData] = None
+    isochrones: Optional[List[Isochrone]] = None  # Hanya jika bathymetry tersedia
 
 class SimulationResponse(BaseModel):
     """Response schema untuk simulasi"""
@@ -111,3 +124,77 @@ class SimulationResponse(BaseModel):
                 "timestamp": "2025-12-01T00:00:00"
             }
         }
+
+class BatchSimulationRequest(BaseModel):
+    """Request schema untuk simulasi massal (respons NDJSON)"""
+    scenarios: List[SimulationRequest] = Field(..., min_length=1, max_length=10000)
+    persist: bool = Field(True, description="Simpan hasil ke database (bulk insert per chunk)")
+
+class SweepRange(BaseModel):
+    """Rentang satu parameter sweep: steps nilai berjarak sama dari min sampai max (inklusif)"""
+    min: float
+    max: float
+    steps: int = Field(1, ge=1, le=1000)
+    
+    @validator('max')
+    def validate_max(cls, v, values):
+        if 'min' in values and v < values['min']:
+            raise ValueError('max harus >= min')
+        return v
+
+class SweepRequest(BaseModel):
+    """Request schema untuk parameter sweep (respons kolom npz / parquet)"""
+    magnitude: SweepRange
+    depth: SweepRange
+    latitude: SweepRange
+    longitude: SweepRange
+    mode: str = Field("AI", description="Mode simulasi: 'AI' (Selat Sunda) atau 'HEURISTIC' (Umum)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "magnitude": {"min": 6.5, "max": 9.0, "steps": 26},
+                "depth": {"min": 10.0, "max": 60.0, "steps": 6},
+                "latitude": {"min": -6.6, "max": -5.6, "steps": 11},
+                "longitude": {"min": 105.0, "max": 106.0, "steps": 11},
+                "mode": "AI"
+            }
+        }
+
+class EnsembleRequest(SimulationRequest):
+    """Request schema untuk simulasi ensemble (Monte Carlo); std None = default dari settings"""
+    members: Optional[int] = Field(None, ge=2, description="Jumlah anggota ensemble (K), maks settings.ENSEMBLE_MAX_MEMBERS")
+    magnitude_std: Optional[float] = Field(None, ge=0.0, le=2.0, description="Std deviasi magnitudo")
+    depth_std: Optional[float] = Field(None, ge=0.0, le=200.0, description="Std deviasi kedalaman (km)")
+    location_std_km: Optional[float] = Field(None, ge=0.0, le=200.0, description="Std deviasi epicenter (km)")
+    seed: Optional[int] = Field(None, description="Seed RNG agar hasil dapat direproduksi")
+
+class MaxWaveDistribution(BaseModel):
+    """Schema distribusi tinggi gelombang maksimum antar anggota ensemble"""
+    mean: float
+    std: float
+    min: float
+    max: float
+    percentiles: Dict[str, float]  # {"p5": ..., "p50": ..., "p95": ...}
+    histogram: Dict[str, List[float]]  # {"edges": [...], "counts": [...]}
+
+class ExceedanceContour(BaseModel):
+    """Schema kontur probabilitas tinggi gelombang melebihi threshold"""
+    threshold: float  # meter
+    probability: float  # 0..1
+    coordinates: List[List[List[float]]]  # GeoJSON polygon
+
+class EnsembleResult(BaseModel):
+    """Schema hasil simulasi ensemble"""
+    members: int
+    prediction: SimulationResult  # Hasil lengkap untuk parameter nominal
+    maxWaveDistribution: MaxWaveDistribution
+    percentileGrids: Optional[Dict[str, str]] = None  # base64 payload float16 (app/utils/grid_encoding.py)
+    exceedanceContours: List[ExceedanceContour]
+    processingTimeMs: int
+
+class EnsembleResponse(BaseModel):
+    """Response schema untuk simulasi ensemble"""
+    status: str
+    data: EnsembleResult
+    message: Optional[str] = None
@@ -0,0 +1,105 @@
+import csv
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+# Dipakai jika data/coastlines/coastal_points.csv tidak ada
+DEFAULT_COASTAL_POINTS = [
+    ("Pantai Anyer", "beach", -6.034, 105.826),
+    ("Labuan", "town", -6.394, 105.793),
+    ("Carita", "beach", -6.301, 105.656),
+    ("Sumur", "village", -6.650, 105.583),
+    ("Cilegon", "city", -6.003, 106.001),
+]
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Jarak great-circle (km) dari satu titik ke array titik, vectorized"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _unit_vectors(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    lat, lon = np.radians(lats), np.radians(lons)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+class CoastalGazetteer:
+    """
+    Titik pesisir (desa, pelabuhan, pantai) dalam array NumPy contiguous.
+
+    Format CSV (header wajib): name,type,latitude,longitude
+
+    Untuk gazetteer besar (>= IMPACT_KDTREE_MIN_POINTS) titik di-index dengan
+    cKDTree pada vektor satuan 3D; query radius great-circle menjadi query chord
+    Euclidean, lalu jarak persis dihitung ulang hanya untuk kandidat.
+    """
+
+    def __init__(self, names: List[str], kinds: List[str], lats: np.ndarray, lons: np.ndarray):
+        self.names = np.asarray(names, dtype=object)
+        self.kinds = np.asarray(kinds, dtype=object)
+        self.lats = np.ascontiguousarray(lats, dtype=np.float64)
+        self.lons = np.ascontiguousarray(lons, dtype=np.float64)
+
+        self.tree = None
+        if cKDTree is not None and len(self.lats) >= settings.IMPACT_KDTREE_MIN_POINTS:
+            self.tree = cKDTree(_unit_vectors(self.lats, self.lons))
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "CoastalGazetteer":
+        path = Path(path or settings.COASTAL_POINTS_FILE)
+        if not path.exists():
+            logger.warning(f"⚠️ Coastal gazetteer not found at {path}, using built-in points")
+            names, kinds, lats, lons = zip(*DEFAULT_COASTAL_POINTS)
+            return cls(list(names), list(kinds), np.array(lats), np.array(lons))
+
+        names, kinds, lats, lons = [], [], [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                names.append(row["name"])
+                kinds.append(row.get("type") or "")
+                lats.append(float(row["latitude"]))
+                lons.append(float(row["longitude"]))
+
+        gazetteer = cls(names, kinds, np.array(lats), np.array(lons))
+        logger.info(f"✅ Coastal gazetteer loaded: {len(gazetteer)} points"
+                    f"{' (KD-tree)' if gazetteer.tree is not None else ''}")
+        return gazetteer
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Index titik dalam radius_km dari (lat, lon) dan jaraknya (km), urut sesuai index.
+        """
+        if radius_km <= 0 or len(self) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        if self.tree is not None:
+            chord = 2.0 * np.sin(min(radius_km / EARTH_RADIUS_KM, np.pi) / 2.0)
+            center = _unit_vectors(np.array([lat]), np.array([lon]))[0]
+            # Sedikit diperbesar agar titik tepat di batas tidak hilang karena pembulatan
+            idx = np.sort(np.asarray(self.tree.query_ball_point(center, chord * (1 + 1e-9)), dtype=np.intp))
+            distances = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+        else:
+            idx = np.arange(len(self))
+            distances = haversine_km(lat, lon, self.lats, self.lons)
+
+        mask = distances < radius_km
+        return idx[mask], distances[mask]
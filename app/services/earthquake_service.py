@@ -1,6 +1,6 @@
 import aiohttp
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import xml.etree.ElementTree as ET
 import hashlib
@@ -9,6 +9,22 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+def risk_level_from_category(category: str) -> str:
+    """Map tsunamiCategory hasil prediksi ke level risiko realtime (Bahaya/Sedang/Rendah)"""
+    if category in ("Extreme", "High"):
+        return "Bahaya"
+    if category == "Medium":
+        return "Sedang"
+    return "Rendah"
+
+def heuristic_risk(magnitude: float, depth: float) -> Tuple[str, float]:
+    """Level risiko dan tinggi gelombang (m) kasar jika prediksi tidak tersedia"""
+    if magnitude >= 7.5 and depth < 50:
+        return "Bahaya", (magnitude - 6.5) * 2
+    if magnitude >= 7.0 and depth < 70:
+        return "Sedang", (magnitude - 6.0) * 1.5
+    return "Rendah", 0.0
+
 class EarthquakeService:
     """
     Service untuk fetch data gempa dari BMKG atau USGS
@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL in-process untuk hasil PredictionService.predict.
+
+    Parameter gempa dikuantisasi (mis. 0.05 magnitudo, 0.01°) sehingga skenario
+    yang hampir sama dari slider WebGIS memakai entry yang sama. Versi model
+    ikut menjadi bagian key, jadi ganti model otomatis tidak memakai hasil lama.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        magnitude_step: float,
+        depth_step: float,
+        coord_step: float
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds
+        self.magnitude_step = magnitude_step
+        self.depth_step = depth_step
+        self.coord_step = coord_step
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _quantize(value: float, step: float) -> float:
+        if step <= 0:
+            return value
+        return round(value / step)
+
+    def make_key(
+        self,
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        mode: str,
+        model_version: str
+    ) -> Hashable:
+        return (
+            self._quantize(magnitude, self.magnitude_step),
+            self._quantize(depth, self.depth_step),
+            self._quantize(latitude, self.coord_step),
+            self._quantize(longitude, self.coord_step),
+            mode,
+            model_version,
+        )
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Hapus semua entry (mis. setelah model diganti)"""
+        with self._lock:
+            self._entries.clear()
+        logger.info("Prediction cache invalidated")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -1,14 +1,29 @@
 import numpy as np
 import logging
-from typing import Dict, Any, List, Optional
+import base64
+from typing import Dict, Any, List, Optional, Callable, Tuple, AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import time
-import os
 import math
 
 from app.config import settings
+from app.models.model_loader import InferenceEngine, create_inference_engine, resolve_model_path
+from app.models.micro_batcher import MicroBatcher
+from app.models.input_builder import InputBuilder
+from app.models.scenario_atlas import ScenarioAtlas
+from app.services.prediction_cache import PredictionCache
+from app.services.coastal_gazetteer import EARTH_RADIUS_KM, CoastalGazetteer, haversine_km
+from app.services.travel_time import TravelTimeEngine
+from app.utils.geojson_utils import grid_contour_to_ring
+from app.utils.grid_encoding import encode_float16
+from app.utils.sweep_encoding import encode_npz, encode_parquet
 
 logger = logging.getLogger(__name__)
 
+# Urutan kode kategori pada hasil parameter sweep (kolom "category", uint8)
+TSUNAMI_CATEGORIES = ("Minimal", "Low", "Medium", "High", "Extreme")
+
 class PredictionService:
     """
     Service untuk menjalankan prediksi tsunami menggunakan model SSL-ViT-CNN.
@@ -17,34 +32,122 @@ class PredictionService:
     Untuk production, replace dengan model PyTorch/ONNX yang sudah dilatih.
     """
     
-    def __init__(self):
-        self.model = None
-        self.model_loaded = False
-        self._load_model()
+    def __init__(self, engine: Optional[InferenceEngine] = None, backend: Optional[str] = None):
+        # Engine dibagikan antar request; buat baru hanya untuk pemakaian standalone (script/CLI)
+        self.engine = engine if engine is not None else create_inference_engine()
+        
+        # INFERENCE_BACKEND=process: seluruh pipeline predict dijalankan di worker process
+        self.process_backend = None
+        if (backend or settings.INFERENCE_BACKEND) == "process":
+            from app.models.process_backend import ProcessInferenceBackend
+            self.process_backend = ProcessInferenceBackend(
+                settings.INFERENCE_PROCESSES,
+                model_path=str(self.engine.model_path) if self.engine.model_path else None,
+                model_version=self.engine.model_version
+            )
+        
+        # Grid koordinat di-cache, buffer input di-pool per thread
+        self.input_builder = InputBuilder()
+        
+        # Titik pesisir untuk impact zones (data/coastlines/coastal_points.csv)
+        self.gazetteer = CoastalGazetteer.load()
+        
+        # ETA dari bathymetry (data/bathymetry/); None = ETA heuristik
+        self.travel_time = TravelTimeEngine.load()
+        
+        # Fast path: output ONNX yang sudah di-precompute (scripts/build_scenario_atlas.py)
+        self.atlas = self._load_atlas()
+        self._reload_lock = asyncio.Lock()
+        
+        # Pekerjaan CPU-bound (ONNX, NumPy, kontur) dijalankan di sini, bukan di event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.INFERENCE_THREADS,
+            thread_name_prefix="prediction"
+        )
+        # Request /simulation/run yang bersamaan digabung menjadi satu session.run
+        self.batcher = MicroBatcher(
+            self._run_micro_batch,
+            max_batch_size=settings.BATCH_SIZE,
+            window_ms=settings.MICRO_BATCH_WINDOW_MS,
+            executor=self.executor
+        )
+        # Cache hasil untuk skenario berulang / hampir sama (slider WebGIS, polling realtime)
+        self.cache = PredictionCache(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.CACHE_TTL,
+            magnitude_step=settings.CACHE_MAGNITUDE_STEP,
+            depth_step=settings.CACHE_DEPTH_STEP,
+            coord_step=settings.CACHE_COORD_STEP
+        ) if settings.CACHE_ENABLED else None
+    
+    @property
+    def model_loaded(self) -> bool:
+        return self.engine.model_loaded
     
-    def _load_model(self):
+    def _load_atlas(self) -> Optional[ScenarioAtlas]:
+        if not (settings.SCENARIO_ATLAS_ENABLED and self.model_loaded):
+            return None
+        return ScenarioAtlas.load(
+            resolve_model_path(settings.SCENARIO_ATLAS_DIR),
+            model_sha256=self.engine.model_sha256
+        )
+    
+    async def reload_model(self, model_path: Optional[str] = None) -> Dict[str, Any]:
         """
-        Load trained model dari file ONNX
+        Hot reload model tanpa restart server.
+        
+        Session baru di-load dan di-warm-up di thread pool lalu di-swap atomik di engine;
+        request yang sedang berjalan selesai di session lama. Setelah itu artefak turunan
+        (scenario atlas, worker process) diganti dan cache hasil di-invalidate paling akhir,
+        setelah tidak ada lagi request baru yang dijalankan model lama. Hasil disimpan ke cache
+        dengan versi model yang menghasilkannya (prediction.modelVersion), jadi hasil model
+        lama yang selesai setelah swap tidak terbaca sebagai hasil model baru.
+        Jika load gagal, model lama tetap dipakai.
         """
-        try:
-            import onnxruntime as ort
-            model_path = settings.MODEL_PATH
-            # Ensure path is absolute or relative to cwd
-            if not os.path.exists(model_path):
-                 # Try relative to project root
-                 model_path = os.path.join(settings.BASE_DIR, settings.MODEL_PATH)
+        async with self._reload_lock:
+            previous_version = self.engine.model_version
+            previous_sha256 = self.engine.model_sha256
+            start_time = time.time()
             
-            if os.path.exists(model_path):
-                self.model = ort.InferenceSession(model_path)
-                self.model_loaded = True
-                logger.info(f"✅ Model loaded successfully from {model_path}")
-            else:
-                logger.error(f"❌ Model file not found at {model_path}")
-                self.model_loaded = False
+            loaded = await self._run_in_executor(self.engine.load_model, model_path)
+            if loaded:
+                self.atlas = await self._run_in_executor(self._load_atlas)
+                
+                previous_backend = None
+                if self.process_backend is not None:
+                    from app.models.process_backend import ProcessInferenceBackend
+                    backend = ProcessInferenceBackend(
+                        settings.INFERENCE_PROCESSES,
+                        model_path=str(self.engine.model_path),
+                        model_version=self.engine.model_version
+                    )
+                    # Worker baru sudah me-load model sebelum menerima request
+                    await backend.warm_up()
+                    previous_backend, self.process_backend = self.process_backend, backend
                 
-        except Exception as e:
-            logger.error(f"❌ Failed to load model: {e}")
-            self.model_loaded = False
+                # Terakhir: setelah swap tidak ada request baru yang masuk ke model lama
+                if self.cache is not None:
+                    self.cache.invalidate()
+                if previous_backend is not None:
+                    await previous_backend.aclose()
+            
+            return {
+                "reloaded": loaded,
+                "model_version": self.engine.model_version,
+                "previous_version": previous_version,
+                "model_sha256": self.engine.model_sha256,
+                "model_changed": loaded and self.engine.model_sha256 != previous_sha256,
+                "reload_ms": int((time.time() - start_time) * 1000)
+            }
+    
+    def close(self):
+        """Shutdown thread/process pool (dipanggil saat lifespan shutdown)"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.process_backend is not None:
+            self.process_backend.close()
+    
+    async def _run_in_executor(self, func: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
     
     async def predict(
         self,
@@ -52,123 +155,877 @@ class PredictionService:
         depth: float,
         latitude: float,
         longitude: float,
-        mode: str = "AI"
+        mode: str = "AI",
+        contours: bool = True
     ) -> Dict[str, Any]:
         """
         Run tsunami prediction using ONNX model (AI) or Heuristics (General).
+        
+        contours=False: jika request di dalam scenario atlas, maxWaveHeight/kategori dijawab
+        dari atlas tanpa inference dan zona genangan memakai elips fallback (query "what-if").
         """
+        cache_key = self._cache_key(magnitude, depth, latitude, longitude, mode)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return self._from_cache(cached, latitude, longitude)
+        
+        atlas_max = None if contours else self._atlas_max_wave(magnitude, latitude, longitude, mode)
+        if atlas_max is not None:
+            # Tidak di-cache: lookup atlas sudah mikrodetik dan hasilnya tanpa kontur model
+            return await self._run_in_executor(
+                self._finalize_prediction, magnitude, depth, latitude, longitude, None, time.time(), atlas_max,
+                self.atlas.meta.get("model_version")
+            )
+        
+        result = await self._predict_uncached(magnitude, depth, latitude, longitude, mode)
+        
+        if cache_key is not None:
+            self._cache_store(magnitude, depth, latitude, longitude, mode, result)
+        return result
+    
+    async def _predict_uncached(
+        self,
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        mode: str
+    ) -> Dict[str, Any]:
+        if self.process_backend is not None:
+            results, _ = await self.process_backend.predict_batch(
+                [{"magnitude": magnitude, "depth": depth, "latitude": latitude, "longitude": longitude}],
+                mode
+            )
+            return results[0]
+        
         start_time = time.time()
         logger.info(f"Running prediction [{mode}] for M{magnitude} at ({latitude}, {longitude}), depth={depth}km")
         
-        model_max_wave = 0.0
+        ai_wave_grid, model_version = await self._ai_wave_grid(magnitude, latitude, longitude, mode)
+        
+        return await self._run_in_executor(
+            self._finalize_prediction, magnitude, depth, latitude, longitude, ai_wave_grid, start_time, None,
+            model_version
+        )
+    
+    async def _ai_wave_grid(
+        self,
+        magnitude: float,
+        latitude: float,
+        longitude: float,
+        mode: str
+    ) -> Tuple[Optional[np.ndarray], Optional[str]]:
+        """
+        (wave grid 128x128 dari model, versi model); (None, None) untuk mode heuristik
+        atau jika inference gagal.
+        """
         ai_wave_grid = None  # Akan diisi 128x128 grid dari AI jika berhasil
+        model_version = None
         
         # ============================================
         # MODE 1: AI (Selat Sunda Only)
         # ============================================
         if mode == "AI" and self.model_loaded:
             try:
-                # 1. Prepare Input for Model
-                # Map lat/lon to grid coordinates (0-127)
-                bounds = settings.SUNDA_STRAIT_BOUNDS
-                lat_range = bounds["max_lat"] - bounds["min_lat"]
-                lon_range = bounds["max_lon"] - bounds["min_lon"]
-                
-                # Normalize coordinates 0-1
-                norm_x = (longitude - bounds["min_lon"]) / lon_range
-                norm_y = (latitude - bounds["min_lat"]) / lat_range
-                
-                # Grid size
-                H, W = 128, 128
-                grid_x = int(norm_x * W)
-                grid_y = int(norm_y * H)
-                
-                # Clamp to grid
-                grid_x = max(0, min(grid_x, W-1))
-                grid_y = max(0, min(grid_y, H-1))
-                
-                # Create input tensor
-                input_tensor = np.zeros((1, 128, 128, 2), dtype=np.float32)
-                
-                # Create Gaussian bump
-                x = np.linspace(0, W-1, W)
-                y = np.linspace(0, H-1, H)
-                xv, yv = np.meshgrid(x, y)
-                
-                # Sigma depends on magnitude
-                sigma = (magnitude - 5.0) * 2.0
-                if sigma < 1.0: sigma = 1.0
-                
-                gaussian = np.exp(-((xv - grid_x)**2 + (yv - grid_y)**2) / (2 * sigma**2))
-                displacement = gaussian * (magnitude - 5.0) 
-                
-                input_tensor[0, :, :, 0] = displacement
-                input_tensor[0, :, :, 1] = 0.5  # Constant normalized depth
-                
-                # 2. Run Inference
-                input_name = self.model.get_inputs()[0].name
-                outputs = self.model.run(None, {input_name: input_tensor})
-                
-                wave_grid = outputs[0][0, :, :, 0] # Extract 128x128 grid
-                ai_wave_grid = wave_grid            # ✅ Capture untuk inundation contours
-                model_max_wave = np.max(wave_grid)
-                
-                # Calibrate/Normalize
-                model_max_wave = float(model_max_wave)
-                logger.info(f"AI Model Result: {model_max_wave}m (wave_grid captured)")
-
+                ai_wave_grid, model_version = await self.batcher.submit((magnitude, latitude, longitude))
+                logger.info(f"AI Model Result: {float(np.max(ai_wave_grid))}m (wave_grid captured)")
             except Exception as e:
                 logger.error(f"AI Inference failed: {e}")
-                # Fallback
-                model_max_wave = self._estimate_wave_height(magnitude, depth)
+                ai_wave_grid, model_version = None, None
 
         # ============================================
         # MODE 2: HEURISTIC (General Locations)
         # ============================================
         else:
             logger.info("Using Heuristic Mode (General)")
-            model_max_wave = self._estimate_wave_height(magnitude, depth)
+        
+        return ai_wave_grid, model_version
+    
+    async def predict_stream(
+        self,
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        mode: str = "AI",
+        contours: bool = True
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Prediksi bertahap untuk Server-Sent Events, yield (event, data):
+        
+        - estimate  : estimasi heuristik (tanpa inference, < 1 ms)
+        - prediction: blok prediction + epicenter setelah session.run (atau dari scenario
+                      atlas tanpa inference jika contours=False, lihat predict())
+        - inundation: inundationZones
+        - impact    : impactZones, waveData, impactZoneWaveData (+ isochrones)
+        - done      : processingTimeMs, cached; gabungan semua tahap sama dengan predict()
+        """
+        start_time = time.time()
+        estimate_height = self._estimate_wave_height(magnitude, depth)
+        yield "estimate", {
+            "eta": self._estimate_eta(magnitude, depth, latitude, longitude),
+            "maxWaveHeight": round(estimate_height, 2),
+            "tsunamiCategory": self._classify_tsunami_category(magnitude, estimate_height),
+            "modelUsed": "Heuristic Estimate"
+        }
+        
+        cache_key = self._cache_key(magnitude, depth, latitude, longitude, mode)
+        cached = self.cache.get(cache_key) if cache_key is not None else None
+        atlas_max = None
+        if cached is None and not contours:
+            atlas_max = self._atlas_max_wave(magnitude, latitude, longitude, mode)
+        if cached is not None or (self.process_backend is not None and atlas_max is None):
+            # Hasil utuh (cache / worker process): tahap dikirim sekaligus
+            if cached is not None:
+                result = self._from_cache(cached, latitude, longitude)
+            else:
+                result = await self._predict_uncached(magnitude, depth, latitude, longitude, mode)
+                if cache_key is not None:
+                    self._cache_store(magnitude, depth, latitude, longitude, mode, result)
+            for event, data in self._result_stages(result):
+                yield event, data
+            yield "done", {"processingTimeMs": int((time.time() - start_time) * 1000), "cached": cached is not None}
+            return
+        
+        epicenter = {"latitude": latitude, "longitude": longitude}
+        if atlas_max is not None:
+            ai_wave_grid, model_version = None, self.atlas.meta.get("model_version")
+        else:
+            ai_wave_grid, model_version = await self._ai_wave_grid(magnitude, latitude, longitude, mode)
+        prediction, max_wave_height, travel_field = await self._run_in_executor(
+            self._prediction_stage, magnitude, depth, latitude, longitude, ai_wave_grid, atlas_max, model_version
+        )
+        prediction["processingTimeMs"] = int((time.time() - start_time) * 1000)
+        yield "prediction", {"prediction": prediction, "epicenter": epicenter}
+        
+        inundation_zones = await self._run_in_executor(
+            self._generate_inundation_zones, latitude, longitude, max_wave_height, ai_wave_grid
+        )
+        yield "inundation", {"inundationZones": inundation_zones}
+        
+        impact = await self._run_in_executor(
+            self._impact_stage, latitude, longitude, magnitude, prediction["eta"], max_wave_height, travel_field
+        )
+        yield "impact", impact
+        
+        processing_time = int((time.time() - start_time) * 1000)
+        result = {
+            "prediction": {**prediction, "processingTimeMs": processing_time},
+            "epicenter": epicenter,
+            "inundationZones": inundation_zones,
+            **impact
+        }
+        if cache_key is not None and atlas_max is None:
+            self._cache_store(magnitude, depth, latitude, longitude, mode, result)
+        yield "done", {"processingTimeMs": processing_time, "cached": False}
+    
+    @staticmethod
+    def _result_stages(result: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Pecah hasil predict() menjadi event prediction / inundation / impact"""
+        impact_keys = [k for k in result if k not in ("prediction", "epicenter", "inundationZones")]
+        return [
+            ("prediction", {"prediction": result["prediction"], "epicenter": result["epicenter"]}),
+            ("inundation", {"inundationZones": result["inundationZones"]}),
+            ("impact", {k: result[k] for k in impact_keys}),
+        ]
+    
+    async def predict_wave_grid(
+        self,
+        magnitude: float,
+        latitude: float,
+        longitude: float
+    ) -> Optional[np.ndarray]:
+        """
+        Wave grid mentah 128x128 dari model ONNX (tanpa kontur / scenario atlas).
+
+        Returns:
+            np.ndarray (128, 128) float32, atau None jika model tidak ter-load
+        """
+        if not self.model_loaded:
+            return None
 
-        # 3. Finalize Output
-        # Use model output or fallback estimate if model output is suspicious (too low/high)
-        # For simplicity, we trust the chosen method
-        max_wave_height = model_max_wave
+        if self.process_backend is not None:
+            grids = await self.process_backend.predict_wave_grids([(magnitude, latitude, longitude)])
+            return grids[0]
+
+        grid, _ = await self.batcher.submit((magnitude, latitude, longitude))
+        return np.asarray(grid, dtype=np.float32)
+
+    async def predict_ensemble(
+        self,
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        mode: str = "AI",
+        members: Optional[int] = None,
+        magnitude_std: Optional[float] = None,
+        depth_std: Optional[float] = None,
+        location_std_km: Optional[float] = None,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Prediksi Monte Carlo untuk ketidakpastian parameter gempa (BMKG/USGS).
         
-        # Recalculate derived metrics
-        eta_minutes = self._estimate_eta(magnitude, depth, latitude, longitude)
-        affected_area = self._estimate_affected_area(magnitude, max_wave_height)
-        category = self._classify_tsunami_category(magnitude, max_wave_height)
-        casualties = self._estimate_casualties(magnitude, max_wave_height, affected_area)
+        K anggota dengan magnitudo, kedalaman dan epicenter diperturbasi (normal) dijalankan
+        dalam satu panggilan executor (chunk INFERENCE_MAX_BATCH). Anggota 0 adalah parameter
+        nominal dan hasil lengkapnya dikembalikan sebagai "prediction".
+        
+        Raises:
+            ValueError: jika members di luar 2..ENSEMBLE_MAX_MEMBERS
+        
+        Returns:
+            Dict dengan members, prediction, maxWaveDistribution, percentileGrids
+            (payload float16 base64, hanya mode AI) dan exceedanceContours
+        """
+        start_time = time.time()
+        k = settings.ENSEMBLE_MEMBERS if members is None else members
+        if not (2 <= k <= settings.ENSEMBLE_MAX_MEMBERS):
+            raise ValueError(f"Jumlah anggota ensemble harus antara 2 dan {settings.ENSEMBLE_MAX_MEMBERS}")
+        scenarios = self._ensemble_members(
+            magnitude, depth, latitude, longitude, k,
+            settings.ENSEMBLE_MAGNITUDE_STD if magnitude_std is None else magnitude_std,
+            settings.ENSEMBLE_DEPTH_STD_KM if depth_std is None else depth_std,
+            settings.ENSEMBLE_LOCATION_STD_KM if location_std_km is None else location_std_km,
+            seed
+        )
+        logger.info(f"Running ensemble prediction [{mode}] K={k} for M{magnitude} at ({latitude}, {longitude})")
+        
+        grids, model_version = None, None
+        if mode == "AI" and self.model_loaded:
+            triples = list(zip(
+                scenarios["magnitude"].tolist(), scenarios["latitude"].tolist(), scenarios["longitude"].tolist()
+            ))
+            try:
+                backend = self.process_backend
+                if backend is not None:
+                    grids = np.stack(await backend.predict_wave_grids(triples))
+                    model_version = backend.model_version
+                else:
+                    # Tanpa micro-batcher; chunk INFERENCE_MAX_BATCH dalam satu panggilan executor
+                    grids, model_version = await self._run_in_executor(self._run_ensemble_chunks, triples)
+            except Exception as e:
+                logger.error(f"AI ensemble inference failed: {e}")
+        
+        return await self._run_in_executor(self._summarize_ensemble, scenarios, grids, start_time, model_version)
+    
+    def _run_ensemble_chunks(self, scenarios: List[Tuple[float, float, float]]) -> Tuple[np.ndarray, str]:
+        """
+        Jalankan K anggota per chunk INFERENCE_MAX_BATCH (seperti predict_batch) agar buffer input
+        per thread tidak membesar permanen ke ukuran K. Versi = versi chunk pertama (anggota nominal).
+        """
+        chunk_size = max(1, settings.INFERENCE_MAX_BATCH)
+        grids, model_version = None, None
+        for offset in range(0, len(scenarios), chunk_size):
+            chunk_grids, version = self._run_scenarios_versioned(scenarios[offset:offset + chunk_size])
+            if grids is None:
+                grids = np.empty((len(scenarios),) + chunk_grids.shape[1:], dtype=np.float32)
+                model_version = version
+            grids[offset:offset + len(chunk_grids)] = chunk_grids
+        return grids, model_version
+    
+    @staticmethod
+    def _ensemble_members(
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        k: int,
+        magnitude_std: float,
+        depth_std: float,
+        location_std_km: float,
+        seed: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Sampel K parameter gempa; anggota 0 = nominal. Magnitudo/kedalaman di-clip ke rentang valid,
+        lat/lon ke SUNDA_STRAIT_BOUNDS (diperluas agar mencakup epicenter nominal).
+        """
+        rng = np.random.default_rng(seed)
+        km_per_degree = EARTH_RADIUS_KM * math.pi / 180.0
+        north_km, east_km = rng.normal(0.0, location_std_km, (2, k))
+        bounds = settings.SUNDA_STRAIT_BOUNDS
+        scenarios = {
+            "magnitude": np.clip(
+                magnitude + rng.normal(0.0, magnitude_std, k), settings.MIN_MAGNITUDE, settings.MAX_MAGNITUDE
+            ),
+            "depth": np.clip(depth + rng.normal(0.0, depth_std, k), settings.MIN_DEPTH, settings.MAX_DEPTH),
+            "latitude": np.clip(
+                latitude + north_km / km_per_degree,
+                min(bounds["min_lat"], latitude), max(bounds["max_lat"], latitude)
+            ),
+            "longitude": np.clip(
+                longitude + east_km / (km_per_degree * math.cos(math.radians(latitude))),
+                min(bounds["min_lon"], longitude), max(bounds["max_lon"], longitude)
+            ),
+        }
+        for key, nominal in (("magnitude", magnitude), ("depth", depth), ("latitude", latitude), ("longitude", longitude)):
+            scenarios[key][0] = nominal
+        return scenarios
+    
+    def _summarize_ensemble(
+        self,
+        scenarios: Dict[str, np.ndarray],
+        grids: Optional[np.ndarray],
+        start_time: float,
+        model_version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Distribusi max wave, grid persentil dan kontur probabilitas exceedance dari K anggota
+        """
+        mags, depths = scenarios["magnitude"], scenarios["depth"]
+        if grids is not None:
+            grids = np.asarray(grids, dtype=np.float32)
+            max_waves = grids.max(axis=(1, 2))
+        else:
+            max_waves = np.array([self._estimate_wave_height(m, d) for m, d in zip(mags.tolist(), depths.tolist())])
+        
+        nominal = self._finalize_prediction(
+            float(mags[0]), float(depths[0]), float(scenarios["latitude"][0]), float(scenarios["longitude"][0]),
+            grids[0] if grids is not None else None, start_time, model_version=model_version
+        )
+        
+        percentiles = settings.ENSEMBLE_PERCENTILES
+        counts, edges = np.histogram(max_waves, bins=settings.ENSEMBLE_HISTOGRAM_BINS)
+        distribution = {
+            "mean": round(float(max_waves.mean()), 2),
+            "std": round(float(max_waves.std()), 2),
+            "min": round(float(max_waves.min()), 2),
+            "max": round(float(max_waves.max()), 2),
+            "percentiles": {
+                f"p{p}": round(float(v), 2) for p, v in zip(percentiles, np.percentile(max_waves, percentiles))
+            },
+            "histogram": {"edges": np.round(edges, 3).tolist(), "counts": counts.tolist()},
+        }
+        
+        percentile_grids = None
+        exceedance = []
+        if grids is not None:
+            bounds = settings.SUNDA_STRAIT_BOUNDS
+            percentile_grids = {
+                f"p{p}": base64.b64encode(encode_float16(grid, bounds)).decode("ascii")
+                for p, grid in zip(percentiles, self._grid_percentiles(grids, percentiles))
+            }
+            exceedance = self._exceedance_contours(grids)
+        
+        return {
+            "members": len(mags),
+            "prediction": nominal,
+            "maxWaveDistribution": distribution,
+            "percentileGrids": percentile_grids,
+            "exceedanceContours": exceedance,
+            "processingTimeMs": int((time.time() - start_time) * 1000)
+        }
+    
+    @staticmethod
+    def _grid_percentiles(grids: np.ndarray, percentiles: List[float]) -> np.ndarray:
+        """
+        Persentil per sel (interpolasi linear, sama dengan np.percentile) dari grid (K, H, W).
+        Satu sort sepanjang sumbu anggota lalu indexing ~5x lebih cepat dari np.percentile(axis=0).
+        """
+        k = grids.shape[0]
+        ordered = np.sort(grids, axis=0)
+        rank = np.asarray(percentiles, dtype=np.float64) / 100.0 * (k - 1)
+        lower = np.floor(rank).astype(int)
+        upper = np.minimum(lower + 1, k - 1)
+        weight = (rank - lower).astype(grids.dtype)[:, None, None]
+        return ordered[lower] * (1 - weight) + ordered[upper] * weight
+    
+    def _exceedance_contours(self, grids: np.ndarray) -> List[Dict]:
+        """
+        Kontur P(wave > threshold) per level probabilitas, kontur terbesar per level
+        """
+        from skimage import measure
+        
+        bounds = settings.SUNDA_STRAIT_BOUNDS
+        contours_out = []
+        for threshold in settings.ENSEMBLE_EXCEEDANCE_THRESHOLDS:
+            probability = (grids > threshold).mean(axis=0)
+            for level in settings.ENSEMBLE_PROBABILITY_LEVELS:
+                contours = measure.find_contours(probability, level=level)
+                if not contours:
+                    continue
+                largest = max(contours, key=len)
+                if len(largest) < 4:
+                    continue
+                ring = grid_contour_to_ring(
+                    largest, bounds, probability.shape,
+                    tolerance=settings.CONTOUR_SIMPLIFY_TOLERANCE
+                )
+                contours_out.append({"threshold": threshold, "probability": level, "coordinates": [ring]})
+        return contours_out
+    
+    async def predict_sweep(
+        self,
+        magnitudes: np.ndarray,
+        depths: np.ndarray,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        mode: str = "AI"
+    ) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """
+        Parameter sweep / analisis sensitivitas pada grid Cartesian magnitude x depth x lat x lon.
+        
+        Hasil berbentuk kolom (satu baris per titik, urutan np.meshgrid indexing="ij"),
+        bukan JSON per skenario: max_wave_height, category (kode TSUNAMI_CATEGORIES) dan
+        city_wave_height (N, C) = tinggi gelombang lokal per titik pesisir seperti
+        _get_impact_zones, tanpa batas IMPACT_ZONES_MAX dan tanpa filter travel time.
+        
+        Input model tidak bergantung pada kedalaman, jadi inference hanya dijalankan untuk
+        kombinasi unik (magnitude, lat, lon) per chunk INFERENCE_MAX_BATCH, paralel di
+        thread pool (atau worker process jika INFERENCE_BACKEND=process).
+        
+        Returns:
+            (columns, meta)
+        
+        Raises:
+            ValueError: jika titik > SWEEP_MAX_POINTS atau titik x kota pesisir > SWEEP_MAX_CITY_CELLS
+        """
+        start_time = time.time()
+        axes = [np.asarray(a, dtype=np.float64).ravel() for a in (magnitudes, depths, latitudes, longitudes)]
+        shape = tuple(a.size for a in axes)
+        points = int(np.prod(shape))
+        if points > settings.SWEEP_MAX_POINTS:
+            raise ValueError(f"Maksimum {settings.SWEEP_MAX_POINTS} titik per sweep ({points} diminta)")
+        mags, deps, lats, lons = axes
+        
+        # Pilih titik pesisir dan cek batas points x cities sebelum inference yang mahal
+        cities, decay = await self._run_in_executor(self._sweep_city_decay, lats, lons, points)
+        
+        use_ai = mode == "AI" and self.model_loaded
+        logger.info(f"Running parameter sweep [{mode}] {'x'.join(map(str, shape))} = {points} points, {cities.size} cities")
+        
+        if use_ai:
+            # (M, LAT, LON) -> broadcast ke sumbu depth
+            waves = (await self._sweep_ai_max_waves(mags, lats, lons))[:, None]
+            inferences = mags.size * lats.size * lons.size
+        else:
+            waves = np.array(
+                [[self._estimate_wave_height(m, d) for d in deps] for m in mags], dtype=np.float32
+            )[:, :, None, None]
+            inferences = 0
+        
+        columns = await self._run_in_executor(self._sweep_columns, axes, waves, shape, cities, decay)
+        meta = {
+            "points": points,
+            "shape": {"magnitude": shape[0], "depth": shape[1], "latitude": shape[2], "longitude": shape[3]},
+            "mode": mode,
+            "modelUsed": "ONNX: Tsunami-ViT" if use_ai else "Heuristic Fallback",
+            "modelVersion": self.engine.model_version if use_ai else None,
+            "inferences": inferences,
+            "categories": list(TSUNAMI_CATEGORIES),
+            "processingTimeMs": int((time.time() - start_time) * 1000)
+        }
+        return columns, meta
+    
+    async def encode_sweep(self, columns: Dict[str, np.ndarray], meta: Dict[str, Any], fmt: str = "npz") -> bytes:
+        """
+        Encode hasil predict_sweep ("npz" atau "parquet", lihat app/utils/sweep_encoding.py)
+        di thread pool service, bukan di event loop.
+        
+        Raises:
+            RuntimeError: format parquet tanpa pyarrow
+        """
+        encode = encode_parquet if fmt == "parquet" else encode_npz
+        return await self._run_in_executor(encode, columns, meta)
+    
+    async def _sweep_ai_max_waves(self, mags: np.ndarray, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Max wave (M, LAT, LON) dari model; grid direduksi per chunk agar memori tetap kecil"""
+        m, la, lo = np.meshgrid(mags, lats, lons, indexing="ij")
+        triples = list(zip(m.ravel().tolist(), la.ravel().tolist(), lo.ravel().tolist()))
+        chunk_size = max(1, settings.INFERENCE_MAX_BATCH)
+        
+        if self.process_backend is not None:
+            async def run_chunk(chunk):
+                grids = await self.process_backend.predict_wave_grids(chunk)
+                return np.array([grid.max() for grid in grids], dtype=np.float32)
+        else:
+            # Batasi chunk yang antre di executor agar request lain tetap dapat giliran
+            slots = asyncio.Semaphore(settings.INFERENCE_THREADS)
+            
+            def max_waves(chunk):
+                return self._run_scenarios(chunk).max(axis=(1, 2)).astype(np.float32)
+            
+            async def run_chunk(chunk):
+                async with slots:
+                    return await self._run_in_executor(max_waves, chunk)
+        
+        maxima = await asyncio.gather(*(
+            run_chunk(triples[offset:offset + chunk_size])
+            for offset in range(0, len(triples), chunk_size)
+        ))
+        return np.concatenate(maxima).reshape(m.shape)
+    
+    def _sweep_columns(
+        self,
+        axes: List[np.ndarray],
+        waves: np.ndarray,
+        shape: Tuple[int, int, int, int],
+        cities: np.ndarray,
+        decay: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Kolom hasil sweep. waves bisa berdimensi tereduksi (broadcastable ke shape); kategori
+        dihitung pada bentuk tereduksi itu lalu di-broadcast, bukan per titik.
+        cities/decay dari _sweep_city_decay.
+        """
+        mags, deps, lats, lons = axes
+        codes = {name: i for i, name in enumerate(TSUNAMI_CATEGORIES)}
+        mag_b = np.broadcast_to(mags[:, None, None, None], np.broadcast_shapes(waves.shape, (shape[0], 1, 1, 1)))
+        wave_b = np.broadcast_to(waves, mag_b.shape)
+        category = np.fromiter(
+            (codes[self._classify_tsunami_category(m, w)] for m, w in zip(mag_b.ravel().tolist(), wave_b.ravel().tolist())),
+            dtype=np.uint8, count=mag_b.size
+        ).reshape(mag_b.shape)
+        
+        grid = np.meshgrid(mags, deps, lats, lons, indexing="ij")
+        wave_full = np.broadcast_to(waves, shape)
+        columns = {
+            "magnitude": grid[0].ravel().astype(np.float32),
+            "depth": grid[1].ravel().astype(np.float32),
+            "latitude": grid[2].ravel(),
+            "longitude": grid[3].ravel(),
+            "max_wave_height": wave_full.ravel().astype(np.float32),
+            "category": np.broadcast_to(category, shape).ravel().copy(),
+        }
+        columns.update(self._sweep_city_heights(wave_full, cities, decay))
+        return columns
+    
+    def _sweep_city_decay(self, lats: np.ndarray, lons: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Titik pesisir dalam IMPACT_RADIUS_KM dari salah satu epicenter sweep dan faktor peluruhan
+        exp(-d/50) per (lat, lon, kota), 0 di luar radius. Jarak dihitung per baris latitude
+        sehingga tidak ada array (LAT, LON, seluruh gazetteer).
+        
+        Raises:
+            ValueError: jika points x kota > SWEEP_MAX_CITY_CELLS
+        """
+        gz = self.gazetteer
+        in_any = np.zeros(len(gz.lats), dtype=bool)
+        for lat in lats.tolist():
+            distance = haversine_km(lat, lons[:, None], gz.lats[None, :], gz.lons[None, :])
+            in_any |= (distance < settings.IMPACT_RADIUS_KM).any(axis=0)
+        cities = np.flatnonzero(in_any)
+        
+        cells = points * cities.size
+        if cells > settings.SWEEP_MAX_CITY_CELLS:
+            raise ValueError(
+                f"Sweep terlalu besar: {points} titik x {cities.size} kota pesisir = {cells} "
+                f"(maksimum {settings.SWEEP_MAX_CITY_CELLS}); perkecil rentang latitude/longitude atau jumlah step"
+            )
+        
+        lat_grid, lon_grid = np.meshgrid(lats, lons, indexing="ij")
+        distance = haversine_km(lat_grid[..., None], lon_grid[..., None], gz.lats[cities], gz.lons[cities])
+        decay = np.where(
+            distance < settings.IMPACT_RADIUS_KM, np.exp(-distance / 50.0), 0.0
+        ).astype(np.float32)
+        return cities, decay
+    
+    def _sweep_city_heights(self, waves: np.ndarray, cities: np.ndarray, decay: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Tinggi gelombang lokal per titik pesisir (N, C), rumus sama dengan _get_impact_zones:
+        wave * exp(-d/50) jika d < IMPACT_RADIUS_KM dan > IMPACT_MIN_WAVE_HEIGHT, selain itu 0.
+        Diisi per (magnitude, depth) agar temporary hanya sebesar (LAT, LON, C).
+        """
+        gz = self.gazetteer
+        n_md = waves.shape[0] * waves.shape[1]
+        block = decay.shape[0] * decay.shape[1]
+        heights = np.empty((waves.size, cities.size), dtype=np.float32)
+        for i, wave in enumerate(waves.reshape(n_md, *decay.shape[:2])):
+            local = wave[..., None] * decay
+            local[local <= settings.IMPACT_MIN_WAVE_HEIGHT] = 0.0
+            heights[i * block:(i + 1) * block] = local.reshape(block, cities.size)
+        return {
+            "city_wave_height": heights,
+            "city_max_wave_height": heights.max(axis=0),
+            "city_name": np.asarray(gz.names[cities].tolist(), dtype=str),
+            "city_latitude": gz.lats[cities],
+            "city_longitude": gz.lons[cities],
+        }
+    
+    async def predict_batch(
+        self,
+        scenarios: List[Dict[str, float]],
+        mode: str = "AI"
+    ) -> List[Dict[str, Any]]:
+        """
+        Run prediction untuk banyak gempa sekaligus.
+        
+        Input dari N skenario ditumpuk menjadi satu tensor (N, 128, 128, 2) per chunk
+        (maks settings.INFERENCE_MAX_BATCH), dijalankan dengan satu session.run,
+        lalu post-processing (kategori, impact zones, kontur) dilakukan per event.
+        
+        Args:
+            scenarios: List dict dengan key magnitude, depth, latitude, longitude
+        
+        Returns:
+            List hasil dengan format yang sama seperti predict(), urutan sama dengan input
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(scenarios)
+        keys = [
+            self._cache_key(sc["magnitude"], sc["depth"], sc["latitude"], sc["longitude"], mode)
+            for sc in scenarios
+        ]
+        
+        # Hanya skenario yang belum ada di cache yang masuk ke inference
+        missing = []
+        for i, (sc, key) in enumerate(zip(scenarios, keys)):
+            cached = self.cache.get(key) if key is not None else None
+            if cached is not None:
+                results[i] = self._from_cache(cached, sc["latitude"], sc["longitude"])
+            else:
+                missing.append(i)
+        
+        if missing:
+            computed = await self._predict_batch_uncached([scenarios[i] for i in missing], mode)
+            for i, result in zip(missing, computed):
+                results[i] = result
+                if keys[i] is not None:
+                    sc = scenarios[i]
+                    self._cache_store(sc["magnitude"], sc["depth"], sc["latitude"], sc["longitude"], mode, result)
+        
+        return results
+    
+    async def _predict_batch_uncached(
+        self,
+        scenarios: List[Dict[str, float]],
+        mode: str
+    ) -> List[Dict[str, Any]]:
+        if self.process_backend is not None:
+            results, _ = await self.process_backend.predict_batch(scenarios, mode)
+            return results
+        return await self._run_in_executor(self._predict_batch_sync, scenarios, mode)
+    
+    def _predict_batch_sync(
+        self,
+        scenarios: List[Dict[str, float]],
+        mode: str,
+        return_grids: bool = False
+    ):
+        start_time = time.time()
+        logger.info(f"Running batch prediction [{mode}] for {len(scenarios)} scenarios")
+        
+        wave_grids: List[Optional[np.ndarray]] = [None] * len(scenarios)
+        versions: List[Optional[str]] = [None] * len(scenarios)
+        
+        if mode == "AI" and self.model_loaded:
+            pending = list(range(len(scenarios)))
+            
+            chunk_size = max(1, settings.INFERENCE_MAX_BATCH)
+            for offset in range(0, len(pending), chunk_size):
+                chunk = pending[offset:offset + chunk_size]
+                try:
+                    grids, version = self._run_scenarios_versioned([
+                        (scenarios[i]["magnitude"], scenarios[i]["latitude"], scenarios[i]["longitude"])
+                        for i in chunk
+                    ])
+                    for i, grid in zip(chunk, grids):
+                        wave_grids[i], versions[i] = grid, version
+                except Exception as e:
+                    # Fallback heuristik hanya untuk chunk yang gagal
+                    logger.error(f"AI batch inference failed for chunk at {offset}: {e}")
+        
+        results = [
+            self._finalize_prediction(
+                sc["magnitude"], sc["depth"], sc["latitude"], sc["longitude"],
+                wave_grids[i], start_time, None, versions[i]
+            )
+            for i, sc in enumerate(scenarios)
+        ]
+        return (results, wave_grids) if return_grids else results
+    
+    def _cache_key(
+        self,
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        mode: str,
+        model_version: Optional[str] = None
+    ):
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            magnitude, depth, latitude, longitude, mode, model_version or self.engine.model_version
+        )
+    
+    def _cache_store(
+        self,
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        mode: str,
+        result: Dict[str, Any]
+    ):
+        """
+        Simpan hasil dengan key versi model yang menghasilkannya, bukan versi yang aktif sekarang.
+        Fallback heuristik karena inference AI gagal (modelVersion None) tidak di-cache, agar
+        kegagalan sesaat tidak dilayani dari cache selama CACHE_TTL.
+        """
+        if mode == "AI" and self.model_loaded and result["prediction"].get("modelVersion") is None:
+            return
+        key = self._cache_key(magnitude, depth, latitude, longitude, mode, result["prediction"].get("modelVersion"))
+        if key is not None:
+            self.cache.set(key, result)
+    
+    @staticmethod
+    def _from_cache(cached: Dict[str, Any], latitude: float, longitude: float) -> Dict[str, Any]:
+        """
+        Salin hasil cache (shallow) dengan epicenter dari request.
+        Nested list (zona, wave data) dibagikan karena tidak pernah dimodifikasi.
+        """
+        return {
+            **cached,
+            "prediction": {**cached["prediction"], "processingTimeMs": 0},
+            "epicenter": {"latitude": latitude, "longitude": longitude}
+        }
+    
+    def _atlas_max_wave(self, magnitude: float, latitude: float, longitude: float, mode: str) -> Optional[float]:
+        """Max wave dari atlas untuk fast path tanpa inference (hanya mode AI dengan model ter-load)"""
+        if mode != "AI" or not self.model_loaded:
+            return None
+        return self._atlas_lookup(magnitude, latitude, longitude)
+    
+    def _atlas_lookup(self, magnitude: float, latitude: float, longitude: float):
+        """
+        Return max wave dari scenario atlas, atau None jika di luar grid
+        """
+        atlas = self.atlas
+        if atlas is None or not atlas.covers(magnitude, latitude, longitude):
+            return None
+        # Selama hot reload atlas lama bisa masih terpasang sesaat; jangan dipakai untuk model baru
+        if atlas.meta.get("model_sha256") != self.engine.model_sha256:
+            return None
+        return atlas.lookup(magnitude, latitude, longitude)
+    
+    def _run_scenarios(self, scenarios: List[Tuple[float, float, float]]) -> np.ndarray:
+        """
+        Build input batch dari (magnitude, latitude, longitude) lalu run ONNX model
+        """
+        return self._run_scenarios_versioned(scenarios)[0]
+    
+    def _run_scenarios_versioned(self, scenarios: List[Tuple[float, float, float]]) -> Tuple[np.ndarray, str]:
+        """
+        Seperti _run_scenarios, plus versi model (snapshot) yang menjalankan batch ini
+        """
+        outputs, model_version = self.engine.run_versioned(self.input_builder.build_batch(scenarios))
+        return outputs[:, :, :, 0], model_version
+    
+    def _run_micro_batch(self, scenarios: List[Tuple[float, float, float]]) -> List[Tuple[np.ndarray, str]]:
+        """run_batch MicroBatcher: (wave grid, versi model) per skenario"""
+        grids, model_version = self._run_scenarios_versioned(scenarios)
+        return [(grid, model_version) for grid in grids]
+    
+    def _finalize_prediction(
+        self,
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        ai_wave_grid: Optional[np.ndarray],
+        start_time: float,
+        ai_max_wave: Optional[float] = None,
+        model_version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Hitung metrik turunan dan susun response dari wave grid AI (atau heuristik jika None).
+        `ai_max_wave` (scenario atlas, tanpa wave grid) dipakai untuk max wave jika ada; kontur
+        genangan lalu memakai elips fallback karena tidak ada grid model.
+        `model_version` adalah versi model yang menghasilkan grid, disimpan di prediction.modelVersion.
+        """
+        prediction, max_wave_height, travel_field = self._prediction_stage(
+            magnitude, depth, latitude, longitude, ai_wave_grid, ai_max_wave, model_version
+        )
         
         # Generate contour zones dari AI wave_grid (atau fallback ke ellipse halus)
         inundation_zones = self._generate_inundation_zones(latitude, longitude, max_wave_height, wave_grid=ai_wave_grid)
-        impact_zones = self._get_impact_zones(latitude, longitude, magnitude, max_wave_height)
-        wave_data = self._generate_wave_data(eta_minutes, max_wave_height)
-        
-        processing_time = (time.time() - start_time) * 1000
+        impact = self._impact_stage(latitude, longitude, magnitude, prediction["eta"], max_wave_height, travel_field)
         
+        prediction["processingTimeMs"] = int((time.time() - start_time) * 1000)
         result = {
-            "prediction": {
-                "eta": eta_minutes,
-                "maxWaveHeight": round(max_wave_height, 2),
-                "affectedArea": round(affected_area, 2),
-                "tsunamiCategory": category,
-                "estimatedCasualties": casualties,
-                "processingTimeMs": int(processing_time),
-                "modelUsed": "ONNX: Tsunami-ViT" if self.model_loaded else "Heuristic Fallback"
-            },
+            "prediction": prediction,
             "epicenter": {
                 "latitude": latitude,
                 "longitude": longitude
             },
             "inundationZones": inundation_zones,
-            "impactZones": impact_zones,
-            "waveData": wave_data
+            **impact
         }
         
-        logger.info(f"✅ Prediction completed: Category={category}, MaxWave={max_wave_height:.2f}m")
+        logger.info(f"✅ Prediction completed: Category={prediction['tsunamiCategory']}, MaxWave={max_wave_height:.2f}m")
         return result
     
+    def _prediction_stage(
+        self,
+        magnitude: float,
+        depth: float,
+        latitude: float,
+        longitude: float,
+        ai_wave_grid: Optional[np.ndarray],
+        ai_max_wave: Optional[float] = None,
+        model_version: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], float, Optional[np.ndarray]]:
+        """
+        Metrik utama (blok "prediction"), tinggi gelombang maksimum dan field waktu tiba
+        """
+        # Use atlas / model output or fallback estimate if AI inference was not available
+        if ai_max_wave is not None:
+            max_wave_height = ai_max_wave
+        elif ai_wave_grid is not None:
+            max_wave_height = float(np.max(ai_wave_grid))
+        else:
+            max_wave_height = self._estimate_wave_height(magnitude, depth)
+        
+        # Field waktu tiba dari bathymetry (di-cache per sel epicenter)
+        travel_field = None
+        if self.travel_time is not None:
+            travel_field = self.travel_time.arrival_minutes(latitude, longitude)
+        
+        # Recalculate derived metrics
+        eta_minutes = self._estimate_eta(magnitude, depth, latitude, longitude, travel_field=travel_field)
+        affected_area = self._estimate_affected_area(magnitude, max_wave_height)
+        category = self._classify_tsunami_category(magnitude, max_wave_height)
+        casualties = self._estimate_casualties(magnitude, max_wave_height, affected_area)
+        
+        prediction = {
+            "eta": eta_minutes,
+            "maxWaveHeight": round(max_wave_height, 2),
+            "affectedArea": round(affected_area, 2),
+            "tsunamiCategory": category,
+            "estimatedCasualties": casualties,
+            "processingTimeMs": 0,
+            "modelUsed": (
+                "Scenario Atlas: Tsunami-ViT" if ai_wave_grid is None and ai_max_wave is not None
+                else "ONNX: Tsunami-ViT" if self.model_loaded else "Heuristic Fallback"
+            ),
+            # None jika tidak ada output model (heuristik / inference gagal)
+            "modelVersion": model_version if (ai_wave_grid is not None or ai_max_wave is not None) else None
+        }
+        return prediction, max_wave_height, travel_field
+    
+    def _impact_stage(
+        self,
+        latitude: float,
+        longitude: float,
+        magnitude: float,
+        eta_minutes: int,
+        max_wave_height: float,
+        travel_field: Optional[np.ndarray]
+    ) -> Dict[str, Any]:
+        """
+        Impact zones, time series gelombang dan isochrone (jika ada field waktu tiba)
+        """
+        impact_zones = self._get_impact_zones(latitude, longitude, magnitude, max_wave_height, travel_field=travel_field)
+        impact = {
+            "impactZones": impact_zones,
+            "waveData": self._generate_wave_data(eta_minutes, max_wave_height),
+            "impactZoneWaveData": self._generate_zone_wave_data(impact_zones)
+        }
+        if travel_field is not None:
+            impact["isochrones"] = self.travel_time.isochrones(travel_field)
+        return impact
+    
     def _assess_tsunami_potential(self, magnitude: float, depth: float) -> bool:
         """
         Quick assessment if earthquake can generate tsunami
@@ -191,10 +1048,23 @@ class PredictionService:
         wave_height = base_height * depth_factor * 0.8
         return max(0.0, min(wave_height, 30.0))  # Cap at 30m
     
-    def _estimate_eta(self, magnitude: float, depth: float, lat: float, lon: float) -> int:
+    def _estimate_eta(
+        self,
+        magnitude: float,
+        depth: float,
+        lat: float,
+        lon: float,
+        travel_field: Optional[np.ndarray] = None
+    ) -> int:
         """
         Estimate time of arrival to nearest coastline (minutes)
         """
+        # Waktu tiba dari bathymetry jika tersedia (TravelTimeEngine)
+        if travel_field is not None:
+            eta = self.travel_time.coastal_eta(travel_field)
+            if math.isfinite(eta):
+                return max(1, min(math.ceil(eta), 180))
+        
         # Simplified: assume average distance to coast and wave speed
         # Tsunami wave speed: ~sqrt(g * depth) where g=9.8 m/s^2
         # For deep ocean (4000m): ~200 m/s = 720 km/h
@@ -268,11 +1138,6 @@ class PredictionService:
                 from app.config import settings
 
                 bounds = settings.SUNDA_STRAIT_BOUNDS
-                min_lat = bounds["min_lat"]
-                max_lat = bounds["max_lat"]
-                min_lon = bounds["min_lon"]
-                max_lon = bounds["max_lon"]
-                H, W = wave_grid.shape  # 128 x 128
 
                 grid_max = float(np.max(wave_grid))
                 if grid_max < 1e-6:
@@ -296,15 +1161,11 @@ class PredictionService:
                     if len(largest) < 4:
                         continue
 
-                    # Konversi piksel grid (row, col) → koordinat lat/lon nyata
-                    ring = []
-                    for row, col in largest:
-                        real_lon = min_lon + (col / (W - 1)) * (max_lon - min_lon)
-                        real_lat = min_lat + (row / (H - 1)) * (max_lat - min_lat)
-                        ring.append([round(real_lon, 6), round(real_lat, 6)])
-
-                    # Tutup ring (GeoJSON: titik pertama == titik terakhir)
-                    ring.append(ring[0])
+                    # Konversi piksel grid (row, col) → koordinat lat/lon nyata (+ simplifikasi)
+                    ring = grid_contour_to_ring(
+                        largest, bounds, wave_grid.shape,
+                        tolerance=settings.CONTOUR_SIMPLIFY_TOLERANCE
+                    )
 
                     zones.append({
                         "coordinates": [ring],
@@ -343,81 +1204,95 @@ class PredictionService:
             })
         return zones
     
-    def _get_impact_zones(self, lat: float, lon: float, magnitude: float, wave_height: float) -> List[Dict]:
+    def _get_impact_zones(
+        self,
+        lat: float,
+        lon: float,
+        magnitude: float,
+        wave_height: float,
+        travel_field: Optional[np.ndarray] = None
+    ) -> List[Dict]:
         """
-        Get list of coastal areas that will be impacted
+        Get list of coastal areas that will be impacted.
+        Jarak, tinggi gelombang lokal dan ETA dihitung vectorized untuk semua titik gazetteer.
+        ETA diambil dari field waktu tiba (travel_field) jika ada, selain itu estimasi kasar dari jarak.
         """
-        # Hardcoded coastal cities in Selat Sunda region
-        coastal_cities = [
-            {"name": "Pantai Anyer", "lat": -6.034, "lon": 105.826},
-            {"name": "Labuan", "lat": -6.394, "lon": 105.793},
-            {"name": "Carita", "lat": -6.301, "lon": 105.656},
-            {"name": "Sumur", "lat": -6.650, "lon": 105.583},
-            {"name": "Cilegon", "lat": -6.003, "lon": 106.001},
+        min_wave = settings.IMPACT_MIN_WAVE_HEIGHT
+        if wave_height <= min_wave:
+            return []
+        
+        # Gelombang meluruh exp(-d/50); di luar radius ini tinggi lokal pasti <= min_wave
+        radius = min(settings.IMPACT_RADIUS_KM, 50.0 * math.log(wave_height / min_wave))
+        idx, distance = self.gazetteer.within(lat, lon, radius)
+        
+        local_wave_height = wave_height * np.exp(-distance / 50.0)
+        keep = local_wave_height > min_wave
+        idx, distance, local_wave_height = idx[keep], distance[keep], local_wave_height[keep]
+        eta = (distance // 10).astype(int) + 5  # Rough estimate
+        
+        if travel_field is not None:
+            arrival = self.travel_time.sample(travel_field, self.gazetteer.lats[idx], self.gazetteer.lons[idx])
+            # inf = tidak terjangkau gelombang (cekungan terpisah); NaN = di luar grid, pakai estimasi kasar
+            reachable = ~np.isposinf(arrival)
+            idx, distance, local_wave_height = idx[reachable], distance[reachable], local_wave_height[reachable]
+            arrival, eta = arrival[reachable], eta[reachable]
+            eta = np.where(np.isnan(arrival), eta, np.maximum(1, np.ceil(np.nan_to_num(arrival)))).astype(int)
+        
+        # Urut ETA, stabil terhadap urutan gazetteer
+        order = np.lexsort((idx, eta))[:settings.IMPACT_ZONES_MAX]
+        names = self.gazetteer.names
+        distance_r = np.round(distance, 1)
+        wave_r = np.round(local_wave_height, 2)
+        return [
+            {
+                "name": names[idx[i]],
+                "distance": float(distance_r[i]),
+                "eta": int(eta[i]),
+                "waveHeight": float(wave_r[i])
+            }
+            for i in order
         ]
+    
+    @staticmethod
+    def _wave_series(etas: np.ndarray, heights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Time series gelombang sintetis (n_series, n_timesteps) dalam satu ekspresi NumPy.
+        Sumbu waktu bersama: 0 .. min(ETA terbesar + 30, WAVE_DATA_MAX_MINUTES), tiap WAVE_DATA_STEP_MINUTES.
         
-        impact_zones = []
-        for city in coastal_cities:
-            # Calculate distance from epicenter
-            distance = self._haversine_distance(lat, lon, city["lat"], city["lon"])
-            
-            if distance < 100:  # Within 100km
-                # Estimate wave height at this location (decay with distance)
-                local_wave_height = wave_height * math.exp(-distance / 50.0)
-                
-                if local_wave_height > 0.3:  # Significant wave
-                    # Estimate ETA based on distance
-                    eta = int(distance / 10) + 5  # Rough estimate
-                    
-                    impact_zones.append({
-                        "name": city["name"],
-                        "distance": round(distance, 1),
-                        "eta": eta,
-                        "waveHeight": round(local_wave_height, 2)
-                    })
+        Returns:
+            (waktu menit (T,), tinggi gelombang meter (N, T) dibulatkan 2 desimal)
+        """
+        etas = np.asarray(etas, dtype=np.float64).reshape(-1, 1)
+        heights = np.asarray(heights, dtype=np.float64).reshape(-1, 1)
+        horizon = min(int(etas.max(initial=0)) + 30, settings.WAVE_DATA_MAX_MINUTES)
+        times = np.arange(0, horizon, max(1, settings.WAVE_DATA_STEP_MINUTES))
         
-        return sorted(impact_zones, key=lambda x: x["eta"])
+        # Sebelum tiba: gelombang latar kecil; setelah tiba: puncak saat tiba lalu meluruh
+        since = times - etas
+        background = 0.2 + 0.1 * np.sin(times / 10.0)
+        main_wave = heights * np.exp(-np.maximum(since, 0.0) / 20.0) * (0.7 + 0.3 * np.sin(since / 5.0))
+        series = np.where(since < 0, background, main_wave)
+        return times, np.round(np.maximum(series, 0.0), 2)
     
     def _generate_wave_data(self, eta_minutes: int, max_wave_height: float) -> List[Dict]:
         """
         Generate temporal wave height data for visualization
         """
-        time_points = range(0, min(eta_minutes + 30, 120), 5)  # Every 5 minutes
-        wave_data = []
-        
-        for t in time_points:
-            # Simplified wave propagation (sinusoidal + growth)
-            if t < eta_minutes:
-                # Before arrival: small background waves
-                height = 0.2 + 0.1 * np.sin(t / 10.0)
-            else:
-                # After arrival: main tsunami wave
-                time_since_arrival = t - eta_minutes
-                # Peak at arrival, then decay
-                decay = np.exp(-time_since_arrival / 20.0)
-                oscillation = np.sin(time_since_arrival / 5.0)
-                height = max_wave_height * decay * (0.7 + 0.3 * oscillation)
-            
-            wave_data.append({
-                "time": t,
-                "waveHeight": round(max(0.0, height), 2)
-            })
-        
-        return wave_data
+        times, series = self._wave_series(np.array([eta_minutes]), np.array([max_wave_height]))
+        return [
+            {"time": t, "waveHeight": h}
+            for t, h in zip(times.tolist(), series[0].tolist())
+        ]
     
-    @staticmethod
-    def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    def _generate_zone_wave_data(self, impact_zones: List[Dict]) -> Dict[str, List]:
         """
-        Calculate distance between two points on Earth (km)
+        Satu kurva tide-gauge sintetis per impact zone (ETA dan tinggi gelombang zona itu),
+        kolumnar: {"time": [T], "waveHeight": [n_zones][T]} dengan urutan sama seperti impactZones.
         """
-        R = 6371  # Earth radius in km
-        
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        
-        a = (math.sin(dlat / 2) ** 2 +
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-             math.sin(dlon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return R * c
+        if not impact_zones:
+            return {"time": [], "waveHeight": []}
+        times, series = self._wave_series(
+            np.fromiter((zone["eta"] for zone in impact_zones), dtype=np.float64, count=len(impact_zones)),
+            np.fromiter((zone["waveHeight"] for zone in impact_zones), dtype=np.float64, count=len(impact_zones))
+        )
+        return {"time": times.tolist(), "waveHeight": series.tolist()}
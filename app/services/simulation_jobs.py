@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.config import settings
+from app.database import crud
+from app.database.connection import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Antrian job penuh; request harus ditolak (429) dan dicoba lagi nanti"""
+
+
+class SimulationJobQueue:
+    """
+    Antrian job simulasi in-process dengan pool worker asyncio terbatas.
+
+    POST /simulation/jobs hanya memasukkan job ke asyncio.Queue berukuran tetap
+    (JOB_QUEUE_MAX) dan langsung return; JOB_WORKERS task menjalankan
+    PredictionService.predict lalu menyimpan hasil ke database dengan session
+    sendiri. Jika antrian penuh, submit melempar JobQueueFull (backpressure).
+
+    Status dan hasil job disimpan di memori selama JOB_RESULT_TTL detik.
+    """
+
+    def __init__(
+        self,
+        prediction_service,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        result_ttl: Optional[float] = None,
+        persist: bool = True
+    ):
+        self.prediction_service = prediction_service
+        self.workers = max(1, workers or settings.JOB_WORKERS)
+        self.max_queue = max(1, max_queue or settings.JOB_QUEUE_MAX)
+        self.result_ttl = settings.JOB_RESULT_TTL if result_ttl is None else result_ttl
+        self.persist = persist
+
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    def _ensure_started(self):
+        # Queue dan worker dibuat lazy agar terikat ke event loop yang sedang berjalan
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"simulation-job-{i}")
+                for i in range(self.workers)
+            ]
+            logger.info(f"Simulation job queue started: {self.workers} workers, max {self.max_queue} queued")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        logger.info("Simulation job queue stopped.")
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, params: Dict[str, Any], save_kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Masukkan job ke antrian tanpa menunggu.
+
+        Args:
+            params: magnitude, depth, latitude, longitude, mode
+            save_kwargs: argumen tambahan crud.save_simulation_result (user, session, IP, mode)
+
+        Raises:
+            JobQueueFull: jika antrian penuh
+        """
+        self._ensure_started()
+        self._prune()
+        if self._queue.full() or len(self._jobs) >= settings.JOB_MAX_STORED:
+            raise JobQueueFull(f"Antrian simulasi penuh ({self.max_queue} job)")
+
+        job = {
+            "jobId": str(uuid.uuid4()),
+            "status": JOB_QUEUED,
+            "createdAt": datetime.utcnow().isoformat() + "Z",
+            "startedAt": None,
+            "finishedAt": None,
+            "result": None,
+            "error": None,
+            "_params": params,
+            "_save_kwargs": save_kwargs or {},
+            "_expires": None,
+        }
+        self._jobs[job["jobId"]] = job
+        self._queue.put_nowait(job)
+        return self.public(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._prune()
+        job = self._jobs.get(job_id)
+        return self.public(job) if job is not None else None
+
+    def public(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Representasi job untuk response API (tanpa field internal)"""
+        data = {k: v for k, v in job.items() if not k.startswith("_")}
+        if job["status"] == JOB_QUEUED:
+            data["queued"] = self.queued
+        return data
+
+    def _prune(self):
+        """Buang job selesai yang sudah melewati TTL (urut waktu submit)"""
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["_expires"] is not None and job["_expires"] <= now
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Dict[str, Any]):
+        job["status"] = JOB_RUNNING
+        job["startedAt"] = datetime.utcnow().isoformat() + "Z"
+        params = job["_params"]
+        try:
+            result = await self.prediction_service.predict(
+                magnitude=params["magnitude"],
+                depth=params["depth"],
+                latitude=params["latitude"],
+                longitude=params["longitude"],
+                mode=params.get("mode", "AI")
+            )
+            job["result"] = result
+            job["status"] = JOB_COMPLETED
+        except Exception as e:
+            logger.error(f"Simulation job {job['jobId']} failed: {e}", exc_info=True)
+            job["error"] = f"Gagal menjalankan simulasi: {str(e)}"
+            job["status"] = JOB_FAILED
+        finally:
+            job["finishedAt"] = datetime.utcnow().isoformat() + "Z"
+            job["_expires"] = time.monotonic() + self.result_ttl
+
+        if job["status"] == JOB_COMPLETED and self.persist:
+            await self._save(job)
+
+    async def _save(self, job: Dict[str, Any]):
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud.save_simulation_result(
+                    db=db,
+                    params=job["_params"],
+                    result=job["result"],
+                    processing_time_ms=job["result"]["prediction"].get("processingTimeMs"),
+                    # Versi model yang menjalankan job, bukan versi saat job di-submit
+                    model_version=job["result"]["prediction"].get("modelVersion"),
+                    **job["_save_kwargs"]
+                )
+        except Exception as e:
+            logger.error(f"Failed to save simulation job {job['jobId']}: {e}")
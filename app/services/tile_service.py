@@ -0,0 +1,135 @@
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from shapely.geometry import Point, Polygon
+
+from app.config import settings
+from app.utils.mvt import encode_tile, tile_bounds
+
+logger = logging.getLogger(__name__)
+
+
+class TileService:
+    """
+    Service untuk membuat Mapbox Vector Tile (zona inundasi dan gempa)
+    dengan cache tile di disk.
+
+    Layout cache:
+        {TILE_CACHE_DIR}/simulations/{simulation_id}/{z}/{x}/{y}.mvt
+        {TILE_CACHE_DIR}/earthquakes/{data_version}/{z}/{x}/{y}.mvt
+    Hasil simulasi tidak berubah setelah disimpan, jadi tile simulasi di-key dengan id;
+    tile gempa di-key dengan versi data tabel earthquakes.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = Path(cache_dir or settings.TILE_CACHE_DIR)
+        self.extent = settings.TILE_EXTENT
+        self.buffer = settings.TILE_BUFFER
+        self.simplify_px = settings.TILE_SIMPLIFY_PX
+        self._earthquake_version: Optional[str] = None
+
+    # ── Cache disk ───────────────────────────────────────────────────────
+
+    def _cache_path(self, namespace: str, key: str, z: int, x: int, y: int) -> Path:
+        return self.cache_dir / namespace / key / str(z) / str(x) / f"{y}.mvt"
+
+    def get_cached(self, namespace: str, key: str, z: int, x: int, y: int) -> Optional[bytes]:
+        if not settings.TILE_CACHE_ENABLED:
+            return None
+        path = self._cache_path(namespace, key, z, x, y)
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def store(self, namespace: str, key: str, z: int, x: int, y: int, tile: bytes):
+        """Tulis tile secara atomik (tmp + rename), termasuk tile kosong"""
+        if not settings.TILE_CACHE_ENABLED:
+            return
+        path = self._cache_path(namespace, key, z, x, y)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(tile)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Gagal menulis cache tile {path}: {e}")
+
+    def invalidate_simulation(self, simulation_id: str):
+        shutil.rmtree(self.cache_dir / "simulations" / simulation_id, ignore_errors=True)
+
+    def use_earthquake_version(self, version: str):
+        """Hapus tile gempa dari versi data lama saat versi berganti"""
+        if version == self._earthquake_version:
+            return
+        root = self.cache_dir / "earthquakes"
+        if root.exists():
+            for old in root.iterdir():
+                if old.name != version:
+                    shutil.rmtree(old, ignore_errors=True)
+        self._earthquake_version = version
+
+    # ── Query & encoding ─────────────────────────────────────────────────
+
+    def query_bounds(self, z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+        """Bounds tile diperluas sebesar buffer, untuk filter query database"""
+        min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+        pad_lon = (max_lon - min_lon) * self.buffer / self.extent
+        pad_lat = (max_lat - min_lat) * self.buffer / self.extent
+        return min_lon - pad_lon, min_lat - pad_lat, max_lon + pad_lon, max_lat + pad_lat
+
+    def _encode(self, layers: Dict[str, List[Dict[str, Any]]], z: int, x: int, y: int) -> bytes:
+        return encode_tile(
+            layers, z, x, y,
+            extent=self.extent, buffer=self.buffer, simplify_px=self.simplify_px
+        )
+
+    def simulation_tile(self, simulation: Dict[str, Any], z: int, x: int, y: int) -> bytes:
+        """
+        Tile untuk satu simulasi: layer "inundation" (dari prediction_data.inundationZones)
+        dan "epicenter".
+        """
+        prediction_data = simulation.get("prediction_data") or {}
+        inundation = []
+        for level, zone in enumerate(prediction_data.get("inundationZones", [])):
+            rings = zone.get("coordinates") or []
+            if not rings or len(rings[0]) < 4:
+                continue
+            inundation.append({
+                "geometry": Polygon(rings[0], rings[1:]),
+                "properties": {"height": float(zone.get("height", 0.0)), "level": level}
+            })
+
+        epicenter = [{
+            "geometry": Point(simulation["longitude"], simulation["latitude"]),
+            "properties": {
+                "magnitude": float(simulation["magnitude"]),
+                "depth": float(simulation["depth"]),
+                "mode": simulation.get("mode")
+            }
+        }]
+        return self._encode({"inundation": inundation, "epicenter": epicenter}, z, x, y)
+
+    def earthquake_tile(self, earthquakes: List[Dict[str, Any]], z: int, x: int, y: int) -> bytes:
+        """Tile layer "earthquakes" (titik) dari tabel earthquakes"""
+        features = [
+            {
+                "geometry": Point(eq["longitude"], eq["latitude"]),
+                "properties": {
+                    "id": eq["id"],
+                    "magnitude": float(eq["magnitude"]),
+                    "depth": float(eq["depth"]),
+                    "location": eq.get("location"),
+                    "timestamp": eq.get("timestamp"),
+                    "source": eq.get("source"),
+                    "tsunami_risk_level": eq.get("tsunami_risk_level")
+                }
+            }
+            for eq in earthquakes
+        ]
+        return self._encode({"earthquakes": features}, z, x, y)
@@ -0,0 +1,176 @@
+import logging
+import math
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import ndimage
+from skimage import measure
+from skimage.graph import MCP_Geometric
+
+from app.config import settings
+from app.utils.bathymetry import load_bathymetry_grid
+from app.utils.geojson_utils import grid_contour_to_ring
+
+logger = logging.getLogger(__name__)
+
+GRAVITY = 9.81  # m/s^2
+EARTH_RADIUS_M = 6371000.0
+
+
+class TravelTimeEngine:
+    """
+    Waktu tiba gelombang pertama (menit) dari epicenter ke seluruh grid bathymetry.
+
+    Kecepatan gelombang air dangkal c = sqrt(g * h) per sel; waktu tiba diselesaikan
+    dengan Dijkstra pada grid 8-tetangga (skimage MCP_Geometric, Cython), biaya
+    per langkah = jarak * rata-rata slowness (1/c) dua sel. Sel darat tidak dilewati.
+
+    Field hasil di-cache per sel epicenter (LRU). Sel darat diisi waktu tiba sel laut
+    terdekat, sehingga titik pesisir di darat dan kontur isochrone tetap terdefinisi.
+    """
+
+    def __init__(self, depth: np.ndarray, bounds: Dict[str, float], cache_size: Optional[int] = None):
+        self.bounds = bounds
+        self.shape = depth.shape
+        height, width = self.shape
+        self.lat_step = (bounds["max_lat"] - bounds["min_lat"]) / height
+        self.lon_step = (bounds["max_lon"] - bounds["min_lon"]) / width
+
+        ocean = depth > 0
+        if not ocean.any():
+            raise ValueError("bathymetry grid has no ocean cells")
+
+        # Slowness (s/m); darat = inf (tidak dapat dilewati)
+        speed = np.sqrt(GRAVITY * np.maximum(depth, settings.TRAVEL_TIME_MIN_DEPTH))
+        costs = np.where(ocean, 1.0 / speed, np.inf)
+
+        # Jarak antar pusat sel (m) pada lintang tengah
+        mid_lat = math.radians((bounds["min_lat"] + bounds["max_lat"]) / 2)
+        dy = EARTH_RADIUS_M * math.radians(self.lat_step)
+        dx = EARTH_RADIUS_M * math.radians(self.lon_step) * math.cos(mid_lat)
+        self._mcp = MCP_Geometric(costs, sampling=(dy, dx), fully_connected=True)
+        self._solve_lock = threading.Lock()
+
+        # Index sel laut terdekat untuk setiap sel (sel laut -> dirinya sendiri)
+        _, nearest = ndimage.distance_transform_edt(~ocean, return_indices=True)
+        self._nearest_ocean = (nearest[0], nearest[1])
+        # Sel laut yang bersebelahan dengan darat
+        self._coast = ocean & ndimage.binary_dilation(~ocean, structure=np.ones((3, 3), dtype=bool))
+
+        # Bounds pusat sel, agar kontur (row, col) dipetakan persis oleh grid_contour_to_ring
+        self._center_bounds = {
+            "min_lat": bounds["min_lat"] + self.lat_step / 2,
+            "max_lat": bounds["max_lat"] - self.lat_step / 2,
+            "min_lon": bounds["min_lon"] + self.lon_step / 2,
+            "max_lon": bounds["max_lon"] - self.lon_step / 2,
+        }
+
+        self.cache_size = cache_size if cache_size is not None else settings.TRAVEL_TIME_CACHE_SIZE
+        self._cache: "OrderedDict[Tuple[int, int], np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> Optional["TravelTimeEngine"]:
+        """Load dari BATHYMETRY_FILE; None jika nonaktif / file tidak ada (ETA heuristik)"""
+        if not settings.TRAVEL_TIME_ENABLED:
+            return None
+        path = Path(path or settings.BATHYMETRY_FILE)
+        if not path.exists():
+            logger.warning(f"⚠️ Bathymetry not found at {path}, using heuristic ETA")
+            return None
+
+        size = settings.TRAVEL_TIME_GRID_SIZE
+        try:
+            depth = load_bathymetry_grid(path, settings.SUNDA_STRAIT_BOUNDS, (size, size))
+            engine = cls(depth, settings.SUNDA_STRAIT_BOUNDS)
+        except Exception as e:
+            logger.error(f"❌ Failed to load bathymetry {path}: {e}")
+            return None
+
+        logger.info(f"✅ Travel time engine ready: {size}x{size} grid from {path.name}")
+        return engine
+
+    def covers(self, lat: float, lon: float) -> bool:
+        b = self.bounds
+        return b["min_lat"] <= lat <= b["max_lat"] and b["min_lon"] <= lon <= b["max_lon"]
+
+    def _cells(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        height, width = self.shape
+        rows = np.floor((np.asarray(lats) - self.bounds["min_lat"]) / self.lat_step).astype(np.intp)
+        cols = np.floor((np.asarray(lons) - self.bounds["min_lon"]) / self.lon_step).astype(np.intp)
+        return np.clip(rows, 0, height - 1), np.clip(cols, 0, width - 1)
+
+    def arrival_minutes(self, lat: float, lon: float) -> Optional[np.ndarray]:
+        """
+        Field waktu tiba (menit, float32, shape grid) dari epicenter, None jika di luar grid.
+        Sel yang tidak terjangkau (cekungan terpisah) bernilai inf.
+        """
+        if not self.covers(lat, lon):
+            return None
+
+        rows, cols = self._cells(lat, lon)
+        key = (int(rows), int(cols))
+        with self._cache_lock:
+            field = self._cache.get(key)
+            if field is not None:
+                self._cache.move_to_end(key)
+                return field
+
+        # Epicenter di darat: mulai dari sel laut terdekat
+        start = (int(self._nearest_ocean[0][key]), int(self._nearest_ocean[1][key]))
+        with self._solve_lock:
+            seconds, _ = self._mcp.find_costs([start])
+
+        minutes = (seconds / 60.0).astype(np.float32)
+        field = minutes[self._nearest_ocean]
+        field.flags.writeable = False
+
+        with self._cache_lock:
+            self._cache[key] = field
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return field
+
+    def sample(self, field: np.ndarray, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Waktu tiba (menit) di titik-titik (lats, lons); NaN untuk titik di luar grid"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        b = self.bounds
+        inside = (lats >= b["min_lat"]) & (lats <= b["max_lat"]) & (lons >= b["min_lon"]) & (lons <= b["max_lon"])
+        rows, cols = self._cells(lats, lons)
+        return np.where(inside, field[rows, cols], np.nan)
+
+    def coastal_eta(self, field: np.ndarray) -> float:
+        """Waktu tiba paling awal (menit) di garis pantai; inf jika tidak ada pantai terjangkau"""
+        if not self._coast.any():
+            return math.inf
+        return float(field[self._coast].min())
+
+    def isochrones(self, field: np.ndarray, minutes: Optional[Sequence[int]] = None) -> List[Dict]:
+        """
+        Polygon isochrone (kontur waktu tiba) per level menit, kontur terbesar per level.
+        """
+        finite = np.isfinite(field)
+        if not finite.any():
+            return []
+        # Sel tidak terjangkau dianggap "belum tiba" agar kontur tetap tertutup di sekitarnya
+        values = np.where(finite, field, float(field[finite].max()) + 1.0)
+
+        result = []
+        for level in (minutes if minutes is not None else settings.ISOCHRONE_MINUTES):
+            contours = measure.find_contours(values, level=level)
+            if not contours:
+                continue
+            largest = max(contours, key=len)
+            if len(largest) < 4:
+                continue
+            ring = grid_contour_to_ring(
+                largest, self._center_bounds, self.shape,
+                tolerance=settings.CONTOUR_SIMPLIFY_TOLERANCE
+            )
+            result.append({"minutes": int(level), "coordinates": [ring]})
+        return result
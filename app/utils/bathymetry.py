@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+
+
+def load_bathymetry_grid(
+    path: Path,
+    bounds: Dict[str, float],
+    shape: Tuple[int, int],
+    positive_depth: Optional[bool] = None
+) -> np.ndarray:
+    """
+    Resample raster bathymetry (GeoTIFF) ke grid regular di dalam bounds.
+
+    Orientasi grid sama dengan grid model: baris 0 = min_lat, kolom 0 = min_lon.
+    Raster berisi elevasi (negatif di laut, konvensi GEBCO) kecuali
+    positive_depth / settings.BATHYMETRY_POSITIVE_DEPTH.
+
+    Returns:
+        np.ndarray shape (H, W) float32: kedalaman laut dalam meter (> 0), 0 untuk darat / nodata
+    """
+    import rasterio
+    from rasterio.crs import CRS
+    from rasterio.transform import from_bounds
+    from rasterio.warp import Resampling, reproject
+
+    if positive_depth is None:
+        positive_depth = settings.BATHYMETRY_POSITIVE_DEPTH
+
+    height, width = shape
+    dst_crs = CRS.from_epsg(4326)
+    dst_transform = from_bounds(
+        bounds["min_lon"], bounds["min_lat"], bounds["max_lon"], bounds["max_lat"], width, height
+    )
+    values = np.full(shape, np.nan, dtype=np.float32)
+
+    with rasterio.open(path) as src:
+        reproject(
+            source=rasterio.band(src, 1),
+            destination=values,
+            src_crs=src.crs or dst_crs,
+            src_nodata=src.nodata,
+            dst_transform=dst_transform,
+            dst_crs=dst_crs,
+            dst_nodata=np.nan,
+            resampling=Resampling.average
+        )
+
+    # Raster north-up (baris 0 = max_lat) -> baris 0 = min_lat
+    values = values[::-1]
+    depth = values if positive_depth else -values
+    return np.ascontiguousarray(np.where(np.isfinite(depth) & (depth > 0), depth, 0.0), dtype=np.float32)
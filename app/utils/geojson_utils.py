@@ -1,6 +1,8 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import json
 
+import numpy as np
+
 def create_point_geojson(longitude: float, latitude: float, properties: Dict = None) -> Dict:
     """
     Create GeoJSON Point feature
@@ -51,3 +53,49 @@ def validate_geojson(geojson: Dict) -> bool:
         return False
     
     return True
+
+def grid_contour_to_ring(
+    contour: np.ndarray,
+    bounds: Dict[str, float],
+    shape: Tuple[int, int],
+    tolerance: float = 0.0,
+    precision: int = 6
+) -> List[List[float]]:
+    """
+    Konversi kontur piksel (row, col) dari skimage.measure.find_contours ke ring
+    GeoJSON [[lon, lat], ...] dengan satu affine transform NumPy, opsional
+    disederhanakan (Douglas-Peucker) dengan toleransi dalam derajat.
+    """
+    H, W = shape
+    scale = np.array([
+        (bounds["max_lon"] - bounds["min_lon"]) / (W - 1),
+        (bounds["max_lat"] - bounds["min_lat"]) / (H - 1),
+    ])
+    offset = np.array([bounds["min_lon"], bounds["min_lat"]])
+
+    # (row, col) -> (col, row) -> (lon, lat)
+    coords = contour[:, ::-1] * scale + offset
+
+    # Tutup ring (GeoJSON: titik pertama == titik terakhir)
+    if not np.array_equal(coords[0], coords[-1]):
+        coords = np.vstack([coords, coords[:1]])
+
+    if tolerance > 0:
+        coords = simplify_ring(coords, tolerance)
+
+    return np.round(coords, precision).tolist()
+
+
+def simplify_ring(coords: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification untuk ring tertutup (N, 2).
+    Ring asli dikembalikan jika hasil simplifikasi terlalu kecil untuk polygon.
+    """
+    import shapely
+
+    simplified = shapely.get_coordinates(
+        shapely.simplify(shapely.linestrings(coords), tolerance, preserve_topology=False)
+    )
+    if len(simplified) < 4:
+        return coords
+    return simplified
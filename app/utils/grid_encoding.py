@@ -0,0 +1,83 @@
+"""
+Encoding wave grid 2D ke payload biner ringkas untuk heatmap di frontend.
+
+Format "f16" (application/octet-stream), little-endian:
+    header 32 byte: magic b"AVWG", version u8, dtype u8 (1 = float16),
+                    height u16, width u16, min_lon f32, min_lat f32,
+                    max_lon f32, max_lat f32, 6 byte reserved
+    data:           height*width float16, row-major, baris 0 = min_lat (selatan)
+
+Format "png": PNG grayscale 16-bit, baris pertama = max_lat (utara, north-up).
+    Nilai piksel * scale = tinggi gelombang (meter). Georeferencing dan scale
+    disimpan di chunk tEXt "avatar:bounds" dan "avatar:scale".
+"""
+import struct
+import zlib
+from typing import Dict, Tuple
+
+import numpy as np
+
+F16_MAGIC = b"AVWG"
+F16_VERSION = 1
+F16_DTYPE_FLOAT16 = 1
+F16_HEADER = struct.Struct("<4sBBHH4f6x")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _bounds_tuple(bounds: Dict[str, float]) -> Tuple[float, float, float, float]:
+    return bounds["min_lon"], bounds["min_lat"], bounds["max_lon"], bounds["max_lat"]
+
+
+def encode_float16(grid: np.ndarray, bounds: Dict[str, float]) -> bytes:
+    """Encode grid ke header 32 byte + float16 little-endian"""
+    height, width = grid.shape
+    header = F16_HEADER.pack(F16_MAGIC, F16_VERSION, F16_DTYPE_FLOAT16, height, width, *_bounds_tuple(bounds))
+    return header + np.ascontiguousarray(grid, dtype="<f2").tobytes()
+
+
+def decode_float16(payload: bytes) -> Tuple[np.ndarray, Dict[str, float]]:
+    """Decode payload f16 (dipakai di test / client Python)"""
+    magic, version, dtype, height, width, min_lon, min_lat, max_lon, max_lat = F16_HEADER.unpack_from(payload)
+    if magic != F16_MAGIC or version != F16_VERSION or dtype != F16_DTYPE_FLOAT16:
+        raise ValueError("Bukan payload wave grid AVWG v1 float16")
+    grid = np.frombuffer(payload, dtype="<f2", offset=F16_HEADER.size, count=height * width)
+    bounds = {"min_lon": min_lon, "min_lat": min_lat, "max_lon": max_lon, "max_lat": max_lat}
+    return grid.reshape(height, width).astype(np.float32), bounds
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data)) + chunk_type + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+    )
+
+
+def encode_png16(grid: np.ndarray, bounds: Dict[str, float]) -> Tuple[bytes, float]:
+    """
+    Encode grid ke PNG grayscale 16-bit (north-up).
+
+    Returns:
+        (bytes PNG, scale meter per unit piksel)
+    """
+    height, width = grid.shape
+    clipped = np.clip(grid, 0.0, None)
+    peak = float(clipped.max()) if clipped.size else 0.0
+    scale = peak / 65535.0 if peak > 0 else 1.0
+    pixels = np.round(clipped[::-1] / scale).astype(">u2")
+
+    # Setiap scanline diawali byte filter 0 (None)
+    raw = np.zeros((height, 1 + width * 2), dtype=np.uint8)
+    raw[:, 1:] = pixels.view(np.uint8).reshape(height, width * 2)
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 16, 0, 0, 0, 0)
+    bounds_text = ",".join(f"{v:.6f}" for v in _bounds_tuple(bounds))
+    png = (
+        PNG_SIGNATURE
+        + _png_chunk(b"IHDR", ihdr)
+        + _png_chunk(b"tEXt", b"avatar:bounds\x00" + bounds_text.encode())
+        + _png_chunk(b"tEXt", b"avatar:scale\x00" + repr(scale).encode())
+        + _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+        + _png_chunk(b"IEND", b"")
+    )
+    return png, scale
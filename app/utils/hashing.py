@@ -0,0 +1,15 @@
+"""
+Fingerprint file (SHA-256) untuk validasi artefak turunan model
+(scenario atlas, graph ONNX Runtime teroptimasi).
+"""
+import hashlib
+from pathlib import Path
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 isi file, dibaca per blok 1 MB"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,231 @@
+"""
+Encoder Mapbox Vector Tile (spec v2.1) tanpa dependency tambahan.
+
+Geometri masuk dalam lon/lat (EPSG:4326), diproyeksikan ke Web Mercator
+lalu ke koordinat tile integer [0, extent). Clipping (dengan buffer) dan
+simplifikasi dilakukan di ruang tile, sehingga toleransi simplifikasi
+dalam piksel otomatis menyesuaikan zoom level.
+"""
+import math
+import struct
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import LineString, MultiPolygon, Point, Polygon
+from shapely.geometry.base import BaseGeometry
+from shapely.geometry.polygon import orient
+
+MVT_VERSION = 2
+GEOM_POINT = 1
+GEOM_LINESTRING = 2
+GEOM_POLYGON = 3
+
+CMD_MOVE_TO = 1
+CMD_LINE_TO = 2
+CMD_CLOSE_PATH = 7
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Bounds tile XYZ (slippy map) dalam lon/lat: (min_lon, min_lat, max_lon, max_lat)"""
+    n = 2 ** z
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def _to_tile_coords(coords: np.ndarray, z: int, x: int, y: int, extent: int) -> np.ndarray:
+    """Lon/lat -> koordinat tile (origin kiri atas, y ke bawah), vectorized"""
+    n = 2 ** z
+    lon = coords[:, 0]
+    lat = np.clip(coords[:, 1], -85.0511287798, 85.0511287798)
+    world_x = (lon + 180.0) / 360.0 * n
+    world_y = (1.0 - np.log(np.tan(np.radians(lat)) + 1.0 / np.cos(np.radians(lat))) / math.pi) / 2.0 * n
+    return np.column_stack(((world_x - x) * extent, (world_y - y) * extent))
+
+
+def _zigzag(value):
+    """ZigZag 64-bit, berlaku untuk int Python maupun array int64"""
+    return (value << 1) ^ (value >> 63)
+
+
+def _command(cmd: int, count: int) -> int:
+    return (cmd & 0x7) | (count << 3)
+
+
+# ── Protobuf writer minimal ──────────────────────────────────────────────
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _field_varint(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(value)
+
+
+def _field_bytes(field: int, data: bytes) -> bytes:
+    return _varint((field << 3) | 2) + _varint(len(data)) + data
+
+
+def _field_packed(field: int, values: Iterable[int]) -> bytes:
+    return _field_bytes(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    # Layer.Value: string=1, double=3, sint=6, bool=7
+    if isinstance(value, bool):
+        return _field_varint(7, int(value))
+    if isinstance(value, int):
+        return _field_varint(6, _zigzag(value))
+    if isinstance(value, float):
+        return _varint((3 << 3) | 1) + struct.pack("<d", value)
+    return _field_bytes(1, str(value).encode("utf-8"))
+
+
+# ── Encoding geometri ────────────────────────────────────────────────────
+
+def _ring_commands(ring: np.ndarray, cursor: List[int], closed: bool) -> List[int]:
+    """
+    Command MoveTo/LineTo(/ClosePath) untuk satu ring atau line.
+    Titik berurutan yang sama setelah pembulatan dibuang.
+    """
+    points = np.rint(ring).astype(np.int64)
+    if closed:
+        points = points[:-1]
+    if len(points) > 1:
+        keep = np.ones(len(points), dtype=bool)
+        keep[1:] = np.any(np.diff(points, axis=0) != 0, axis=1)
+        points = points[keep]
+    if len(points) < (3 if closed else 2):
+        return []
+
+    deltas = np.diff(np.vstack([cursor, points]), axis=0)
+    cursor[:] = points[-1].tolist()
+    zz = _zigzag(deltas).ravel().tolist()
+
+    commands = [_command(CMD_MOVE_TO, 1), zz[0], zz[1], _command(CMD_LINE_TO, len(points) - 1)]
+    commands.extend(zz[2:])
+    if closed:
+        commands.append(_command(CMD_CLOSE_PATH, 1))
+    return commands
+
+
+def _encode_geometry(geom: BaseGeometry) -> Tuple[int, List[int]]:
+    cursor = [0, 0]
+    if isinstance(geom, Point) or geom.geom_type == "MultiPoint":
+        points = np.rint(shapely.get_coordinates(geom)).astype(np.int64)
+        deltas = np.diff(np.vstack([cursor, points]), axis=0)
+        zz = _zigzag(deltas).ravel().tolist()
+        return GEOM_POINT, [_command(CMD_MOVE_TO, len(points))] + zz
+
+    if isinstance(geom, LineString) or geom.geom_type == "MultiLineString":
+        commands: List[int] = []
+        for line in getattr(geom, "geoms", [geom]):
+            commands.extend(_ring_commands(np.asarray(line.coords), cursor, closed=False))
+        return GEOM_LINESTRING, commands
+
+    commands = []
+    polygons = geom.geoms if isinstance(geom, MultiPolygon) else [geom]
+    for polygon in polygons:
+        # Di ruang tile (y ke bawah) exterior ring harus ber-area positif (shoelace)
+        polygon = orient(polygon, sign=1.0)
+        exterior = _ring_commands(np.asarray(polygon.exterior.coords), cursor, closed=True)
+        if not exterior:
+            continue
+        commands.extend(exterior)
+        for interior in polygon.interiors:
+            commands.extend(_ring_commands(np.asarray(interior.coords), cursor, closed=True))
+    return GEOM_POLYGON, commands
+
+
+def _prepare_geometry(
+    geom: BaseGeometry,
+    z: int,
+    x: int,
+    y: int,
+    extent: int,
+    buffer: int,
+    simplify_px: float
+) -> BaseGeometry:
+    """Proyeksi ke ruang tile, clip dengan buffer, lalu simplifikasi (toleransi dalam piksel tile)"""
+    tile_geom = shapely.transform(geom, lambda c: _to_tile_coords(c, z, x, y, extent))
+    clipped = shapely.clip_by_rect(tile_geom, -buffer, -buffer, extent + buffer, extent + buffer)
+    if clipped.is_empty:
+        return clipped
+    if simplify_px > 0 and clipped.geom_type not in ("Point", "MultiPoint"):
+        clipped = clipped.simplify(simplify_px, preserve_topology=True)
+    if clipped.geom_type == "GeometryCollection":
+        # clip_by_rect bisa menghasilkan campuran; ambil polygon saja
+        parts = [g for g in clipped.geoms if isinstance(g, Polygon)]
+        clipped = MultiPolygon(parts) if parts else Polygon()
+    return clipped
+
+
+def encode_tile(
+    layers: Dict[str, List[Dict[str, Any]]],
+    z: int,
+    x: int,
+    y: int,
+    extent: int = 4096,
+    buffer: int = 64,
+    simplify_px: float = 1.0
+) -> bytes:
+    """
+    Encode layer -> bytes MVT.
+
+    Args:
+        layers: {nama layer: [{"geometry": shapely geom lon/lat, "properties": dict, "id": int opsional}]}
+
+    Returns:
+        bytes tile (kosong jika tidak ada fitur di dalam tile)
+    """
+    tile = bytearray()
+    for name, features in layers.items():
+        keys: Dict[str, int] = {}
+        values: Dict[Tuple[type, Any], int] = {}
+        encoded_features = []
+
+        for feature in features:
+            geom = _prepare_geometry(feature["geometry"], z, x, y, extent, buffer, simplify_px)
+            if geom.is_empty:
+                continue
+            geom_type, commands = _encode_geometry(geom)
+            if not commands:
+                continue
+
+            tags: List[int] = []
+            for key, value in feature.get("properties", {}).items():
+                if value is None:
+                    continue
+                tags.append(keys.setdefault(key, len(keys)))
+                tags.append(values.setdefault((type(value), value), len(values)))
+
+            body = b""
+            if feature.get("id") is not None:
+                body += _field_varint(1, int(feature["id"]))
+            if tags:
+                body += _field_packed(2, tags)
+            body += _field_varint(3, geom_type) + _field_packed(4, commands)
+            encoded_features.append(body)
+
+        if not encoded_features:
+            continue
+
+        layer = _field_varint(15, MVT_VERSION) + _field_bytes(1, name.encode("utf-8"))
+        layer += b"".join(_field_bytes(2, f) for f in encoded_features)
+        layer += b"".join(_field_bytes(3, k.encode("utf-8")) for k in keys)
+        layer += b"".join(_field_bytes(4, _encode_value(v)) for _, v in values)
+        layer += _field_varint(5, extent)
+        tile += _field_bytes(3, layer)
+
+    return bytes(tile)
@@ -0,0 +1,65 @@
+"""
+Encoding hasil parameter sweep (PredictionService.predict_sweep) ke format kolom.
+
+Format "npz" (application/octet-stream): np.savez_compressed, satu array per kolom
+    magnitude, depth, latitude, longitude, max_wave_height, category (N,)
+    city_wave_height (N, C), city_max_wave_height, city_name, city_latitude, city_longitude (C,)
+    meta: string JSON (points, shape, mode, modelUsed, categories, ...)
+    Dibaca dengan np.load(..., allow_pickle=False).
+
+Format "parquet": satu baris per titik; kolom per titik pesisir bernama
+    "wave:<j>:<nama>" (j = indeks kolom city_*, unik walau nama gazetteer duplikat),
+    category sebagai dictionary, meta di metadata schema "sweep".
+    Memerlukan pyarrow (opsional, tidak ada di requirements.txt).
+"""
+import io
+import json
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+POINT_COLUMNS = ("magnitude", "depth", "latitude", "longitude", "max_wave_height")
+
+
+def encode_npz(columns: Dict[str, np.ndarray], meta: Dict[str, Any]) -> bytes:
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, meta=np.array(json.dumps(meta)), **columns)
+    return buffer.getvalue()
+
+
+def decode_npz(payload: bytes) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Decode payload npz (dipakai di test / client Python)"""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+        columns = {name: data[name] for name in data.files if name != "meta"}
+        meta = json.loads(str(data["meta"]))
+    return columns, meta
+
+
+def encode_parquet(columns: Dict[str, np.ndarray], meta: Dict[str, Any]) -> bytes:
+    """
+    Raises:
+        RuntimeError: jika pyarrow tidak terpasang
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Format parquet memerlukan pyarrow (pip install pyarrow)")
+
+    arrays = [pa.array(columns[name]) for name in POINT_COLUMNS]
+    names = list(POINT_COLUMNS)
+    arrays.append(pa.DictionaryArray.from_arrays(
+        pa.array(columns["category"]), pa.array(meta["categories"])
+    ))
+    names.append("category")
+
+    heights = columns["city_wave_height"]
+    for j, city in enumerate(columns["city_name"].tolist()):
+        arrays.append(pa.array(heights[:, j]))
+        names.append(f"wave:{j}:{city}")
+
+    table = pa.Table.from_arrays(arrays, names=names)
+    table = table.replace_schema_metadata({"sweep": json.dumps(meta)})
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
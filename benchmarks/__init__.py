@@ -0,0 +1 @@
+"""Performance benchmarks (dijalankan manual, bukan bagian dari pytest)"""
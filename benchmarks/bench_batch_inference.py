@@ -0,0 +1,70 @@
+"""
+Benchmark: N x predict() serial vs satu predict_batch() untuk daftar realtime.
+
+Usage:
+    python -m benchmarks.bench_batch_inference
+    python -m benchmarks.bench_batch_inference --model trained_models/model_tsunami_trial.onnx --repeat 5
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from app.config import settings
+from app.models.model_loader import InferenceEngine
+from app.services.prediction_service import PredictionService
+
+
+def _random_scenarios(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    return [
+        {
+            "magnitude": rng.uniform(6.0, 9.0),
+            "depth": rng.uniform(5.0, 80.0),
+            "latitude": rng.uniform(bounds["min_lat"], bounds["max_lat"]),
+            "longitude": rng.uniform(bounds["min_lon"], bounds["max_lon"]),
+        }
+        for _ in range(n)
+    ]
+
+
+async def _time_serial(service: PredictionService, scenarios) -> float:
+    start = time.perf_counter()
+    for sc in scenarios:
+        await service.predict(**sc)
+    return time.perf_counter() - start
+
+
+async def _time_batch(service: PredictionService, scenarios) -> float:
+    start = time.perf_counter()
+    await service.predict_batch(scenarios)
+    return time.perf_counter() - start
+
+
+async def main(args) -> int:
+    engine = InferenceEngine()
+    if not engine.load_model(args.model):
+        print("Model ONNX tidak dapat di-load; benchmark batch membutuhkan model asli.")
+        return 1
+    service = PredictionService(engine=engine)
+
+    # Warm-up (alokasi arena ONNX Runtime)
+    await service.predict_batch(_random_scenarios(2))
+
+    print(f"{'N':>5} {'serial (ms)':>12} {'batch (ms)':>12} {'speedup':>8}")
+    for n in args.sizes:
+        scenarios = _random_scenarios(n)
+        serial = min([await _time_serial(service, scenarios) for _ in range(args.repeat)])
+        batch = min([await _time_batch(service, scenarios) for _ in range(args.repeat)])
+        print(f"{n:>5} {serial * 1000:>12.1f} {batch * 1000:>12.1f} {serial / batch:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="Path model ONNX (default: settings.MODEL_PATH)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    sys.exit(asyncio.run(main(parser.parse_args())))
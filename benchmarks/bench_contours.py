@@ -0,0 +1,80 @@
+"""
+Benchmark: konversi kontur -> GeoJSON ring (loop Python per titik vs affine NumPy
++ simplifikasi Douglas-Peucker). Melaporkan waktu konversi dan ukuran payload JSON.
+
+Usage:
+    python -m benchmarks.bench_contours --tolerance 0.005
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from skimage import measure
+
+from app.config import settings
+from app.utils.geojson_utils import grid_contour_to_ring
+
+
+def legacy_ring(contour: np.ndarray, bounds, shape):
+    """Salinan loop per titik di _generate_inundation_zones sebelum vectorisasi"""
+    H, W = shape
+    ring = []
+    for row, col in contour:
+        real_lon = bounds["min_lon"] + (col / (W - 1)) * (bounds["max_lon"] - bounds["min_lon"])
+        real_lat = bounds["min_lat"] + (row / (H - 1)) * (bounds["max_lat"] - bounds["min_lat"])
+        ring.append([round(real_lon, 6), round(real_lat, 6)])
+    ring.append(ring[0])
+    return ring
+
+
+def synthetic_wave_grid(seed: int = 0) -> np.ndarray:
+    """Wave grid 128x128 dengan puncak Gaussian + gangguan agar kontur tidak mulus"""
+    rng = np.random.default_rng(seed)
+    yv, xv = np.mgrid[0:128, 0:128]
+    grid = 3.0 * np.exp(-((xv - 64) ** 2 + (yv - 60) ** 2) / (2 * 18 ** 2))
+    grid += 0.15 * np.sin(xv / 4.0) * np.cos(yv / 5.0) + 0.02 * rng.standard_normal((128, 128))
+    return grid.astype(np.float32)
+
+
+def _time(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return (time.perf_counter() - start) / iterations, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tolerance", type=float, default=settings.CONTOUR_SIMPLIFY_TOLERANCE)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    grid = synthetic_wave_grid()
+    grid_max = float(grid.max())
+    contours = [
+        max(measure.find_contours(grid, level=grid_max * fraction), key=len)
+        for fraction in (0.30, 0.55, 0.80)
+    ]
+
+    legacy_time, legacy = _time(lambda: [legacy_ring(c, bounds, grid.shape) for c in contours], args.iterations)
+    vector_time, vector = _time(lambda: [grid_contour_to_ring(c, bounds, grid.shape) for c in contours], args.iterations)
+    simple_time, simple = _time(
+        lambda: [grid_contour_to_ring(c, bounds, grid.shape, tolerance=args.tolerance) for c in contours],
+        args.iterations
+    )
+
+    print(f"{'variant':<32} {'time (us)':>10} {'points':>8} {'JSON bytes':>11}")
+    for label, elapsed, rings in (
+        ("legacy Python loop", legacy_time, legacy),
+        ("NumPy affine", vector_time, vector),
+        (f"NumPy affine + DP tol={args.tolerance}", simple_time, simple),
+    ):
+        points = sum(len(r) for r in rings)
+        size = len(json.dumps([{"coordinates": [r]} for r in rings]))
+        print(f"{label:<32} {elapsed * 1e6:>10.1f} {points:>8} {size:>11}")
+
+
+if __name__ == "__main__":
+    main()
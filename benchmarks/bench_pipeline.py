@@ -0,0 +1,253 @@
+"""
+Benchmark pipeline prediksi per stage, mode AI dan HEURISTIC, batch size 1-128.
+
+Stage yang diukur (per batch):
+    input_build   InputBuilder.build_batch
+    session_run   InferenceEngine.run (ONNX session.run)
+    contours      _generate_inundation_zones dari wave grid
+    impact_zones  _get_impact_zones
+    wave_series   _generate_wave_data + _generate_zone_wave_data
+    travel_time   TravelTimeEngine.arrival_minutes tanpa cache (jika bathymetry ada)
+    end_to_end    predict() untuk batch 1, predict_batch() untuk batch > 1
+                  (cache dan scenario atlas dimatikan)
+
+Output JSON (p50/p95/p99 ms per batch, throughput event/s, peak RSS) ke stdout
+atau --output. Dengan --baseline, p50 dibandingkan dengan hasil sebelumnya dan
+exit code 2 jika ada stage yang lebih lambat dari --tolerance.
+
+Usage:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --sizes 1 8 32 --repeat 50 --output bench.json
+    python -m benchmarks.bench_pipeline --baseline bench.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+import psutil
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+from app.config import settings
+from app.models.model_loader import InferenceEngine
+from app.services.prediction_service import PredictionService
+
+DEFAULT_SIZES = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+def _random_scenarios(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    return [
+        {
+            "magnitude": rng.uniform(6.5, 9.0),
+            "depth": rng.uniform(5.0, 80.0),
+            "latitude": rng.uniform(bounds["min_lat"], bounds["max_lat"]),
+            "longitude": rng.uniform(bounds["min_lon"], bounds["max_lon"]),
+        }
+        for _ in range(n)
+    ]
+
+
+def _peak_rss_mb() -> float:
+    if resource is not None:
+        # ru_maxrss dalam KB di Linux, byte di macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return round(psutil.Process().memory_info().rss / (1024 * 1024), 1)
+
+
+def _summarize(samples_ms: List[float], batch_size: int) -> Dict[str, float]:
+    samples = np.asarray(samples_ms)
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+        "throughput_per_s": round(batch_size / (samples.mean() / 1000), 1) if samples.mean() > 0 else None,
+    }
+
+
+def _time_stage(func: Callable[[], object], repeat: int) -> List[float]:
+    func()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def _time_async(func: Callable, repeat: int) -> List[float]:
+    await func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def _bench_size(service: PredictionService, size: int, repeat: int) -> Dict[str, Dict]:
+    scenarios = _random_scenarios(size, seed=size)
+    triples = [(sc["magnitude"], sc["latitude"], sc["longitude"]) for sc in scenarios]
+    stages: Dict[str, Dict] = {}
+
+    # Wave grid referensi untuk stage post-processing
+    if service.model_loaded:
+        grids = np.array(service._run_scenarios(triples), copy=True)
+        max_waves = grids.max(axis=(1, 2))
+        stages["input_build"] = _summarize(
+            _time_stage(lambda: service.input_builder.build_batch(triples), repeat), size
+        )
+        batch = service.input_builder.build_batch(triples).copy()
+        stages["session_run"] = _summarize(_time_stage(lambda: service.engine.run(batch), repeat), size)
+    else:
+        grids = [None] * size
+        max_waves = [service._estimate_wave_height(sc["magnitude"], sc["depth"]) for sc in scenarios]
+
+    def contours():
+        for sc, grid, wave in zip(scenarios, grids, max_waves):
+            service._generate_inundation_zones(sc["latitude"], sc["longitude"], float(wave), wave_grid=grid)
+
+    def impact_zones():
+        for sc, wave in zip(scenarios, max_waves):
+            service._get_impact_zones(sc["latitude"], sc["longitude"], sc["magnitude"], float(wave))
+
+    zones = [
+        service._get_impact_zones(sc["latitude"], sc["longitude"], sc["magnitude"], float(wave))
+        for sc, wave in zip(scenarios, max_waves)
+    ]
+    
+    def wave_series():
+        for sc, wave, impact_zones in zip(scenarios, max_waves, zones):
+            eta = service._estimate_eta(sc["magnitude"], sc["depth"], sc["latitude"], sc["longitude"])
+            service._generate_wave_data(eta, float(wave))
+            service._generate_zone_wave_data(impact_zones)
+
+    stages["contours"] = _summarize(_time_stage(contours, repeat), size)
+    stages["impact_zones"] = _summarize(_time_stage(impact_zones, repeat), size)
+    stages["wave_series"] = _summarize(_time_stage(wave_series, repeat), size)
+    
+    if service.travel_time is not None:
+        def travel_time():
+            for sc in scenarios:
+                service.travel_time.arrival_minutes(sc["latitude"], sc["longitude"])
+        
+        stages["travel_time"] = _summarize(_time_stage(travel_time, repeat), size)
+
+    for mode in ("AI", "HEURISTIC"):
+        if size == 1:
+            run = lambda mode=mode: service.predict(**scenarios[0], mode=mode)
+        else:
+            run = lambda mode=mode: service.predict_batch(scenarios, mode=mode)
+        stages[f"end_to_end_{mode.lower()}"] = _summarize(await _time_async(run, repeat), size)
+
+    return stages
+
+
+def _compare(result: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Daftar regresi p50 terhadap baseline (stage mikrodetik diabaikan lewat min_delta_ms)"""
+    regressions = []
+    for size, stages in result["batch_sizes"].items():
+        for stage, stats in stages.items():
+            if not isinstance(stats, dict):  # peak_rss_mb
+                continue
+            base = baseline.get("batch_sizes", {}).get(size, {}).get(stage)
+            if not base or not base.get("p50_ms"):
+                continue
+            ratio = stats["p50_ms"] / base["p50_ms"]
+            if ratio > 1 + tolerance and stats["p50_ms"] - base["p50_ms"] > min_delta_ms:
+                regressions.append(
+                    f"batch={size} {stage}: p50 {base['p50_ms']:.3f} -> {stats['p50_ms']:.3f} ms ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+async def main(args) -> int:
+    engine = InferenceEngine()
+    if not engine.load_model(args.model):
+        print("⚠️ Model ONNX tidak dapat di-load; hanya stage heuristik yang diukur.", file=sys.stderr)
+    service = PredictionService(engine=engine, backend="thread")
+    # Ukur pipeline penuh, bukan cache / atlas / field waktu tiba yang di-cache
+    service.cache = None
+    service.atlas = None
+    if service.travel_time is not None:
+        service.travel_time.cache_size = 0
+
+    result = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "onnxruntime": ort.__version__ if ort else None,
+            "inference_threads": settings.INFERENCE_THREADS,
+            "ort_intra_op_threads": settings.ORT_INTRA_OP_THREADS,
+            "ort_graph_optimization_level": settings.ORT_GRAPH_OPTIMIZATION_LEVEL,
+        },
+        "model": {
+            "loaded": engine.model_loaded,
+            "path": str(engine.model_path) if engine.model_path else None,
+            "sha256": engine.model_sha256,
+            "version": engine.model_version,
+            "variant": engine.variant,
+        },
+        "repeat": args.repeat,
+        "batch_sizes": {},
+    }
+
+    try:
+        for size in args.sizes:
+            result["batch_sizes"][str(size)] = await _bench_size(service, size, args.repeat)
+            result["batch_sizes"][str(size)]["peak_rss_mb"] = _peak_rss_mb()
+            print(f"batch={size} done", file=sys.stderr)
+    finally:
+        service.close()
+
+    result["peak_rss_mb"] = _peak_rss_mb()
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = _compare(result, baseline, args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"❌ REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 2
+        print("✅ Tidak ada regresi terhadap baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="Path model ONNX (default: settings.MODEL_PATH)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=None, help="Tulis JSON ke file (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="JSON hasil sebelumnya untuk deteksi regresi")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Batas perlambatan p50 (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Selisih p50 minimum yang dianggap regresi")
+    sys.exit(asyncio.run(main(parser.parse_args())))
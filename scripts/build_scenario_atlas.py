@@ -0,0 +1,60 @@
+"""
+Precompute scenario atlas (max wave output model ONNX untuk grid magnitudo x sel epicenter)
+ke trained_models/scenario_atlas/ untuk fast path PredictionService.
+
+Usage:
+    python scripts/build_scenario_atlas.py
+    python scripts/build_scenario_atlas.py --min-mag 6.0 --max-mag 9.5 --mag-step 0.25 --cell-stride 4
+"""
+import sys
+import os
+import argparse
+import time
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.config import settings
+from app.models.model_loader import create_inference_engine, resolve_model_path
+from app.models.scenario_atlas import build_atlas
+from app.services.prediction_service import PredictionService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build scenario atlas untuk Selat Sunda")
+    parser.add_argument("--min-mag", type=float, default=6.0)
+    parser.add_argument("--max-mag", type=float, default=9.5)
+    parser.add_argument("--mag-step", type=float, default=0.25)
+    parser.add_argument("--cell-stride", type=int, default=4, help="Jarak sampling sel epicenter (sel grid 128x128)")
+    parser.add_argument("--output", default=settings.SCENARIO_ATLAS_DIR)
+    args = parser.parse_args()
+
+    engine = create_inference_engine()
+    if not engine.model_loaded:
+        print("❌ Model ONNX tidak dapat di-load, atlas tidak dibuat.")
+        sys.exit(1)
+
+    service = PredictionService(engine=engine, backend="thread")
+    magnitudes = np.round(np.arange(args.min_mag, args.max_mag + args.mag_step / 2, args.mag_step), 4)
+    output = resolve_model_path(args.output)
+
+    print(f"Building atlas: {len(magnitudes)} magnitudes, cell stride {args.cell_stride} -> {output}")
+    start = time.time()
+    meta = build_atlas(
+        service._run_scenarios,
+        output,
+        magnitudes=magnitudes,
+        cell_stride=args.cell_stride,
+        model_sha256=engine.model_sha256,
+        model_version=engine.model_version,
+        batch_size=settings.INFERENCE_MAX_BATCH
+    )
+    total = len(meta["magnitudes"]) * len(meta["cell_ys"]) * len(meta["cell_xs"])
+    print(f"✅ {total} skenario selesai dalam {time.time() - start:.1f}s")
+    service.close()
+
+
+if __name__ == "__main__":
+    main()
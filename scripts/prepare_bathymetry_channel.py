@@ -0,0 +1,78 @@
+"""
+Resample raster bathymetry (data/bathymetry/) ke grid input model 128x128
+Selat Sunda (SUNDA_STRAIT_BOUNDS), normalisasi ke 0..1, lalu simpan sebagai
+.npy (settings.BATHYMETRY_CHANNEL_FILE) yang di-memory-map InputBuilder saat startup.
+
+Normalisasi: kedalaman / max_depth, di-clip ke 0..1 (darat = 0). Metadata
+(sumber, max_depth, sha256) ditulis ke file .json di sebelahnya.
+
+Scenario atlas yang dibuat dengan depth channel lain tidak dipakai lagi;
+jalankan ulang scripts/build_scenario_atlas.py setelah script ini.
+
+Usage:
+    python scripts/prepare_bathymetry_channel.py
+    python scripts/prepare_bathymetry_channel.py --source data/bathymetry/gebco.tif --max-depth 2000
+"""
+import sys
+import os
+import argparse
+import hashlib
+import json
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.config import settings
+from app.models.input_builder import GRID_SIZE
+from app.utils.bathymetry import load_bathymetry_grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Siapkan depth channel model dari raster bathymetry")
+    parser.add_argument("--source", default=str(settings.BATHYMETRY_FILE), help="Raster bathymetry (GeoTIFF)")
+    parser.add_argument("--output", default=str(settings.BATHYMETRY_CHANNEL_FILE))
+    parser.add_argument("--max-depth", type=float, default=None,
+                        help="Kedalaman (m) yang dipetakan ke 1.0 (default: kedalaman maksimum di grid)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"❌ Raster bathymetry tidak ditemukan: {args.source}")
+        sys.exit(1)
+
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    depth = load_bathymetry_grid(args.source, bounds, (GRID_SIZE, GRID_SIZE))
+    max_depth = args.max_depth or float(depth.max())
+    if max_depth <= 0:
+        print("❌ Tidak ada sel laut di dalam SUNDA_STRAIT_BOUNDS")
+        sys.exit(1)
+
+    channel = np.clip(depth / max_depth, 0.0, 1.0).astype(np.float32)
+
+    # Tulis ke file sementara lalu rename, agar server yang sedang start tidak membaca file setengah jadi
+    output = args.output
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp = f"{output}.tmp.npy"
+    np.save(tmp, channel)
+    os.replace(tmp, output)
+
+    meta = {
+        "source": os.path.basename(args.source),
+        "bounds": bounds,
+        "shape": list(channel.shape),
+        "normalization": "depth / max_depth, clip 0..1",
+        "max_depth": max_depth,
+        "ocean_fraction": round(float((depth > 0).mean()), 4),
+        "sha256": hashlib.sha256(channel.tobytes()).hexdigest(),
+    }
+    with open(os.path.splitext(output)[0] + ".json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+    print(f"✅ Depth channel {channel.shape} disimpan ke {output} "
+          f"(max_depth={max_depth:.1f} m, laut {meta['ocean_fraction']:.0%})")
+    print("ℹ️ Jalankan ulang scripts/build_scenario_atlas.py agar atlas memakai depth channel ini.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Buat varian model terkuantisasi (INT8 dynamic/static, FP16) dan laporan
+akurasi vs latency terhadap FP32.
+
+Input kalibrasi/evaluasi dibangun dengan InputBuilder yang sama seperti
+PredictionService (Gaussian bump + depth channel), dari skenario acak di
+dalam domain Selat Sunda. Varian disimpan di samping model FP32
+(mis. model_tsunami_trial.int8_dynamic.onnx) dan dipilih lewat MODEL_VARIANT.
+
+Membutuhkan paket `onnx` (quantization) dan `onnxconverter-common` (FP16):
+    pip install onnx onnxconverter-common
+
+Usage:
+    python scripts/quantize_model.py
+    python scripts/quantize_model.py --variants int8_dynamic fp16 --eval-samples 128
+"""
+import sys
+import os
+import argparse
+import json
+import time
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.config import settings
+from app.models.input_builder import InputBuilder
+from app.models.model_loader import MODEL_VARIANTS, InferenceEngine, model_variant_path, resolve_model_path
+
+# Level kontur yang sama dengan PredictionService._generate_inundation_zones
+CONTOUR_LEVELS = (0.30, 0.55, 0.80)
+
+
+def random_scenarios(n: int, seed: int):
+    """(magnitude, lat, lon) acak di domain Selat Sunda"""
+    rng = np.random.default_rng(seed)
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    return list(zip(
+        rng.uniform(6.0, 9.5, n),
+        rng.uniform(bounds["min_lat"], bounds["max_lat"], n),
+        rng.uniform(bounds["min_lon"], bounds["max_lon"], n),
+    ))
+
+
+def build_inputs(scenarios) -> np.ndarray:
+    # build_batch mengembalikan view buffer pool, jadi di-copy
+    return InputBuilder().build_batch(scenarios).copy()
+
+
+def quantize_int8_dynamic(source, target):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    # ConvInteger di CPU EP hanya mendukung bobot uint8
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QUInt8)
+
+
+def quantize_int8_static(source, target, calibration: np.ndarray, input_name: str):
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self.samples = iter(calibration[i:i + 1] for i in range(len(calibration)))
+
+        def get_next(self):
+            sample = next(self.samples, None)
+            return None if sample is None else {input_name: sample}
+
+    quantize_static(
+        str(source), str(target), Reader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
+
+
+def convert_fp16(source, target):
+    import onnx
+    from onnxconverter_common import float16
+    model = float16.convert_float_to_float16(onnx.load(str(source)), keep_io_types=True)
+    onnx.save(model, str(target))
+
+
+def load_engine(path) -> InferenceEngine:
+    engine = InferenceEngine()
+    if not engine.load_model(str(path)):
+        raise RuntimeError(f"Gagal load {path}")
+    return engine
+
+
+def run_grids(engine: InferenceEngine, inputs: np.ndarray, batch_size: int) -> np.ndarray:
+    outputs = [engine.run(inputs[i:i + batch_size]) for i in range(0, len(inputs), batch_size)]
+    return np.concatenate(outputs)[..., 0].astype(np.float32)
+
+
+def measure_latency(engine: InferenceEngine, inputs: np.ndarray, batch_size: int, repeats: int):
+    single = []
+    for i in range(repeats):
+        sample = inputs[i % len(inputs)][None]
+        t = time.perf_counter()
+        engine.run(sample)
+        single.append((time.perf_counter() - t) * 1000)
+
+    batch = inputs[:batch_size]
+    t = time.perf_counter()
+    for _ in range(max(1, repeats // 4)):
+        engine.run(batch)
+    batch_ms = (time.perf_counter() - t) * 1000 / max(1, repeats // 4)
+    return {
+        "single_p50_ms": round(float(np.percentile(single, 50)), 3),
+        "single_p95_ms": round(float(np.percentile(single, 95)), 3),
+        "batch_ms": round(batch_ms, 3),
+        "batch_size": len(batch),
+        "throughput_per_s": round(len(batch) / (batch_ms / 1000), 1),
+    }
+
+
+def compare(reference: np.ndarray, candidate: np.ndarray):
+    """Error max wave dan IoU area kontur per level (relatif terhadap puncak grid FP32)"""
+    ref_max = reference.max(axis=(1, 2))
+    cand_max = candidate.max(axis=(1, 2))
+    abs_err = np.abs(cand_max - ref_max)
+    rel_err = abs_err / np.maximum(np.abs(ref_max), 1e-6)
+
+    ious = {}
+    for level in CONTOUR_LEVELS:
+        threshold = (ref_max * level)[:, None, None]
+        ref_mask = reference >= threshold
+        cand_mask = candidate >= threshold
+        inter = np.logical_and(ref_mask, cand_mask).sum(axis=(1, 2))
+        union = np.logical_or(ref_mask, cand_mask).sum(axis=(1, 2))
+        iou = np.where(union > 0, inter / np.maximum(union, 1), 1.0)
+        ious[f"iou_{int(level * 100)}"] = round(float(iou.mean()), 4)
+
+    return {
+        "max_wave_abs_err_mean": round(float(abs_err.mean()), 4),
+        "max_wave_abs_err_max": round(float(abs_err.max()), 4),
+        "max_wave_rel_err_mean": round(float(rel_err.mean()), 4),
+        **ious,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kuantisasi model tsunami + laporan akurasi/latency")
+    parser.add_argument("--model", default=settings.MODEL_PATH)
+    quantized = [v for v in MODEL_VARIANTS if v != "fp32"]
+    parser.add_argument("--variants", nargs="+", default=quantized, choices=quantized)
+    parser.add_argument("--calibration-samples", type=int, default=64)
+    parser.add_argument("--eval-samples", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=settings.INFERENCE_MAX_BATCH)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default="trained_models/quantization_report.json")
+    args = parser.parse_args()
+
+    # Model sumber selalu FP32, apa pun MODEL_VARIANT yang sedang aktif
+    settings.MODEL_VARIANT = "fp32"
+    source = resolve_model_path(args.model)
+    reference_engine = load_engine(source)
+
+    calibration = build_inputs(random_scenarios(args.calibration_samples, args.seed))
+    eval_inputs = build_inputs(random_scenarios(args.eval_samples, args.seed + 1))
+    reference = run_grids(reference_engine, eval_inputs, args.batch_size)
+
+    report = {
+        "model": str(source),
+        "model_sha256": reference_engine.model_sha256,
+        "eval_samples": args.eval_samples,
+        "variants": {
+            "fp32": {
+                "path": str(source),
+                "size_bytes": source.stat().st_size,
+                **measure_latency(reference_engine, eval_inputs, args.batch_size, args.repeats),
+            }
+        },
+    }
+
+    for variant in args.variants:
+        target = model_variant_path(source, variant)
+        print(f"→ {variant}: {target}")
+        try:
+            if variant == "int8_dynamic":
+                quantize_int8_dynamic(source, target)
+            elif variant == "int8_static":
+                quantize_int8_static(source, target, calibration, reference_engine.input_name)
+            else:
+                convert_fp16(source, target)
+            engine = load_engine(target)
+        except ImportError as e:
+            print(f"  ⚠️ dilewati, dependency tidak tersedia: {e}")
+            report["variants"][variant] = {"skipped": f"missing dependency: {e.name}"}
+            continue
+        except Exception as e:
+            print(f"  ❌ gagal: {e}")
+            report["variants"][variant] = {"skipped": str(e)}
+            continue
+
+        report["variants"][variant] = {
+            "path": str(target),
+            "size_bytes": target.stat().st_size,
+            **compare(reference, run_grids(engine, eval_inputs, args.batch_size)),
+            **measure_latency(engine, eval_inputs, args.batch_size, args.repeats),
+        }
+
+    print(f"\n{'variant':<14}{'size KB':>10}{'p50 ms':>10}{'batch/s':>10}{'|Δmax| m':>10}{'IoU30':>8}{'IoU80':>8}")
+    for name, row in report["variants"].items():
+        if "skipped" in row:
+            print(f"{name:<14}  skipped ({row['skipped']})")
+            continue
+        print(
+            f"{name:<14}{row['size_bytes'] / 1024:>10.0f}{row['single_p50_ms']:>10.2f}"
+            f"{row['throughput_per_s']:>10.1f}{row.get('max_wave_abs_err_mean', 0.0):>10.4f}"
+            f"{row.get('iou_30', 1.0):>8.3f}{row.get('iou_80', 1.0):>8.3f}"
+        )
+
+    report_path = resolve_model_path(args.report)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report: {report_path}")
+    print("Pilih varian dengan MODEL_VARIANT=<variant> di .env")
+
+
+if __name__ == "__main__":
+    main()
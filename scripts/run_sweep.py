@@ -0,0 +1,87 @@
+"""
+Parameter sweep / analisis sensitivitas dari command line (tanpa server).
+
+Grid Cartesian magnitude x depth x latitude x longitude dievaluasi dengan
+PredictionService.predict_sweep (inference batched, paralel di thread pool atau
+worker process jika INFERENCE_BACKEND=process). Hasil kolom ditulis ke .npz
+(default) atau .parquet (memerlukan pyarrow), format sama dengan POST /simulation/sweep.
+
+Setiap rentang: MIN MAX STEPS.
+
+Usage:
+    python scripts/run_sweep.py --magnitude 6.5 9.0 26 --depth 10 60 6 \\
+        --latitude -6.6 -5.6 11 --longitude 105.0 106.0 11 --output data/sweeps/sunda.npz
+    python scripts/run_sweep.py ... --mode HEURISTIC --output sweep.parquet
+"""
+import sys
+import os
+import argparse
+import asyncio
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.config import settings
+from app.services.prediction_service import PredictionService
+from app.utils.sweep_encoding import encode_npz, encode_parquet
+
+
+def _axis(values):
+    low, high, steps = values
+    steps = int(steps)
+    if steps < 1 or high < low:
+        raise argparse.ArgumentTypeError(f"Rentang tidak valid: {values}")
+    return np.linspace(low, high, steps)
+
+
+async def run(args):
+    service = PredictionService()
+    try:
+        axes = [_axis(v) for v in (args.magnitude, args.depth, args.latitude, args.longitude)]
+        return await service.predict_sweep(*axes, mode=args.mode)
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep simulasi tsunami")
+    for name in ("magnitude", "depth", "latitude", "longitude"):
+        parser.add_argument(f"--{name}", nargs=3, type=float, required=True, metavar=("MIN", "MAX", "STEPS"))
+    parser.add_argument("--mode", choices=["AI", "HEURISTIC"], default="AI")
+    parser.add_argument("--output", default="sweep.npz", help="File output .npz atau .parquet")
+    parser.add_argument("--max-points", type=int, default=None,
+                        help=f"Override SWEEP_MAX_POINTS (default {settings.SWEEP_MAX_POINTS})")
+    args = parser.parse_args()
+
+    if args.max_points:
+        settings.SWEEP_MAX_POINTS = args.max_points
+
+    try:
+        columns, meta = asyncio.run(run(args))
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    encode = encode_parquet if args.output.endswith(".parquet") else encode_npz
+    try:
+        content = encode(columns, meta)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "wb") as f:
+        f.write(content)
+
+    counts = np.bincount(columns["category"], minlength=len(meta["categories"]))
+    print(f"✅ {meta['points']} titik ({meta['modelUsed']}, {meta['inferences']} inference) "
+          f"dalam {meta['processingTimeMs']} ms -> {args.output}")
+    print("   Kategori: " + ", ".join(f"{name}={n}" for name, n in zip(meta["categories"], counts)))
+    print(f"   Max wave: {columns['max_wave_height'].max():.2f} m, "
+          f"{len(columns['city_name'])} titik pesisir dalam radius")
+
+
+if __name__ == "__main__":
+    main()
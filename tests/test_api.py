@@ -55,3 +55,123 @@ async def test_simulation_endpoint_valid(client: AsyncClient, sample_earthquake_
     if response.status_code == 200:
         data = response.json()
         assert "simulation_id" in data
+
+
+@pytest.mark.asyncio
+async def test_ping_latency_flat_during_simulations():
+    """Test that /api/ping stays responsive while AI simulations are running"""
+    import asyncio
+    import time
+    from app.main import app
+    from app.services.prediction_service import PredictionService
+    
+    class SlowEngine:
+        model_loaded = True
+        model_version = "test"
+        model_sha256 = None
+        
+        def run_versioned(self, input_tensor):
+            time.sleep(0.3)  # Simulasi session.run yang berat (blocking)
+            return input_tensor[..., :1].copy(), self.model_version
+    
+    service = PredictionService(engine=SlowEngine())
+    
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        async def ping_latency():
+            start = time.perf_counter()
+            response = await ac.get("/api/ping")
+            assert response.status_code == 200
+            return time.perf_counter() - start
+        
+        idle = max([await ping_latency() for _ in range(5)])
+        
+        simulations = asyncio.gather(*[
+            service.predict(magnitude=7.5, depth=20.0, latitude=-6.1, longitude=105.4)
+            for _ in range(4)
+        ])
+        await asyncio.sleep(0.05)  # Pastikan inference sudah berjalan
+        busy = []
+        for _ in range(5):
+            busy.append(await ping_latency())
+            await asyncio.sleep(0.02)
+        results = await simulations
+    
+    service.close()
+    assert len(results) == 4
+    assert max(busy) < idle + 0.1
+
+
+@pytest.mark.asyncio
+async def test_simulation_batch_ndjson(monkeypatch):
+    """Test /simulation/batch: satu baris NDJSON per skenario, error per baris, ringkasan di akhir"""
+    import json
+    from app.config import settings
+    from app.main import app
+    from app.services.prediction_service import PredictionService
+    
+    class FakeEngine:
+        model_loaded = True
+        model_version = "test"
+        model_sha256 = None
+        
+        def run_versioned(self, input_tensor):
+            return input_tensor[..., :1].copy(), self.model_version
+    
+    service = PredictionService(engine=FakeEngine())
+    monkeypatch.setattr(app.state, "prediction_service", service, raising=False)
+    monkeypatch.setattr(settings, "SIMULATION_BATCH_CHUNK", 4)
+    monkeypatch.setattr(settings, "MIN_MAGNITUDE", 5.0)
+    
+    scenarios = [
+        {"magnitude": 7.0 + i * 0.1, "depth": 20.0, "latitude": -6.1, "longitude": 105.4, "mode": "HEURISTIC"}
+        for i in range(10)
+    ]
+    scenarios[5]["magnitude"] = 4.5  # Ditolak validate_earthquake_params
+    
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post(
+            "/api/v1/simulation/simulation/batch", json={"scenarios": scenarios, "persist": False}
+        )
+        forbidden = await ac.post(
+            "/api/v1/simulation/simulation/batch", json={"scenarios": [{**scenarios[0], "mode": "AI"}]}
+        )
+    service.close()
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1] == {"status": "done", "total": 10, "failed": 1, "saved": 0}
+    by_index = {line["index"]: line for line in lines[:-1]}
+    assert sorted(by_index) == list(range(10))
+    assert by_index[5]["status"] == "error"
+    assert by_index[0]["data"]["prediction"]["maxWaveHeight"] == round(service._estimate_wave_height(7.0, 20.0), 2)
+    assert forbidden.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_ensemble_rejects_members_above_limit(monkeypatch, sample_earthquake_data):
+    """Test /simulation/ensemble: members > ENSEMBLE_MAX_MEMBERS ditolak 400, bukan di-clamp"""
+    from app.config import settings
+    from app.main import app
+    from app.services.prediction_service import PredictionService
+    
+    class FakeEngine:
+        model_loaded = True
+        model_version = "test"
+        model_sha256 = None
+        
+        def run_versioned(self, input_tensor):
+            return input_tensor[..., :1].copy(), self.model_version
+    
+    service = PredictionService(engine=FakeEngine())
+    monkeypatch.setattr(app.state, "prediction_service", service, raising=False)
+    
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.post(
+            "/api/v1/simulation/simulation/ensemble",
+            json={**sample_earthquake_data, "mode": "HEURISTIC", "members": settings.ENSEMBLE_MAX_MEMBERS + 1}
+        )
+    service.close()
+    
+    assert response.status_code == 400
+    assert str(settings.ENSEMBLE_MAX_MEMBERS) in response.json()["detail"]
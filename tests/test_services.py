@@ -44,3 +44,976 @@ def test_config_loading():
     assert settings.VERSION is not None
     assert settings.MIN_MAGNITUDE > 0
     assert settings.MAX_MAGNITUDE > settings.MIN_MAGNITUDE
+
+
+def test_prediction_service_is_shared_per_app():
+    """Test that routes reuse one PredictionService (one ONNX session) per app"""
+    from types import SimpleNamespace
+    from app.core.dependencies import get_prediction_service
+    
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+    
+    first = get_prediction_service(request)
+    second = get_prediction_service(request)
+    
+    assert first is second
+    assert first.engine is second.engine
+
+
+class _CountingEngine:
+    """Fake ONNX engine: output = channel displacement, menghitung jumlah session.run"""
+    model_loaded = True
+    model_version = "test"
+    model_sha256 = None
+    
+    def __init__(self):
+        self.calls = []
+    
+    def run_versioned(self, input_tensor):
+        self.calls.append(input_tensor.shape[0])
+        return input_tensor[..., :1].copy(), self.model_version
+
+
+@pytest.mark.asyncio
+async def test_predict_batch_runs_batched_inference():
+    """Test that predict_batch stacks N scenarios into a few session.run calls"""
+    from app.config import settings
+    from app.services.prediction_service import PredictionService
+    
+    engine = _CountingEngine()
+    service = PredictionService(engine=engine)
+    scenarios = [
+        {"magnitude": 7.0 + (i % 10) * 0.1, "depth": 20.0, "latitude": -6.1, "longitude": 105.4}
+        for i in range(100)
+    ]
+    
+    results = await service.predict_batch(scenarios)
+    
+    assert len(results) == 100
+    assert sum(engine.calls) == 100
+    assert len(engine.calls) == -(-100 // settings.INFERENCE_MAX_BATCH)
+    
+    single = await service.predict(**scenarios[0])
+    assert results[0]["prediction"]["maxWaveHeight"] == single["prediction"]["maxWaveHeight"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_predicts_are_micro_batched():
+    """Test that concurrent predict() calls share one batched session.run"""
+    import asyncio
+    from app.services.prediction_service import PredictionService
+    
+    engine = _CountingEngine()
+    service = PredictionService(engine=engine)
+    service.batcher.max_batch_size = 4
+    service.batcher.window = 1.0  # Flush hanya karena batch penuh, agar deterministik
+    
+    results = await asyncio.gather(*[
+        service.predict(magnitude=7.0 + i * 0.2, depth=20.0, latitude=-6.1, longitude=105.4)
+        for i in range(8)
+    ])
+    
+    assert engine.calls == [4, 4]
+    heights = [r["prediction"]["maxWaveHeight"] for r in results]
+    assert heights == sorted(heights)
+
+
+@pytest.mark.asyncio
+async def test_process_backend_matches_thread_backend():
+    """Test that INFERENCE_BACKEND=process returns the same prediction as the thread backend"""
+    from app.models.model_loader import InferenceEngine
+    from app.services.prediction_service import PredictionService
+    
+    scenarios = [
+        {"magnitude": 7.5, "depth": 20.0, "latitude": -6.1, "longitude": 105.4},
+        {"magnitude": 8.2, "depth": 10.0, "latitude": -6.5, "longitude": 105.2},
+    ]
+    thread_service = PredictionService(engine=InferenceEngine(), backend="thread")
+    process_service = PredictionService(engine=InferenceEngine(), backend="process")
+    try:
+        expected = await thread_service.predict_batch(scenarios, mode="HEURISTIC")
+        actual = await process_service.predict_batch(scenarios, mode="HEURISTIC")
+    finally:
+        thread_service.close()
+        process_service.close()
+    
+    for exp, act in zip(expected, actual):
+        assert act["prediction"]["maxWaveHeight"] == exp["prediction"]["maxWaveHeight"]
+        assert act["impactZones"] == exp["impactZones"]
+
+
+def _write_tiny_onnx_model(path):
+    """Model ONNX kecil: wave grid = 2 * channel displacement, shape (N, 128, 128, 1)"""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper
+    
+    graph = helper.make_graph(
+        [
+            helper.make_node("Slice", ["input", "starts", "ends", "axes"], ["channel"]),
+            helper.make_node("Mul", ["channel", "scale"], ["output"]),
+        ],
+        "tiny_tsunami",
+        [helper.make_tensor_value_info("input", TensorProto.FLOAT, ["N", 128, 128, 2])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, ["N", 128, 128, 1])],
+        initializer=[
+            helper.make_tensor("starts", TensorProto.INT64, [1], [0]),
+            helper.make_tensor("ends", TensorProto.INT64, [1], [1]),
+            helper.make_tensor("axes", TensorProto.INT64, [1], [3]),
+            helper.make_tensor("scale", TensorProto.FLOAT, [], [2.0]),
+        ]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(path))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_process_backend_ai_matches_thread_backend(tmp_path, monkeypatch):
+    """Test mode AI: hasil worker process (shared memory) sama dengan thread backend"""
+    import numpy as np
+    from app.config import settings
+    from app.models.model_loader import InferenceEngine
+    from app.services.prediction_service import PredictionService
+    
+    model_path = str(_write_tiny_onnx_model(tmp_path / "tiny.onnx"))
+    # Worker di-spawn dan membaca settings dari environment
+    monkeypatch.setenv("ORT_OPTIMIZED_MODEL_CACHE", "False")
+    monkeypatch.setenv("SCENARIO_ATLAS_ENABLED", "False")
+    monkeypatch.setattr(settings, "ORT_OPTIMIZED_MODEL_CACHE", False)
+    monkeypatch.setattr(settings, "SCENARIO_ATLAS_ENABLED", False)
+    
+    engines = [InferenceEngine(), InferenceEngine()]
+    assert all(engine.load_model(model_path) for engine in engines)
+    scenarios = [
+        {"magnitude": 7.5, "depth": 20.0, "latitude": -6.1, "longitude": 105.4},
+        {"magnitude": 8.2, "depth": 10.0, "latitude": -6.5, "longitude": 105.2},
+    ]
+    thread_service = PredictionService(engine=engines[0], backend="thread")
+    process_service = PredictionService(engine=engines[1], backend="process")
+    try:
+        expected = await thread_service.predict_batch(scenarios, mode="AI")
+        actual = await process_service.predict_batch(scenarios, mode="AI")
+        _, grids = await process_service.process_backend.predict_batch(scenarios, mode="AI", return_grids=True)
+        _, no_grids = await process_service.process_backend.predict_batch(scenarios, mode="AI")
+        direct = thread_service._run_scenarios([(sc["magnitude"], sc["latitude"], sc["longitude"]) for sc in scenarios])
+    finally:
+        thread_service.close()
+        process_service.close()
+    
+    for exp, act in zip(expected, actual):
+        assert act["prediction"]["modelUsed"] == "ONNX: Tsunami-ViT"
+        assert act["prediction"]["maxWaveHeight"] == exp["prediction"]["maxWaveHeight"] > 0
+        assert act["inundationZones"] == exp["inundationZones"]
+        assert act["impactZones"] == exp["impactZones"]
+    np.testing.assert_array_equal(np.stack(grids), direct)
+    assert no_grids == [None, None]
+
+
+def test_prediction_cache_quantization_lru_and_ttl():
+    """Test quantized keys, LRU eviction and TTL expiry of the prediction cache"""
+    from app.services.prediction_cache import PredictionCache
+    
+    cache = PredictionCache(max_entries=2, ttl_seconds=60, magnitude_step=0.05, depth_step=1.0, coord_step=0.01)
+    key = cache.make_key(7.51, 20.2, -6.102, 105.423, "AI", "1.0.0")
+    near = cache.make_key(7.49, 19.9, -6.104, 105.421, "AI", "1.0.0")
+    other_model = cache.make_key(7.51, 20.2, -6.102, 105.423, "AI", "2.0.0")
+    
+    assert key == near
+    assert key != other_model
+    
+    cache.set(key, {"value": 1})
+    assert cache.get(near) == {"value": 1}
+    assert cache.get(other_model) is None
+    
+    cache.set(("b",), {"value": 2})
+    cache.set(("c",), {"value": 3})
+    assert cache.get(("b",)) is not None
+    assert cache.get(key) is None  # LRU evicted
+    
+    cache.ttl = -1
+    assert cache.get(("b",)) is None  # Expired
+    assert cache.stats()["hits"] == 2
+    
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_predict_uses_cache_for_near_repeat():
+    """Test that a near-repeat scenario is served from cache without inference"""
+    from app.services.prediction_service import PredictionService
+    
+    engine = _CountingEngine()
+    service = PredictionService(engine=engine)
+    if service.cache is None:
+        pytest.skip("CACHE_ENABLED=False")
+    
+    first = await service.predict(magnitude=7.5, depth=20.0, latitude=-6.102, longitude=105.423)
+    second = await service.predict(magnitude=7.51, depth=20.0, latitude=-6.101, longitude=105.424)
+    batch = await service.predict_batch([{"magnitude": 7.5, "depth": 20.0, "latitude": -6.102, "longitude": 105.423}])
+    
+    assert sum(engine.calls) == 1
+    assert second["prediction"]["maxWaveHeight"] == first["prediction"]["maxWaveHeight"]
+    assert second["epicenter"] == {"latitude": -6.101, "longitude": 105.424}
+    assert batch[0]["prediction"]["maxWaveHeight"] == first["prediction"]["maxWaveHeight"]
+
+
+
+@pytest.mark.asyncio
+async def test_predict_does_not_cache_failed_inference():
+    """Test that a heuristic fallback after a failed AI inference is not served from cache"""
+    from app.services.prediction_service import PredictionService
+    
+    class FlakyEngine(_CountingEngine):
+        def run_versioned(self, input_tensor):
+            if not self.calls:
+                self.calls.append(0)
+                raise RuntimeError("transient ONNX failure")
+            return super().run_versioned(input_tensor)
+    
+    engine = FlakyEngine()
+    service = PredictionService(engine=engine)
+    if service.cache is None:
+        pytest.skip("CACHE_ENABLED=False")
+    
+    failed = await service.predict(magnitude=7.5, depth=20.0, latitude=-6.102, longitude=105.423)
+    retried = await service.predict(magnitude=7.5, depth=20.0, latitude=-6.102, longitude=105.423)
+    
+    assert failed["prediction"]["modelVersion"] is None
+    assert retried["prediction"]["modelVersion"] == "test"
+    assert engine.calls == [0, 1]
+
+def test_input_builder_matches_meshgrid_gaussian():
+    """Test that the separable InputBuilder matches the full meshgrid Gaussian"""
+    import numpy as np
+    from app.models.input_builder import InputBuilder
+    
+    builder = InputBuilder()
+    magnitude, latitude, longitude = 7.5, -6.102, 105.423
+    grid_x, grid_y = builder.grid_cell(latitude, longitude)
+    
+    xv, yv = np.meshgrid(np.linspace(0, 127, 128), np.linspace(0, 127, 128))
+    sigma = (magnitude - 5.0) * 2.0
+    expected = np.exp(-((xv - grid_x) ** 2 + (yv - grid_y) ** 2) / (2 * sigma ** 2)) * (magnitude - 5.0)
+    
+    batch = builder.build_batch([(magnitude, latitude, longitude), (6.0, -5.5, 106.0)])
+    
+    assert batch.shape == (2, 128, 128, 2)
+    np.testing.assert_allclose(batch[0, :, :, 0], expected, rtol=1e-5, atol=1e-6)
+    assert np.all(batch[:, :, :, 1] == 0.5)
+    np.testing.assert_array_equal(builder.build(magnitude, latitude, longitude), batch[0])
+
+
+@pytest.mark.asyncio
+async def test_scenario_atlas_fast_path(tmp_path):
+    """Test that the scenario atlas reproduces sampled max waves and skips inference only for contours=False"""
+    from app.models.scenario_atlas import ScenarioAtlas, build_atlas
+    from app.services.prediction_service import PredictionService
+    
+    engine = _CountingEngine()
+    engine.model_sha256 = "abc"
+    service = PredictionService(engine=engine)
+    service.cache = None
+    build_atlas(
+        service._run_scenarios, tmp_path,
+        magnitudes=[7.0, 8.0], cell_stride=32,
+        model_sha256="abc", model_version="test", batch_size=8
+    )
+    assert ScenarioAtlas.load(tmp_path, model_sha256="other") is None
+    
+    service.atlas = ScenarioAtlas.load(tmp_path, model_sha256="abc")
+    
+    # Titik sampel atlas: M7.0 di pusat sel (64, 64)
+    latitude = service.input_builder.min_lat + 64.5 / 128 * service.input_builder.lat_range
+    longitude = service.input_builder.min_lon + 64.5 / 128 * service.input_builder.lon_range
+    max_wave = service.atlas.lookup(7.0, latitude, longitude)
+    expected = service._run_scenarios([(7.0, latitude, longitude)])[0]
+    assert max_wave == pytest.approx(float(expected.max()), rel=1e-5)
+    
+    # Di antara dua magnitudo: interpolasi linear
+    mid_wave = service.atlas.lookup(7.5, latitude, longitude)
+    high_wave = service.atlas.lookup(8.0, latitude, longitude)
+    assert mid_wave == pytest.approx((max_wave + high_wave) / 2, rel=1e-5)
+    
+    # Atlas hit dengan contours=False: dijawab tanpa inference
+    engine.calls.clear()
+    result = await service.predict(magnitude=7.5, depth=20.0, latitude=latitude, longitude=longitude, contours=False)
+    assert engine.calls == []
+    assert result["prediction"]["maxWaveHeight"] == round(mid_wave, 2)
+    assert result["prediction"]["modelUsed"] == "Scenario Atlas: Tsunami-ViT"
+    assert result["prediction"]["modelVersion"] == "test"
+    assert result["inundationZones"] == service._generate_inundation_zones(latitude, longitude, mid_wave, None)
+    
+    events = [event async for event in service.predict_stream(7.5, 20.0, latitude, longitude, contours=False)]
+    assert engine.calls == []
+    assert dict(events)["prediction"]["prediction"]["maxWaveHeight"] == round(mid_wave, 2)
+    
+    # Default (contours=True): atlas tidak dipakai, max wave dan kontur dari grid model yang sama
+    model_result = await service.predict(magnitude=7.5, depth=20.0, latitude=latitude, longitude=longitude)
+    assert engine.calls == [1]
+    assert model_result["prediction"]["modelUsed"] == "ONNX: Tsunami-ViT"
+    grid = service._run_scenarios([(7.5, latitude, longitude)])[0]
+    assert model_result["prediction"]["maxWaveHeight"] == round(float(grid.max()), 2)
+
+
+def test_grid_contour_to_ring_affine_and_simplify():
+    """Test vectorized contour-to-GeoJSON conversion and Douglas-Peucker simplification"""
+    import numpy as np
+    from skimage import measure
+    from app.config import settings
+    from app.utils.geojson_utils import grid_contour_to_ring
+    
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    yv, xv = np.mgrid[0:128, 0:128]
+    grid = np.exp(-((xv - 64) ** 2 + (yv - 60) ** 2) / (2 * 15 ** 2))
+    contour = max(measure.find_contours(grid, level=0.5), key=len)
+    
+    ring = grid_contour_to_ring(contour, bounds, grid.shape)
+    row, col = contour[10]
+    assert ring[10] == [
+        round(bounds["min_lon"] + col / 127 * (bounds["max_lon"] - bounds["min_lon"]), 6),
+        round(bounds["min_lat"] + row / 127 * (bounds["max_lat"] - bounds["min_lat"]), 6),
+    ]
+    assert ring[0] == ring[-1]
+    
+    simplified = grid_contour_to_ring(contour, bounds, grid.shape, tolerance=0.005)
+    assert simplified[0] == simplified[-1]
+    assert 4 <= len(simplified) < len(ring) / 2
+
+
+@pytest.mark.asyncio
+async def test_wave_grid_binary_encodings():
+    """Test raw wave grid via float16 payload and 16-bit PNG"""
+    import struct
+    import zlib
+    import numpy as np
+    from app.config import settings
+    from app.services.prediction_service import PredictionService
+    from app.utils.grid_encoding import decode_float16, encode_float16, encode_png16
+    
+    service = PredictionService(engine=_CountingEngine())
+    grid = await service.predict_wave_grid(magnitude=7.5, latitude=-6.1, longitude=105.4)
+    assert grid.shape == (128, 128)
+    
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    payload = encode_float16(grid, bounds)
+    assert len(payload) == 32 + 128 * 128 * 2
+    decoded, decoded_bounds = decode_float16(payload)
+    assert decoded_bounds == bounds
+    np.testing.assert_allclose(decoded, grid, rtol=1e-3, atol=1e-4)
+    
+    png, scale = encode_png16(grid, bounds)
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    width, height, bit_depth = struct.unpack(">IIB", png[16:25])
+    assert (width, height, bit_depth) == (128, 128, 16)
+    idat_start = png.index(b"IDAT")
+    idat_len = struct.unpack(">I", png[idat_start - 4:idat_start])[0]
+    raw = np.frombuffer(zlib.decompress(png[idat_start + 4:idat_start + 4 + idat_len]), dtype=np.uint8)
+    pixels = raw.reshape(128, 1 + 256)[:, 1:].copy().view(">u2")
+    # Baris pertama PNG = utara (max_lat), kebalikan urutan grid
+    np.testing.assert_allclose(pixels[::-1] * scale, grid, atol=scale)
+
+
+def _read_pb(data):
+    """Parser protobuf minimal: list (field, wire_type, value) untuk test MVT"""
+    fields, i = [], 0
+    
+    def varint():
+        nonlocal i
+        shift = value = 0
+        while True:
+            b = data[i]
+            i += 1
+            value |= (b & 0x7F) << shift
+            shift += 7
+            if b < 0x80:
+                return value
+    
+    while i < len(data):
+        key = varint()
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            fields.append((field, wire, varint()))
+        elif wire == 1:
+            fields.append((field, wire, data[i:i + 8]))
+            i += 8
+        else:
+            length = varint()
+            fields.append((field, wire, data[i:i + length]))
+            i += length
+    return fields
+
+
+def test_simulation_vector_tile_and_disk_cache(tmp_path):
+    """Test MVT encoding of inundation zones (clip, winding, tags) and the on-disk tile cache"""
+    from app.services.tile_service import TileService
+    from app.utils.mvt import tile_bounds
+    
+    service = TileService(cache_dir=tmp_path)
+    ring = [[105.2, -6.3], [105.6, -6.3], [105.6, -5.9], [105.2, -5.9], [105.2, -6.3]]
+    simulation = {
+        "magnitude": 7.5, "depth": 20.0, "latitude": -6.1, "longitude": 105.4, "mode": "AI",
+        "prediction_data": {"inundationZones": [{"coordinates": [ring], "height": 3.2}]}
+    }
+    
+    # Tile z=8 yang memuat epicenter
+    z, x, y = 8, int((105.4 + 180) / 360 * 256), 0
+    while tile_bounds(z, x, y)[1] > -6.1:
+        y += 1
+    tile = service.simulation_tile(simulation, z, x, y)
+    
+    layers = {}
+    for field, _, layer in _read_pb(tile):
+        assert field == 3
+        parsed = _read_pb(layer)
+        name = next(v for f, _, v in parsed if f == 1).decode()
+        layers[name] = parsed
+    assert set(layers) == {"inundation", "epicenter"}
+    
+    inundation = layers["inundation"]
+    assert (15, 0, 2) in inundation and (5, 0, 4096) in inundation
+    assert [v for f, _, v in inundation if f == 3] == [b"height", b"level"]
+    feature = _read_pb(next(v for f, _, v in inundation if f == 2))
+    assert (3, 0, 3) in feature  # POLYGON
+    
+    # Decode command geometri -> ring di koordinat tile
+    packed = next(v for f, _, v in feature if f == 4)
+    commands, i = [], 0
+    while i < len(packed):
+        value = shift = 0
+        while True:
+            b = packed[i]
+            i += 1
+            value |= (b & 0x7F) << shift
+            shift += 7
+            if b < 0x80:
+                break
+        commands.append(value)
+    assert commands[0] == (1 | (1 << 3)) and commands[-1] == (7 | (1 << 3))
+    count = commands[3] >> 3
+    deltas = [(v >> 1) ^ -(v & 1) for v in commands[1:3] + commands[4:4 + 2 * count]]
+    xs, ys, cx, cy = [], [], 0, 0
+    for dx, dy in zip(deltas[0::2], deltas[1::2]):
+        cx, cy = cx + dx, cy + dy
+        xs.append(cx)
+        ys.append(cy)
+    # Di-clip ke tile + buffer, exterior ring ber-area positif di ruang tile (y ke bawah)
+    assert all(-64 <= v <= 4096 + 64 for v in xs + ys)
+    area = sum(xs[k] * ys[(k + 1) % len(xs)] - xs[(k + 1) % len(xs)] * ys[k] for k in range(len(xs)))
+    assert area > 0
+    
+    # Tile jauh dari simulasi kosong; cache disk mengembalikan bytes yang sama
+    assert service.simulation_tile(simulation, 8, 0, 0) == b""
+    service.store("simulations", "abc", z, x, y, tile)
+    assert service.get_cached("simulations", "abc", z, x, y) == tile
+    assert service.get_cached("simulations", "abc", z, x, y + 1) is None
+
+
+def test_session_options_follow_settings(monkeypatch, tmp_path):
+    """Test ONNX Runtime SessionOptions and optimized-graph cache path come from settings"""
+    from pathlib import Path
+    import onnxruntime as ort
+    from app.config import settings
+    from app.models.model_loader import InferenceEngine
+    
+    monkeypatch.setattr(settings, "ORT_GRAPH_OPTIMIZATION_LEVEL", "extended")
+    monkeypatch.setattr(settings, "ORT_INTRA_OP_THREADS", 2)
+    monkeypatch.setattr(settings, "ORT_INTER_OP_THREADS", 1)
+    monkeypatch.setattr(settings, "ORT_EXECUTION_MODE", "parallel")
+    monkeypatch.setattr(settings, "ORT_ENABLE_MEM_PATTERN", False)
+    monkeypatch.setattr(settings, "ORT_OPTIMIZED_MODEL_DIR", str(tmp_path))
+    
+    options = InferenceEngine._session_options()
+    assert options.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    assert options.execution_mode == ort.ExecutionMode.ORT_PARALLEL
+    assert (options.intra_op_num_threads, options.inter_op_num_threads) == (2, 1)
+    assert options.enable_mem_pattern is False
+    assert InferenceEngine._session_options("disable").graph_optimization_level == \
+        ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+    
+    path = InferenceEngine._optimized_model_path(Path("model.onnx"), "ab" * 32, ["CPUExecutionProvider"])
+    assert path.parent == tmp_path
+    assert path.name == f"model.{'ab' * 8}.extended.cpu.ort{ort.__version__}.onnx"
+
+
+def test_model_variant_path_is_idempotent():
+    """Test quantized variant naming next to the FP32 model"""
+    from pathlib import Path
+    from app.models.model_loader import model_variant_path
+    
+    source = Path("trained_models/model.onnx")
+    assert model_variant_path(source, "fp32") == source
+    variant = model_variant_path(source, "int8_static")
+    assert variant == Path("trained_models/model.int8_static.onnx")
+    # Path varian yang diteruskan ke worker process tidak di-resolve dua kali
+    assert model_variant_path(variant, "int8_static") == variant
+
+
+@pytest.mark.asyncio
+async def test_reload_model_swaps_and_invalidates_cache():
+    """Test hot reload: cache invalidated, version reported, failure keeps the old model"""
+    from app.services.prediction_service import PredictionService
+    
+    class ReloadableEngine(_CountingEngine):
+        model_version = "1.0.0"
+        model_path = None
+        
+        def __init__(self):
+            super().__init__()
+            self.next_load_ok = True
+        
+        def load_model(self, model_path=None):
+            if not self.next_load_ok:
+                return False
+            self.model_version, self.model_sha256 = "2.0.0", "new"
+            return True
+    
+    engine = ReloadableEngine()
+    service = PredictionService(engine=engine)
+    await service.predict(magnitude=7.5, depth=20.0, latitude=-6.1, longitude=105.4)
+    assert service.cache.stats()["entries"] == 1
+    
+    result = await service.reload_model()
+    assert result["reloaded"] and result["model_changed"]
+    assert (result["previous_version"], result["model_version"]) == ("1.0.0", "2.0.0")
+    assert service.cache.stats()["entries"] == 0
+    
+    engine.next_load_ok = False
+    result = await service.reload_model()
+    assert not result["reloaded"] and result["model_version"] == "2.0.0"
+
+
+@pytest.mark.asyncio
+async def test_model_version_comes_from_snapshot_that_ran():
+    """Test swap di tengah request: modelVersion = versi yang menjalankan inference, cache tidak tercampur"""
+    from app.services.prediction_service import PredictionService
+    
+    class SwappingEngine(_CountingEngine):
+        model_version = "2.0.0"  # Versi aktif sesudah swap
+        
+        def run_versioned(self, input_tensor):
+            outputs, _ = super().run_versioned(input_tensor)
+            # Batch pertama masih dijalankan snapshot lama
+            return outputs, "1.0.0" if len(self.calls) == 1 else self.model_version
+    
+    engine = SwappingEngine()
+    service = PredictionService(engine=engine)
+    params = {"magnitude": 7.5, "depth": 20.0, "latitude": -6.1, "longitude": 105.4}
+    
+    first = await service.predict(**params)
+    assert first["prediction"]["modelVersion"] == "1.0.0"
+    
+    # Hasil model lama tidak disajikan dari cache untuk versi baru
+    second = await service.predict(**params)
+    assert second["prediction"]["modelVersion"] == "2.0.0"
+    assert len(engine.calls) == 2
+    
+    third = await service.predict(**params)
+    assert third["prediction"]["modelVersion"] == "2.0.0"
+    assert len(engine.calls) == 2
+    
+    heuristic = await service.predict(**{**params, "mode": "HEURISTIC"})
+    assert heuristic["prediction"]["modelVersion"] is None
+
+
+def test_impact_zones_vectorized_gazetteer(tmp_path, monkeypatch):
+    """Test vectorized impact zones: CSV gazetteer, KD-tree prefilter matches brute force"""
+    import math
+    import numpy as np
+    from app.config import settings
+    from app.services.coastal_gazetteer import CoastalGazetteer, haversine_km
+    from app.services.prediction_service import PredictionService
+    
+    service = PredictionService(engine=_CountingEngine())
+    zones = service._get_impact_zones(-6.102, 105.423, 7.5, 4.0)
+    
+    # Sama dengan perhitungan loop per kota sebelumnya
+    expected = []
+    for name, lat, lon in [("Pantai Anyer", -6.034, 105.826), ("Labuan", -6.394, 105.793),
+                           ("Carita", -6.301, 105.656), ("Sumur", -6.650, 105.583),
+                           ("Cilegon", -6.003, 106.001)]:
+        d = float(haversine_km(-6.102, 105.423, np.array([lat]), np.array([lon]))[0])
+        wave = 4.0 * math.exp(-d / 50.0)
+        if d < 100 and wave > 0.3:
+            expected.append({"name": name, "distance": round(d, 1), "eta": int(d / 10) + 5, "waveHeight": round(wave, 2)})
+    assert zones == sorted(expected, key=lambda z: z["eta"])
+    
+    # Gazetteer besar: KD-tree vs brute force
+    rng = np.random.default_rng(0)
+    path = tmp_path / "points.csv"
+    lats = rng.uniform(-7.0, -5.0, 12000)
+    lons = rng.uniform(104.5, 106.5, 12000)
+    with open(path, "w") as f:
+        f.write("name,type,latitude,longitude\n")
+        f.writelines(f"P{i},village,{lat},{lon}\n" for i, (lat, lon) in enumerate(zip(lats, lons)))
+    
+    gazetteer = CoastalGazetteer.load(path)
+    assert gazetteer.tree is not None and len(gazetteer) == 12000
+    idx, distances = gazetteer.within(-6.1, 105.4, 60.0)
+    brute = haversine_km(-6.1, 105.4, lats, lons)
+    np.testing.assert_array_equal(idx, np.flatnonzero(brute < 60.0))
+    np.testing.assert_allclose(distances, brute[idx])
+    
+    service.gazetteer = gazetteer
+    monkeypatch.setattr(settings, "IMPACT_ZONES_MAX", 25)
+    zones = service._get_impact_zones(-6.1, 105.4, 7.5, 4.0)
+    assert len(zones) == 25
+    assert [z["eta"] for z in zones] == sorted(z["eta"] for z in zones)
+
+
+def test_travel_time_engine_eta_and_isochrones():
+    """Test waktu tiba sqrt(g*h): ETA pesisir, impact zones, isochrone dan cache per sel"""
+    import math
+    import numpy as np
+    from app.config import settings
+    from app.services.prediction_service import PredictionService
+    from app.services.travel_time import TravelTimeEngine
+    
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    # Laut 100 m, darat di 10% kolom paling barat (lon < 104.7)
+    depth = np.full((128, 128), 100.0, dtype=np.float32)
+    depth[:, :13] = 0.0
+    engine = TravelTimeEngine(depth, bounds, cache_size=2)
+    
+    field = engine.arrival_minutes(-6.0, 105.5)
+    assert engine.arrival_minutes(-6.0, 105.5) is field  # cache hit
+    assert engine.arrival_minutes(-4.0, 105.5) is None  # di luar grid
+    
+    # Sepanjang sumbu grid: t = d / sqrt(g*h)
+    d = 0.5 * 111195 * math.cos(math.radians(-6.0))
+    expected = d / math.sqrt(9.81 * 100.0) / 60.0
+    arrival = engine.sample(field, np.array([-6.0, -6.0, -4.0]), np.array([106.0, 104.55, 105.0]))
+    assert arrival[0] == pytest.approx(expected, rel=0.02)
+    assert math.isfinite(arrival[1])  # titik di darat -> sel laut terdekat
+    assert math.isnan(arrival[2])
+    assert engine.coastal_eta(field) == pytest.approx(arrival[1], rel=0.05)
+    
+    isochrones = engine.isochrones(field, minutes=[10, 20])
+    assert [iso["minutes"] for iso in isochrones] == [10, 20]
+    ring = isochrones[0]["coordinates"][0]
+    assert ring[0] == ring[-1]
+    
+    # LRU dibatasi cache_size
+    engine.arrival_minutes(-6.5, 105.5)
+    engine.arrival_minutes(-6.8, 105.5)
+    assert len(engine._cache) == 2
+    
+    service = PredictionService(engine=_CountingEngine())
+    service.travel_time = engine
+    result = service._finalize_prediction(7.5, 10.0, -6.0, 105.5, None, 0.0)
+    assert result["prediction"]["eta"] == math.ceil(engine.coastal_eta(field))
+    assert {iso["minutes"] for iso in result["isochrones"]} <= set(settings.ISOCHRONE_MINUTES)
+    etas = [zone["eta"] for zone in result["impactZones"]]
+    assert etas and etas == sorted(etas)
+    for zone in result["impactZones"]:
+        i = list(service.gazetteer.names).index(zone["name"])
+        lat, lon = service.gazetteer.lats[i], service.gazetteer.lons[i]
+        assert zone["eta"] == max(1, math.ceil(engine.sample(field, np.array([lat]), np.array([lon]))[0]))
+
+
+def test_depth_channel_memmap_and_atlas_validation(tmp_path, monkeypatch):
+    """Test depth channel .npy di-memory-map ke input dan atlas lama ditolak"""
+    import numpy as np
+    from app.config import settings
+    from app.models.input_builder import InputBuilder
+    from app.models.scenario_atlas import ScenarioAtlas, build_atlas
+    
+    # Atlas dengan depth konstan (tanpa file)
+    monkeypatch.setattr(settings, "BATHYMETRY_CHANNEL_FILE", tmp_path / "missing.npy")
+    constant = InputBuilder()
+    assert constant.depth_channel_sha256 is None
+    build_atlas(
+        lambda scenarios: np.zeros((len(scenarios), 128, 128), dtype=np.float32), tmp_path / "atlas",
+        magnitudes=[7.0], cell_stride=64, model_sha256="abc", model_version="test"
+    )
+    assert ScenarioAtlas.load(tmp_path / "atlas", model_sha256="abc") is not None
+    
+    channel = np.linspace(0.0, 1.0, 128 * 128, dtype=np.float32).reshape(128, 128)
+    np.save(tmp_path / "depth.npy", channel)
+    monkeypatch.setattr(settings, "BATHYMETRY_CHANNEL_FILE", tmp_path / "depth.npy")
+    
+    builder = InputBuilder()
+    assert isinstance(builder.depth_channel, np.memmap)
+    assert builder.depth_channel_sha256 is not None
+    batch = builder.build_batch([(7.5, -6.1, 105.4), (8.0, -5.5, 106.0)])
+    np.testing.assert_array_equal(batch[:, :, :, 1], np.broadcast_to(channel, (2, 128, 128)))
+    np.testing.assert_array_equal(builder.build(7.5, -6.1, 105.4)[:, :, 1], channel)
+    
+    # Atlas dibuat dengan depth konstan tidak cocok lagi dengan input
+    assert ScenarioAtlas.load(tmp_path / "atlas", model_sha256="abc") is None
+    
+    # Shape salah -> fallback konstan
+    np.save(tmp_path / "depth.npy", channel[:64])
+    assert np.all(InputBuilder().depth_channel == 0.5)
+
+
+def test_wave_series_vectorized_per_zone(monkeypatch):
+    """Test time series vectorized: sama dengan loop lama, satu kurva per impact zone"""
+    import numpy as np
+    from app.config import settings
+    from app.services.prediction_service import PredictionService
+    
+    def loop_wave_data(eta, max_wave):
+        data = []
+        for t in range(0, min(eta + 30, 120), 5):
+            if t < eta:
+                height = 0.2 + 0.1 * np.sin(t / 10.0)
+            else:
+                since = t - eta
+                height = max_wave * np.exp(-since / 20.0) * (0.7 + 0.3 * np.sin(since / 5.0))
+            data.append({"time": t, "waveHeight": round(max(0.0, height), 2)})
+        return data
+    
+    service = PredictionService(engine=_CountingEngine())
+    for eta, wave in [(5, 3.2), (17, 0.8), (95, 6.0), (150, 2.0)]:
+        assert service._generate_wave_data(eta, wave) == loop_wave_data(eta, wave)
+    
+    zones = [{"name": "A", "eta": 8, "waveHeight": 2.5}, {"name": "B", "eta": 21, "waveHeight": 1.1}]
+    monkeypatch.setattr(settings, "WAVE_DATA_STEP_MINUTES", 1)
+    zone_data = service._generate_zone_wave_data(zones)
+    assert zone_data["time"] == list(range(0, 51))
+    assert len(zone_data["waveHeight"]) == 2
+    for zone, series in zip(zones, zone_data["waveHeight"]):
+        assert series[zone["eta"]] == round(zone["waveHeight"] * 0.7, 2)  # puncak saat tiba
+        assert max(series[:zone["eta"]]) <= 0.3  # sebelum tiba hanya gelombang latar
+    assert service._generate_zone_wave_data([]) == {"time": [], "waveHeight": []}
+    
+    result = service._finalize_prediction(7.5, 10.0, -6.102, 105.423, None, 0.0)
+    assert len(result["impactZoneWaveData"]["waveHeight"]) == len(result["impactZones"])
+
+
+@pytest.mark.asyncio
+async def test_ensemble_single_batched_inference():
+    """Test ensemble K=64: chunk INFERENCE_MAX_BATCH, persentil, distribusi dan kontur exceedance"""
+    import base64
+    import numpy as np
+    from app.config import settings
+    from app.services.prediction_service import PredictionService
+    from app.utils.grid_encoding import decode_float16
+    
+    engine = _CountingEngine()
+    service = PredictionService(engine=engine)
+    result = await service.predict_ensemble(7.5, 20.0, -6.1, 105.4, members=64, seed=1)
+    
+    assert sum(engine.calls) == 64
+    assert max(engine.calls) <= settings.INFERENCE_MAX_BATCH
+    calls = list(engine.calls)
+    assert result["members"] == 64
+    assert result["prediction"]["epicenter"] == {"latitude": -6.1, "longitude": 105.4}
+    
+    distribution = result["maxWaveDistribution"]
+    assert distribution["min"] <= distribution["percentiles"]["p50"] <= distribution["max"]
+    assert sum(distribution["histogram"]["counts"]) == 64
+    
+    p5, _ = decode_float16(base64.b64decode(result["percentileGrids"]["p5"]))
+    p95, _ = decode_float16(base64.b64decode(result["percentileGrids"]["p95"]))
+    assert p5.shape == (128, 128)
+    assert np.all(p95 >= p5)
+    grids = np.random.default_rng(0).random((64, 8, 8), dtype=np.float32)
+    np.testing.assert_allclose(
+        service._grid_percentiles(grids, [5, 50, 95]), np.percentile(grids, [5, 50, 95], axis=0), rtol=1e-5
+    )
+    assert {(c["threshold"], c["probability"]) for c in result["exceedanceContours"]}
+    
+    # Seed sama -> anggota sama; anggota 0 selalu nominal
+    members = service._ensemble_members(7.5, 20.0, -6.1, 105.4, 8, 0.2, 10.0, 15.0, seed=1)
+    assert members["magnitude"][0] == 7.5 and members["latitude"][0] == -6.1
+    np.testing.assert_array_equal(
+        members["longitude"], service._ensemble_members(7.5, 20.0, -6.1, 105.4, 8, 0.2, 10.0, 15.0, seed=1)["longitude"]
+    )
+    
+    # Epicenter perturbasi tetap di dalam batas simulasi
+    bounds = settings.SUNDA_STRAIT_BOUNDS
+    wide = service._ensemble_members(7.5, 20.0, -6.9, 106.4, 256, 0.2, 10.0, 200.0, seed=2)
+    assert bounds["min_lat"] <= wide["latitude"].min() and wide["latitude"].max() <= bounds["max_lat"]
+    assert bounds["min_lon"] <= wide["longitude"].min() and wide["longitude"].max() <= bounds["max_lon"]
+    
+    with pytest.raises(ValueError):
+        await service.predict_ensemble(7.5, 20.0, -6.1, 105.4, members=settings.ENSEMBLE_MAX_MEMBERS + 1)
+    
+    heuristic = await service.predict_ensemble(7.5, 20.0, -6.1, 105.4, mode="HEURISTIC", members=16, seed=1)
+    assert engine.calls == calls
+    assert heuristic["percentileGrids"] is None and heuristic["exceedanceContours"] == []
+
+
+@pytest.mark.asyncio
+async def test_parameter_sweep_columns():
+    """Test sweep: inference hanya per (magnitude, lat, lon), kolom konsisten dengan predict"""
+    import numpy as np
+    from app.config import settings
+    from app.services.prediction_service import TSUNAMI_CATEGORIES, PredictionService
+    from app.utils.sweep_encoding import decode_npz
+    
+    engine = _CountingEngine()
+    service = PredictionService(engine=engine)
+    mags, depths = np.linspace(6.5, 8.5, 5), np.array([10.0, 50.0])
+    lats, lons = np.linspace(-6.4, -6.0, 3), np.linspace(105.4, 105.8, 3)
+    
+    columns, meta = await service.predict_sweep(mags, depths, lats, lons)
+    
+    assert meta["points"] == 5 * 2 * 3 * 3
+    assert sum(engine.calls) == meta["inferences"] == 5 * 3 * 3
+    assert max(engine.calls) <= settings.INFERENCE_MAX_BATCH
+    assert columns["city_wave_height"].shape == (90, len(columns["city_name"]))
+    
+    # Urutan indexing="ij": titik ke-i sama dengan hasil predict untuk parameternya
+    for i in (0, 17, 89):
+        params = {k: float(columns[k][i]) for k in ("magnitude", "depth", "latitude", "longitude")}
+        result = await service.predict(**params)
+        assert result["prediction"]["maxWaveHeight"] == pytest.approx(float(columns["max_wave_height"][i]), abs=0.01)
+        assert TSUNAMI_CATEGORIES[columns["category"][i]] == result["prediction"]["tsunamiCategory"]
+        heights = dict(zip(columns["city_name"].tolist(), columns["city_wave_height"][i].tolist()))
+        for zone in result["impactZones"]:
+            assert heights[zone["name"]] == pytest.approx(zone["waveHeight"], abs=0.01)
+    
+    # Mode heuristik: tanpa inference, max wave bergantung kedalaman
+    engine.calls.clear()
+    columns_h, meta_h = await service.predict_sweep(mags, depths, lats, lons, mode="HEURISTIC")
+    assert engine.calls == [] and meta_h["inferences"] == 0
+    assert columns_h["max_wave_height"][0] == pytest.approx(service._estimate_wave_height(6.5, 10.0))
+    
+    decoded, decoded_meta = decode_npz(await service.encode_sweep(columns, meta))
+    assert decoded_meta == meta
+    np.testing.assert_array_equal(decoded["city_wave_height"], columns["city_wave_height"])
+    
+    settings.SWEEP_MAX_POINTS, previous = 10, settings.SWEEP_MAX_POINTS
+    try:
+        with pytest.raises(ValueError):
+            await service.predict_sweep(mags, depths, lats, lons)
+    finally:
+        settings.SWEEP_MAX_POINTS = previous
+    
+    # Titik x kota pesisir di atas batas ditolak sebelum inference
+    engine.calls.clear()
+    settings.SWEEP_MAX_CITY_CELLS, previous = columns["city_wave_height"].size - 1, settings.SWEEP_MAX_CITY_CELLS
+    try:
+        with pytest.raises(ValueError):
+            await service.predict_sweep(mags, depths, lats, lons)
+    finally:
+        settings.SWEEP_MAX_CITY_CELLS = previous
+    assert engine.calls == []
+    service.close()
+
+
+def test_sweep_parquet_city_columns_unique():
+    """Test parquet sweep: nama gazetteer duplikat tetap menghasilkan kolom unik"""
+    import io
+    import numpy as np
+    pq = pytest.importorskip("pyarrow.parquet")
+    from app.utils.sweep_encoding import encode_parquet
+    
+    columns = {name: np.zeros(2, dtype=np.float32) for name in ("magnitude", "depth", "latitude", "longitude", "max_wave_height")}
+    columns["category"] = np.zeros(2, dtype=np.uint8)
+    columns["city_wave_height"] = np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32)
+    columns["city_name"] = np.array(["Anyer", "Anyer"])
+    
+    table = pq.read_table(io.BytesIO(encode_parquet(columns, {"categories": ["AMAN"]})))
+    assert table.column_names[-2:] == ["wave:0:Anyer", "wave:1:Anyer"]
+    assert table.column("wave:1:Anyer").to_pylist() == [2.0, 4.0]
+
+@pytest.mark.asyncio
+async def test_predict_stream_stages_match_predict():
+    """Test SSE stages: estimate dulu, lalu tahap AI; gabungannya sama dengan predict()"""
+    from app.services.prediction_service import PredictionService
+    
+    engine = _CountingEngine()
+    service = PredictionService(engine=engine)
+    service.cache.invalidate()
+    
+    events = [item async for item in service.predict_stream(7.5, 20.0, -6.1, 105.4)]
+    assert [event for event, _ in events] == ["estimate", "prediction", "inundation", "impact", "done"]
+    assert events[0][1]["maxWaveHeight"] == round(service._estimate_wave_height(7.5, 20.0), 2)
+    assert engine.calls == [1]
+    
+    merged = {}
+    for event, data in events[1:-1]:
+        merged.update(data)
+    service.cache.invalidate()
+    expected = await service.predict(7.5, 20.0, -6.1, 105.4)
+    merged["prediction"].pop("processingTimeMs")
+    expected["prediction"].pop("processingTimeMs")
+    assert merged == expected
+    
+    # Hasil stream masuk cache: stream berikutnya tanpa inference
+    engine.calls.clear()
+    events = [item async for item in service.predict_stream(7.5, 20.0, -6.1, 105.4)]
+    assert engine.calls == [] and events[-1][1]["cached"] is True
+
+
+@pytest.mark.asyncio
+async def test_simulation_job_queue_backpressure():
+    """Test job queue: hasil sama dengan predict, antrian penuh -> JobQueueFull"""
+    import asyncio
+    from app.services.prediction_service import PredictionService
+    from app.services.simulation_jobs import JobQueueFull, SimulationJobQueue
+    
+    service = PredictionService(engine=_CountingEngine())
+    service.cache = None
+    release = asyncio.Event()
+    predict = service.predict
+    
+    async def slow_predict(**kwargs):
+        await release.wait()
+        return await predict(**kwargs)
+    
+    service.predict = slow_predict
+    queue = SimulationJobQueue(service, workers=1, max_queue=2, persist=False)
+    params = {"magnitude": 7.5, "depth": 20.0, "latitude": -6.1, "longitude": 105.4, "mode": "AI"}
+    try:
+        first = queue.submit(params)
+        assert first["status"] == "queued"
+        await asyncio.sleep(0)  # worker mengambil job pertama
+        queue.submit(params)
+        queue.submit(params)
+        with pytest.raises(JobQueueFull):
+            queue.submit(params)
+        assert queue.get(first["jobId"])["status"] == "running"
+        
+        release.set()
+        for _ in range(100):
+            if queue.get(first["jobId"])["status"] == "completed":
+                break
+            await asyncio.sleep(0.01)
+        job = queue.get(first["jobId"])
+        assert job["status"] == "completed"
+        assert job["result"]["prediction"]["maxWaveHeight"] > 0
+        assert queue.get("missing") is None
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_assesses_new_earthquakes_in_one_batch():
+    """Test assessment saat ingest: satu predict_batch untuk seluruh batch, kolom tsunami_* terisi"""
+    from app.core.scheduler import EarthquakeScheduler
+    from app.services.earthquake_service import risk_level_from_category
+    from app.services.prediction_service import PredictionService
+    
+    engine = _CountingEngine()
+    service = PredictionService(engine=engine)
+    earthquakes = [
+        {"id": f"eq-{i}", "magnitude": 6.0 + i * 0.5, "depth": 20.0, "latitude": -6.1, "longitude": 105.4}
+        for i in range(5)
+    ]
+    
+    scheduler = EarthquakeScheduler()
+    scheduler.prediction_service = service
+    await scheduler._assess_batch(earthquakes)
+    
+    assert sum(engine.calls) == 5
+    expected = await service.predict_batch([
+        {k: eq[k] for k in ("magnitude", "depth", "latitude", "longitude")} for eq in earthquakes
+    ])
+    for eq, result in zip(earthquakes, expected):
+        assert eq["max_wave_height"] == result["prediction"]["maxWaveHeight"]
+        assert eq["tsunami_risk_level"] == risk_level_from_category(result["prediction"]["tsunamiCategory"])
+        assert eq["tsunami_potential"] == (eq["tsunami_risk_level"] != "Rendah")
+    
+    # Tanpa prediction service: heuristik, tanpa inference
+    scheduler.prediction_service = None
+    fallback = [{"id": "eq-x", "magnitude": 7.8, "depth": 10.0, "latitude": -6.1, "longitude": 105.4}]
+    await scheduler._assess_batch(fallback)
+    assert fallback[0]["tsunami_risk_level"] == "Bahaya"
+    assert fallback[0]["max_wave_height"] == pytest.approx(2.6)
+    service.close()